@@ -0,0 +1,41 @@
+# apps/accounts/management/commands/purge_otp.py
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.accounts.models import VerificationCode
+
+
+class Command(BaseCommand):
+    help = "Delete expired and consumed verification codes in bounded batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--every",
+            type=int,
+            default=0,
+            help="Repeat every N seconds (0 = run once).",
+        )
+        parser.add_argument(
+            "--retention",
+            type=int,
+            default=settings.OTP["RETENTION_MINUTES"],
+            help="Keep codes for N minutes after they expire.",
+        )
+
+    def handle(self, *args, every, retention, **options):
+        older_than = timedelta(minutes=retention)
+        batch = settings.OTP["PURGE_BATCH"]
+        while True:
+            total = 0
+            while n := VerificationCode.objects.purge_expired(
+                older_than=older_than, limit=batch
+            ):
+                total += n
+            if total:
+                self.stdout.write(f"Purged {total} verification codes")
+            if every <= 0:
+                return
+            time.sleep(every)
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.6 on 2026-10-18 03:17
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_lookup_hash(apps, schema_editor):
+    # only codes that can still be verified need a hash
+    from apps.accounts.models import otp_lookup_hash
+
+    VerificationCode = apps.get_model("accounts", "VerificationCode")
+    alive = VerificationCode.objects.filter(
+        consumed=False, expires_at__gt=timezone.now(), lookup_hash__isnull=True
+    )
+    rows = list(alive.only("id", "purpose", "code"))
+    for vc in rows:
+        vc.lookup_hash = otp_lookup_hash(vc.purpose, vc.code)
+    VerificationCode.objects.bulk_update(rows, ["lookup_hash"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="verificationcode",
+            name="lookup_hash",
+            field=models.CharField(editable=False, max_length=64, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="verificationcode",
+            index=models.Index(
+                condition=models.Q(("consumed", False)),
+                fields=["lookup_hash", "expires_at"],
+                name="vc_alive_lookup_idx",
+            ),
+        ),
+        migrations.RunPython(backfill_lookup_hash, migrations.RunPython.noop),
+    ]
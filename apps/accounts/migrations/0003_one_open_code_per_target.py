@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-18 03:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0002_otp_lookup_hash"),
+    ]
+
+    operations = [
+        # close all but the newest open code of each target
+        migrations.RunSQL(
+            """
+            UPDATE verification_codes SET consumed = true
+             WHERE NOT consumed
+               AND telegram_id IS NOT NULL
+               AND id NOT IN (
+                   SELECT DISTINCT ON (telegram_id, purpose) id
+                     FROM verification_codes
+                    WHERE NOT consumed AND telegram_id IS NOT NULL
+                    ORDER BY telegram_id, purpose, created_at DESC
+               )
+            """,
+            migrations.RunSQL.noop,
+        ),
+        migrations.AddConstraint(
+            model_name="verificationcode",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("consumed", False)),
+                fields=("telegram_id", "purpose"),
+                name="vc_one_open_per_target",
+            ),
+        ),
+    ]
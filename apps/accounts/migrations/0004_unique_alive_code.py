@@ -0,0 +1,47 @@
+# Generated by Django 5.2.6 on 2026-10-18 03:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0003_one_open_code_per_target"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="verificationcode",
+            name="vc_alive_lookup_idx",
+        ),
+        # close expired open codes, then all but the newest holder of a code
+        migrations.RunSQL(
+            """
+            UPDATE verification_codes SET consumed = true
+             WHERE NOT consumed AND expires_at <= now()
+            """,
+            migrations.RunSQL.noop,
+        ),
+        migrations.RunSQL(
+            """
+            UPDATE verification_codes SET consumed = true
+             WHERE NOT consumed
+               AND lookup_hash IS NOT NULL
+               AND id NOT IN (
+                   SELECT DISTINCT ON (lookup_hash) id
+                     FROM verification_codes
+                    WHERE NOT consumed AND lookup_hash IS NOT NULL
+                    ORDER BY lookup_hash, created_at DESC
+               )
+            """,
+            migrations.RunSQL.noop,
+        ),
+        migrations.AddConstraint(
+            model_name="verificationcode",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("consumed", False)),
+                fields=("lookup_hash",),
+                name="vc_alive_lookup_idx",
+            ),
+        ),
+    ]
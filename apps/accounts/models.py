@@ -2,12 +2,97 @@
 from __future__ import annotations
 
 import uuid
-from datetime import timedelta
-from typing import Optional
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
 
-from django.db import models, transaction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, connection, models, transaction
 from django.db.models import Q
 from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from apps.core.cache import is_shared
+
+
+def otp_lookup_hash(purpose: str, code: str) -> str:
+    """
+    Keyed digest of the (purpose, code) bucket. Verification looks codes up
+    by it through a partial index of unconsumed rows, so its cost does not
+    grow with the table.
+    """
+    return salted_hmac(
+        "accounts.verification_code", f"{purpose}:{code}", algorithm="sha256"
+    ).hexdigest()
+
+
+OTP_STATUS_KEY = "accounts:otp_status:{purpose}:{kind}:{value}"
+_MISS = object()
+
+
+def _status_keys(
+    purpose: str, telegram_id=None, telegram_username: Optional[str] = None
+) -> List[str]:
+    keys = []
+    if telegram_id:
+        keys.append(
+            OTP_STATUS_KEY.format(purpose=purpose, kind="id", value=telegram_id)
+        )
+    if telegram_username:
+        keys.append(
+            OTP_STATUS_KEY.format(purpose=purpose, kind="un", value=telegram_username)
+        )
+    return keys
+
+
+def _cache_status(keys: List[str], expires_at: Optional[datetime]) -> None:
+    """Positive entries live until the code expires, negative ones briefly."""
+    if not is_shared():
+        return
+    if expires_at is None:
+        timeout = settings.OTP["STATUS_NEGATIVE_TTL"]
+    else:
+        timeout = (expires_at - timezone.now()).total_seconds()
+        if timeout <= 0:
+            return
+    cache.set_many({k: expires_at for k in keys}, timeout=timeout)
+
+
+_ISSUE_SQL = """
+    INSERT INTO verification_codes AS vc (
+        id, telegram_id, telegram_username, code, purpose, lookup_hash,
+        created_at, expires_at, consumed
+    )
+    VALUES (
+        %(id)s, %(telegram_id)s, %(telegram_username)s, %(code)s, %(purpose)s,
+        %(lookup_hash)s, %(now)s, %(expires_at)s, false
+    )
+    ON CONFLICT (telegram_id, purpose) WHERE NOT consumed DO UPDATE SET
+        telegram_username = EXCLUDED.telegram_username,
+        code = EXCLUDED.code,
+        lookup_hash = EXCLUDED.lookup_hash,
+        created_at = EXCLUDED.created_at,
+        expires_at = EXCLUDED.expires_at
+    WHERE vc.expires_at <= EXCLUDED.created_at
+    RETURNING vc.*
+"""
+
+# expired open rows would otherwise keep their code reserved in
+# vc_alive_lookup_idx until purged
+_RELEASE_SQL = """
+    UPDATE verification_codes SET consumed = true
+     WHERE lookup_hash = %(lookup_hash)s AND NOT consumed
+       AND expires_at <= %(now)s
+"""
+
+
+class CodeCollision(IntegrityError):
+    """The code is alive for another target (vc_alive_lookup_idx)."""
+
+
+def _constraint_name(e: IntegrityError) -> Optional[str]:
+    diag = getattr(e.__cause__, "diag", None)
+    return getattr(diag, "constraint_name", None)
 
 
 class VerificationCodeQuerySet(models.QuerySet):
@@ -15,6 +100,12 @@ class VerificationCodeQuerySet(models.QuerySet):
         now = timezone.now()
         return self.filter(consumed=False, expires_at__gt=now)  # type: ignore
 
+    def matching(self, *, purpose: str, code: str) -> "VerificationCodeQuerySet":
+        """Alive codes of the (purpose, code) bucket; served by vc_alive_lookup_idx."""
+        return self.alive().filter(
+            lookup_hash=otp_lookup_hash(purpose, code), purpose=purpose
+        )
+
     def for_target(
         self,
         *,
@@ -54,21 +145,106 @@ class VerificationCodeManager(models.Manager.from_queryset(VerificationCodeQuery
     def issue(
         self,
         *,
-        telegram_id: Optional[int],
+        telegram_id: int,
         telegram_username: Optional[str],
         code: str,
         purpose: str,
         ttl_minutes: int = 2,
-    ) -> "VerificationCode":
+    ) -> Tuple["VerificationCode", bool]:
+        """
+        Stores ``code`` unless the target already has an alive code for
+        ``purpose``; returns (code row, stored). One upsert arbitrated by
+        ``vc_one_open_per_target``: an expired open row is recycled in place,
+        an alive one is left alone and returned instead. Repeating a call
+        with the same code reports it as stored, so callers may retry.
+        Raises CodeCollision when another target holds the code alive.
+        """
+        now = timezone.now()
+        params = {
+            "id": uuid.uuid4(),
+            "telegram_id": telegram_id,
+            "telegram_username": telegram_username or None,
+            "code": code,
+            "purpose": purpose,
+            "lookup_hash": otp_lookup_hash(purpose, code),
+            "now": now,
+            "expires_at": now + timedelta(minutes=ttl_minutes),
+        }
+        for _ in range(2):
+            with connection.cursor() as cur:
+                cur.execute(_RELEASE_SQL, params)
+            try:
+                with transaction.atomic():
+                    stored = list(self.raw(_ISSUE_SQL, params))
+            except IntegrityError as e:
+                if _constraint_name(e) != "vc_alive_lookup_idx":
+                    raise
+                # a concurrent issue took the code; retry once it is settled
+                if (
+                    self.matching(purpose=purpose, code=code)
+                    .exclude(telegram_id=telegram_id)
+                    .exists()
+                ):
+                    raise CodeCollision("Code collision") from e
+                continue
+            if stored:
+                vc = stored[0]
+                transaction.on_commit(
+                    lambda: _cache_status(vc.status_keys(), vc.expires_at)
+                )
+                return vc, True
+            vc = self.latest_alive_for(telegram_id=telegram_id, purpose=purpose)
+            if vc is not None:
+                # the same code again is a retry of a call that already stored it
+                return vc, constant_time_compare(vc.code, code)
+            # the conflicting row committed after this statement's snapshot
+        raise IntegrityError("Could not issue a verification code")
 
-        expires = timezone.now() + timedelta(minutes=ttl_minutes)
-        return self.create(  # type: ignore
+    def active_until(
+        self,
+        *,
+        telegram_id=None,
+        telegram_username: Optional[str] = None,
+        purpose: str,
+    ) -> Optional[datetime]:
+        """
+        Expiry of the target's alive code, or None. Served from the shared
+        cache, which ``issue`` and ``consume`` keep current; the database is
+        read on a miss, and always when the cache is per-process (another
+        worker's issue/consume would not reach it).
+        """
+        if telegram_id:
+            telegram_username = None  # the id identifies the account on its own
+        keys = _status_keys(purpose, telegram_id, telegram_username)
+        if not keys:
+            return None
+        hit = cache.get(keys[0], _MISS) if is_shared() else _MISS
+        if hit is not _MISS:
+            return hit if hit is None or hit > timezone.now() else None
+        vc = self.latest_alive_for(
             telegram_id=telegram_id,
-            telegram_username=(telegram_username or None),
-            code=code,
+            telegram_username=telegram_username,
             purpose=purpose,
-            expires_at=expires,
         )
+        expires_at = vc.expires_at if vc else None
+        _cache_status(keys, expires_at)
+        return expires_at
+
+    def purge_expired(self, *, older_than: timedelta, limit: int) -> int:
+        """
+        Deletes up to ``limit`` codes that expired more than ``older_than``
+        ago (consumed codes expire too). Rows locked by a concurrent verify
+        are skipped, so purging never blocks logins.
+        """
+        table = self.model._meta.db_table
+        with connection.cursor() as cur:
+            cur.execute(
+                f"DELETE FROM {table} WHERE id IN ("
+                f"SELECT id FROM {table} WHERE expires_at < %s "
+                f"ORDER BY expires_at LIMIT %s FOR UPDATE SKIP LOCKED)",
+                [timezone.now() - older_than, limit],
+            )
+            return cur.rowcount
 
     def has_active(
         self,
@@ -98,6 +274,7 @@ class VerificationCode(models.Model):
 
     code = models.CharField(max_length=6)
     purpose = models.CharField(max_length=10, choices=Purpose.choices)  # type: ignore
+    lookup_hash = models.CharField(max_length=64, null=True, editable=False)
 
     created_at = models.DateTimeField(default=timezone.now, db_index=True)
     expires_at = models.DateTimeField(db_index=True)
@@ -132,20 +309,47 @@ class VerificationCode(models.Model):
             ),
         ]
         constraints = [
+            # an open code belongs to one target, so a code resolves to one
+            # account; lookups by code use it too (see matching)
+            models.UniqueConstraint(
+                fields=["lookup_hash"],
+                condition=Q(consumed=False),
+                name="vc_alive_lookup_idx",
+            ),
+            # at most one unconsumed code per target; see Manager.issue
+            models.UniqueConstraint(
+                fields=["telegram_id", "purpose"],
+                condition=Q(consumed=False),
+                name="vc_one_open_per_target",
+            ),
             models.CheckConstraint(
                 check=Q(code__regex=r"^\d{6}$"),
                 name="verification_code_six_digits",
             ),
         ]
 
+    def save(self, *args, **kwargs):
+        self.lookup_hash = otp_lookup_hash(self.purpose, self.code)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"code", "purpose"} & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "lookup_hash"}
+        super().save(*args, **kwargs)
+
     def is_valid(self, raw_code: str) -> bool:
         now = timezone.now()
         return (
-            (not self.consumed) and (self.code == raw_code) and (now < self.expires_at)
+            (not self.consumed)
+            and constant_time_compare(self.code, raw_code)
+            and (now < self.expires_at)
         )
 
+    def status_keys(self) -> List[str]:
+        return _status_keys(self.purpose, self.telegram_id, self.telegram_username)
+
     @transaction.atomic
     def consume(self) -> None:
         if not self.consumed:
             self.consumed = True
             self.save(update_fields=["consumed"])
+            keys = self.status_keys()
+            transaction.on_commit(lambda: _cache_status(keys, None))
@@ -1,14 +1,13 @@
 # apps/accounts/serializers.py
 from __future__ import annotations
 from __future__ import annotations
-from django.utils import timezone
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
 from uuid import UUID
 
 from django.db import transaction
 from rest_framework import serializers
 
-from apps.accounts.models import VerificationCode
+from apps.accounts.models import CodeCollision, VerificationCode
 from apps.users.models import User
 
 
@@ -60,8 +59,9 @@ class RegisterVerifySerializer(serializers.Serializer):
     @staticmethod
     def _load_vc_by_code(code: str) -> VerificationCode | None:
         return (
-            VerificationCode.objects.alive()
-            .filter(code=code, purpose=VerificationCode.Purpose.REGISTER)
+            VerificationCode.objects.matching(
+                purpose=VerificationCode.Purpose.REGISTER, code=code
+            )
             .order_by("-created_at")
             .first()
         )
@@ -110,11 +110,8 @@ class LoginVerifySerializer(serializers.Serializer):
         code = attrs["code"]
 
         vc = (
-            VerificationCode.objects.filter(
-                purpose=VerificationCode.Purpose.LOGIN,
-                consumed=False,
-                expires_at__gt=timezone.now(),
-                code=code,
+            VerificationCode.objects.matching(
+                purpose=VerificationCode.Purpose.LOGIN, code=code
             )
             .order_by("-created_at")
             .first()
@@ -140,7 +137,8 @@ class LoginVerifySerializer(serializers.Serializer):
 
 class OtpIngestSerializer(serializers.Serializer):
 
-    telegram_id = serializers.IntegerField(required=False)
+    # required: codes are matched and verified by Telegram account
+    telegram_id = serializers.IntegerField()
     telegram_username = serializers.CharField(required=False, allow_blank=True)
     code = serializers.CharField(max_length=6)
     purpose = serializers.ChoiceField(choices=VerificationCode.Purpose.choices)  # type: ignore
@@ -151,26 +149,51 @@ class OtpIngestSerializer(serializers.Serializer):
             raise serializers.ValidationError("Code must be 6 digits.")
         return v
 
-    @transaction.atomic
-    def create(self, validated_data: Dict[str, Any]) -> VerificationCode:
-        # username normalize
-        tuser = validated_data.get("telegram_username") or None
+    def issue(self) -> Tuple[VerificationCode, bool]:
+        """Stores the code or returns the target's alive one: (code, stored)."""
+        data = self.validated_data
+        tuser = data.get("telegram_username") or None
         if tuser:
             tuser = tuser.strip().lstrip("@").lower()
-            validated_data["telegram_username"] = tuser
 
-        exists = VerificationCode.objects.has_active(
-            telegram_id=validated_data.get("telegram_id"),
-            telegram_username=validated_data.get("telegram_username"),
-            purpose=validated_data["purpose"],
-        )
-        if exists:
+        # a verified code must resolve to exactly one Telegram account
+        if (
+            VerificationCode.objects.matching(
+                purpose=data["purpose"], code=data["code"]
+            )
+            .exclude(telegram_id=data["telegram_id"])
+            .exists()
+        ):
+            raise serializers.ValidationError(
+                {"detail": "Code collision"}, code="conflict"
+            )
+
+        try:
+            return VerificationCode.objects.issue(
+                telegram_id=data["telegram_id"],
+                telegram_username=tuser,
+                code=data["code"],
+                purpose=data["purpose"],
+                ttl_minutes=2,
+            )
+        except CodeCollision:
+            raise serializers.ValidationError(
+                {"detail": "Code collision"}, code="conflict"
+            )
+
+    @transaction.atomic
+    def create(self, validated_data: Dict[str, Any]) -> VerificationCode:
+        vc, stored = self.issue()
+        if not stored:
             raise serializers.ValidationError(
-                {"detail": "Active code exists", "expires_at": exists.expires_at},
+                {"detail": "Active code exists", "expires_at": vc.expires_at},
                 code="conflict",
             )
+        return vc
+
 
-        return VerificationCode.objects.issue(**validated_data, ttl_minutes=2)
+class OtpIssueSerializer(OtpIngestSerializer):
+    pass
 
 
 class OtpStatusQuerySerializer(serializers.Serializer):
@@ -6,6 +6,7 @@ from .views import (
     RegisterVerifyView,
     LoginVerifyView,
     OtpIngestView,
+    OtpIssueView,
     OtpStatusView,
 )
 
@@ -14,5 +15,6 @@ urlpatterns = [
     path("register/verify/", RegisterVerifyView.as_view()),
     path("login/verify/", LoginVerifyView.as_view()),
     path("otp/ingest/", OtpIngestView.as_view()),
+    path("otp/issue/", OtpIssueView.as_view()),
     path("otp/status/", OtpStatusView.as_view()),
 ]
@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
 from drf_spectacular.utils import OpenApiParameter
 from drf_spectacular.utils import extend_schema, OpenApiResponse
@@ -14,6 +15,7 @@ from .serializers import (
     RegisterVerifySerializer,
     LoginVerifySerializer,
     OtpIngestSerializer,
+    OtpIssueSerializer,
 )
 from .services import issue_tokens
 
@@ -148,7 +150,9 @@ class LoginVerifyView(generics.CreateAPIView):
         201: OpenApiResponse(
             response=dict, description='{"status":"stored","expires_at":"..."}'
         ),
-        409: OpenApiResponse(description="Active code exists"),
+        409: OpenApiResponse(
+            description='"Active code exists" yoki "Code collision" (boshqa kod yuboring)'
+        ),
         401: OpenApiResponse(description="Unauthorized"),
         400: OpenApiResponse(description="Validation error"),
     },
@@ -173,7 +177,7 @@ class OtpIngestView(generics.CreateAPIView):
         except serializers.ValidationError as e:
             if getattr(e, "code", None) == "conflict" or (
                 isinstance(e.detail, dict)
-                and e.detail.get("detail") == "Active code exists"
+                and e.detail.get("detail") in ("Active code exists", "Code collision")
             ):
                 data = (
                     e.detail
@@ -189,6 +193,74 @@ class OtpIngestView(generics.CreateAPIView):
         )
 
 
+@extend_schema(
+    tags=["accounts"],
+    summary="OTP issue (Bot → Backend)",
+    description=(
+        "⚠️ **FRONTEND uchun emas!**\n\n"
+        "Telegram bot uchun bitta so‘rovli endpoint: foydalanuvchining faol kodi bo‘lsa, "
+        "uning qolgan vaqti qaytariladi (`status=active`, 200); aks holda yuborilgan kod "
+        "saqlanadi (`status=stored`, 201). Ikki tez bosish bir-biriga xalaqit bermaydi.\n\n"
+        "`409 Code collision` — bu kod hozir boshqa foydalanuvchida faol, boshqa kod yuboring.\n\n"
+        "**Xavfsizlik**: `X-Bot-Token` header orqali yuborilgan **shared-secret** bilan "
+        "autentifikatsiya qilinadi."
+    ),
+    request=OtpIssueSerializer,
+    parameters=[
+        OpenApiParameter(
+            name="X-Bot-Token",
+            type=str,
+            location="header",
+            required=True,
+            description="Shared secret (settings.TELEGRAM_BOT_INGEST_TOKEN)",
+        )
+    ],
+    responses={
+        201: OpenApiResponse(
+            response=dict,
+            description='{"status":"stored","expires_at":"...","remaining_seconds":120}',
+        ),
+        200: OpenApiResponse(
+            response=dict,
+            description='{"status":"active","expires_at":"...","remaining_seconds":73}',
+        ),
+        409: OpenApiResponse(description="Code collision"),
+        401: OpenApiResponse(description="Unauthorized"),
+        400: OpenApiResponse(description="Validation error"),
+    },
+)
+class OtpIssueView(generics.GenericAPIView):
+    permission_classes = [permissions.AllowAny]
+    serializer_class = OtpIssueSerializer
+    throttle_classes = [OTPIngestThrottle]
+
+    def post(self, request, *args, **kwargs):
+        expected = getattr(settings, "TELEGRAM_BOT_INGEST_TOKEN", None)
+        provided = request.headers.get("X-Bot-Token")
+        if expected and provided != expected:
+            return Response(
+                {"detail": "Unauthorized"}, status=status.HTTP_401_UNAUTHORIZED
+            )
+
+        ser = self.get_serializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        try:
+            with transaction.atomic():
+                vc, stored = ser.issue()
+        except serializers.ValidationError as e:
+            return Response(e.detail, status=status.HTTP_409_CONFLICT)
+
+        remaining = int((vc.expires_at - timezone.now()).total_seconds())
+        return Response(
+            {
+                "status": "stored" if stored else "active",
+                "expires_at": vc.expires_at,
+                "remaining_seconds": max(remaining, 0),
+            },
+            status=status.HTTP_201_CREATED if stored else status.HTTP_200_OK,
+        )
+
+
 @extend_schema(
     tags=["accounts"],
     summary="OTP status (Bot → Backend)",
@@ -254,19 +326,19 @@ class OtpStatusView(generics.GenericAPIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        vc = VerificationCode.objects.latest_alive_for(
+        expires_at = VerificationCode.objects.active_until(
             telegram_id=telegram_id,
-            telegram_username=telegram_username,
+            telegram_username=(telegram_username or "").strip().lstrip("@").lower(),
             purpose=purpose,
         )
 
-        if not vc:
+        if not expires_at:
             return Response(
                 {"active": False, "remaining_seconds": 0},
                 status=status.HTTP_200_OK,
             )
 
-        remaining = int((vc.expires_at - timezone.now()).total_seconds())
+        remaining = int((expires_at - timezone.now()).total_seconds())
         return Response(
             {
                 "active": True,
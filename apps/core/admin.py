@@ -1,3 +1,19 @@
 from django.contrib import admin
+from .models import Job
 
-# Register your models here.
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "kind",
+        "status",
+        "attempts",
+        "run_after",
+        "locked_by",
+        "locked_at",
+        "created_at",
+    )
+    list_filter = ("status", "kind")
+    search_fields = ("kind", "last_error")
+    readonly_fields = ("created_at", "locked_at", "locked_by", "last_error")
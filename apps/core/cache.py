@@ -0,0 +1,37 @@
+# apps/core/cache.py
+from __future__ import annotations
+
+import uuid
+from typing import Any, Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def is_shared() -> bool:
+    """False for a per-process cache (locmem), which other workers never see."""
+    return not settings.CACHES["default"]["BACKEND"].endswith("LocMemCache")
+
+
+def _version_key(namespace: str, key: Any) -> str:
+    return f"{namespace}:ver:{key}"
+
+
+def get_version(namespace: str, key: Any) -> str:
+    """
+    Current version token for a cached object. Tokens are random, so a writer
+    that read an old token before invalidation can only fill a dead key.
+    """
+    vkey = _version_key(namespace, key)
+    version = cache.get(vkey)
+    if version is None:
+        version = uuid.uuid4().hex[:12]
+        if not cache.add(vkey, version, timeout=None):
+            version = cache.get(vkey) or version
+    return version
+
+
+def invalidate(namespace: str, keys: Iterable[Any]) -> None:
+    vkeys = [_version_key(namespace, k) for k in keys]
+    if vkeys:
+        cache.delete_many(vkeys)
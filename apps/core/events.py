@@ -0,0 +1,257 @@
+# apps/core/events.py
+"""
+Push events. Services call ``publish`` inside their transaction; Postgres
+delivers NOTIFY only on commit, to every web worker. Each worker keeps one
+LISTEN connection that feeds an in-process broker, and SSE streams
+subscribe to the broker.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Optional,
+    Set,
+)
+
+import psycopg
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, transaction
+from django.http import StreamingHttpResponse
+from psycopg.conninfo import make_conninfo
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+log = logging.getLogger(__name__)
+
+__all__ = (
+    "publish",
+    "broker",
+    "subscription",
+    "event_stream",
+    "stream_user",
+    "sse_response",
+)
+
+PG_CHANNEL = "cdi_events"
+HEARTBEAT_SECONDS = 15
+QUEUE_SIZE = 100
+LISTEN_WAIT_SECONDS = 5
+# sent to every subscriber after the LISTEN connection comes back: NOTIFYs
+# in the gap are lost, so consumers re-read the state they watch
+RESYNC = {"type": "resync"}
+
+
+def _is_postgres() -> bool:
+    return settings.DATABASES["default"]["ENGINE"].endswith("postgresql")
+
+
+def publish(channel: str, event: Dict[str, Any]) -> None:
+    """Sends ``event`` to ``channel`` subscribers once the transaction commits."""
+    message = json.dumps({"channel": channel, "event": event}, default=str)
+    if _is_postgres():
+        with connection.cursor() as cur:
+            cur.execute("SELECT pg_notify(%s, %s)", [PG_CHANNEL, message])
+    else:
+        transaction.on_commit(lambda: broker.dispatch_threadsafe(message))
+
+
+def _conninfo() -> str:
+    db = settings.DATABASES["default"]
+    params = {
+        "dbname": db.get("NAME"),
+        "user": db.get("USER"),
+        "password": db.get("PASSWORD"),
+        "host": db.get("HOST"),
+        "port": db.get("PORT"),
+    }
+    return make_conninfo(**{k: str(v) for k, v in params.items() if v})
+
+
+class Broker:
+    """Per-process fan-out from one LISTEN connection to many SSE queues."""
+
+    def __init__(self, queue_size: int = QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subs: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listener: Optional[asyncio.Task] = None
+        self._listening: Optional[asyncio.Event] = None
+        # subscribers that gave up waiting for LISTEN
+        self._unsynced: Set[asyncio.Queue] = set()
+
+    def subscribe(self, channels: Iterable[str]) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._listening = asyncio.Event()
+            self._listener = None
+        q: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        for ch in channels:
+            self._subs[ch].add(q)
+        if _is_postgres() and (self._listener is None or self._listener.done()):
+            self._listener = self._loop.create_task(self._listen())
+        return q
+
+    def unsubscribe(self, q: asyncio.Queue, channels: Iterable[str]) -> None:
+        for ch in channels:
+            subs = self._subs.get(ch)
+            if subs is not None:
+                subs.discard(q)
+                if not subs:
+                    del self._subs[ch]
+        self._unsynced.discard(q)
+
+    async def wait_listening(
+        self, q: asyncio.Queue, timeout: float = LISTEN_WAIT_SECONDS
+    ) -> None:
+        """
+        Waits until the LISTEN connection is up, so a NOTIFY committed after
+        this returns reaches ``q``. If it stays down, ``q`` gets ``RESYNC``
+        once it connects.
+        """
+        if not _is_postgres() or self._listening is None:
+            return
+        try:
+            await asyncio.wait_for(self._listening.wait(), timeout)
+        except asyncio.TimeoutError:
+            log.warning("Event listener not connected after %ss", timeout)
+            self._unsynced.add(q)
+
+    def _put(self, q: asyncio.Queue, event: Any) -> None:
+        if q.full():
+            q.get_nowait()  # slow consumer: drop its oldest event
+        q.put_nowait(event)
+
+    def dispatch(self, message: str) -> None:
+        try:
+            data = json.loads(message)
+        except ValueError:
+            return
+        for q in list(self._subs.get(data.get("channel"), ())):
+            self._put(q, data.get("event"))
+
+    def resync(self, queues: Optional[Iterable[asyncio.Queue]] = None) -> None:
+        if queues is None:
+            queues = {q for subs in self._subs.values() for q in subs}
+        for q in list(queues):
+            self._put(q, RESYNC)
+        self._unsynced.clear()
+
+    def dispatch_threadsafe(self, message: str) -> None:
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self.dispatch, message)
+
+    async def _listen(self) -> None:
+        listening = self._listening
+        delay = 1
+        reconnect = False
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(
+                    _conninfo(), autocommit=True
+                ) as conn:
+                    await conn.execute(f"LISTEN {PG_CHANNEL}")
+                    listening.set()
+                    self.resync(None if reconnect else self._unsynced)
+                    reconnect = True
+                    delay = 1
+                    async for notify in conn.notifies():
+                        self.dispatch(notify.payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning("Event listener disconnected: %s", e)
+            finally:
+                listening.clear()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30)
+
+
+broker = Broker()
+
+
+@asynccontextmanager
+async def subscription(channels: Iterable[str]) -> AsyncIterator[asyncio.Queue]:
+    """
+    Queue of events on ``channels`` for the duration of the block; entered
+    once the worker is LISTENing. After a listener reconnect the queue
+    gets ``RESYNC``.
+    """
+    channels = list(channels)
+    q = broker.subscribe(channels)
+    try:
+        await broker.wait_listening(q)
+        yield q
+    finally:
+        broker.unsubscribe(q, channels)
+
+
+def _sse(event: Optional[Dict[str, Any]]) -> bytes:
+    name = (event or {}).get("type", "message")
+    body = json.dumps(event, default=str)
+    return f"event: {name}\ndata: {body}\n\n".encode()
+
+
+async def event_stream(
+    channels: Iterable[str],
+    snapshot: Optional[Callable[[], Awaitable[Dict[str, Any]]]] = None,
+) -> AsyncIterator[bytes]:
+    """
+    ``snapshot`` is awaited once the subscription is live and sent first,
+    so a change that lands before the stream opens is not missed.
+    """
+    async with subscription(channels) as q:
+        yield b"retry: 3000\n\n"
+        if snapshot is not None:
+            yield _sse(await snapshot())
+        while True:
+            try:
+                event = await asyncio.wait_for(q.get(), timeout=HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": ping\n\n"
+                continue
+            if event is RESYNC and snapshot is not None:
+                event = await snapshot()
+            yield _sse(event)
+
+
+def sse_response(
+    channels: Iterable[str],
+    snapshot: Optional[Callable[[], Awaitable[Dict[str, Any]]]] = None,
+) -> StreamingHttpResponse:
+    resp = StreamingHttpResponse(
+        event_stream(channels, snapshot), content_type="text/event-stream"
+    )
+    resp["Cache-Control"] = "no-cache"
+    resp["X-Accel-Buffering"] = "no"  # nginx: do not buffer the stream
+    return resp
+
+
+async def stream_user(request):
+    """
+    JWT user for streaming views. EventSource cannot set headers, so the
+    access token may also come as ``?token=``.
+    """
+    header = request.headers.get("Authorization", "")
+    raw = header.split(" ", 1)[1] if header.startswith("Bearer ") else None
+    raw = raw or request.GET.get("token")
+    if not raw:
+        return None
+    auth = JWTAuthentication()
+    try:
+        token = auth.get_validated_token(raw)
+        return await sync_to_async(auth.get_user)(token)
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return None
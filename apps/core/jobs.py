@@ -0,0 +1,183 @@
+# apps/core/jobs.py
+from __future__ import annotations
+
+import logging
+import random
+import signal
+import time
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Count, F, Min, Q
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from .models import Job
+
+log = logging.getLogger(__name__)
+
+__all__ = (
+    "job",
+    "enqueue",
+    "claim_jobs",
+    "run_job",
+    "work",
+    "queue_stats",
+    "autodiscover",
+)
+
+Handler = Callable[[Dict[str, Any]], None]
+_HANDLERS: Dict[str, Handler] = {}
+
+
+def job(kind: str) -> Callable[[Handler], Handler]:
+    """Registers a handler; modules named ``jobs.py`` are picked up by workers."""
+
+    def decorator(fn: Handler) -> Handler:
+        _HANDLERS[kind] = fn
+        return fn
+
+    return decorator
+
+
+def autodiscover() -> None:
+    autodiscover_modules("jobs")
+
+
+def _conf(name: str):
+    return settings.JOBS[name]
+
+
+def enqueue(
+    kind: str,
+    payload: Optional[Dict[str, Any]] = None,
+    *,
+    delay: float = 0,
+    dedupe: bool = False,
+) -> Job:
+    """
+    Adds a job in the caller's transaction, so it becomes visible to workers
+    only if the surrounding work commits. With ``dedupe`` an identical job
+    that is still queued is reused.
+    """
+    payload = payload or {}
+    if dedupe:
+        existing = Job.objects.filter(
+            kind=kind, payload=payload, status=Job.Status.QUEUED
+        ).first()
+        if existing:
+            return existing
+    return Job.objects.create(
+        kind=kind,
+        payload=payload,
+        run_after=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+@transaction.atomic
+def claim_jobs(*, worker: str, limit: int) -> List[Job]:
+    # SELECT ... FOR UPDATE SKIP LOCKED: concurrent workers never share a row
+    now = timezone.now()
+    stale = now - timedelta(seconds=_conf("LOCK_TIMEOUT"))
+    jobs = list(
+        Job.objects.select_for_update(skip_locked=True)
+        .filter(
+            Q(status=Job.Status.QUEUED, run_after__lte=now)
+            | Q(status=Job.Status.RUNNING, locked_at__lt=stale)
+        )
+        .order_by("run_after", "id")[:limit]
+    )
+    if not jobs:
+        return []
+    Job.objects.filter(id__in=[j.id for j in jobs]).update(
+        status=Job.Status.RUNNING,
+        locked_by=worker,
+        locked_at=now,
+        attempts=F("attempts") + 1,
+    )
+    for j in jobs:
+        j.status = Job.Status.RUNNING
+        j.locked_by = worker
+        j.locked_at = now
+        j.attempts += 1
+    return jobs
+
+
+def backoff(attempt: int) -> float:
+    delay = min(_conf("BACKOFF_MAX"), _conf("BACKOFF_BASE") * 2 ** (attempt - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def run_job(job: Job) -> bool:
+    """Runs one claimed job. Finished jobs are deleted; failures are retried."""
+    mine = Job.objects.filter(id=job.id, locked_by=job.locked_by)
+    try:
+        handler = _HANDLERS.get(job.kind)
+        if handler is None:
+            raise LookupError(f"No handler registered for {job.kind!r}")
+        with transaction.atomic():
+            handler(job.payload)
+    except Exception as e:
+        log.exception("Job %s failed (attempt %s)", job, job.attempts)
+        if job.attempts >= _conf("MAX_ATTEMPTS"):
+            mine.update(status=Job.Status.FAILED, last_error=repr(e), locked_by="")
+        else:
+            mine.update(
+                status=Job.Status.QUEUED,
+                run_after=timezone.now() + timedelta(seconds=backoff(job.attempts)),
+                last_error=repr(e),
+                locked_by="",
+            )
+        return False
+    mine.delete()
+    return True
+
+
+def work(name: str, *, burst: bool = False) -> None:
+    """Worker loop: claim a batch, run it, sleep when the queue is empty."""
+    stopping = False
+
+    def _stop(*_):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+
+    log.info("Worker %s started", name)
+    while not stopping:
+        close_old_connections()
+        jobs = claim_jobs(worker=name, limit=_conf("BATCH_SIZE"))
+        for j in jobs:
+            run_job(j)
+        if not jobs:
+            if burst:
+                break
+            time.sleep(_conf("POLL_INTERVAL"))
+    log.info("Worker %s stopped", name)
+
+
+def queue_stats() -> Dict[str, Any]:
+    now = timezone.now()
+    by_status = dict(
+        Job.objects.values_list("status").annotate(n=Count("id")).order_by()
+    )
+    due = Job.objects.filter(status=Job.Status.QUEUED, run_after__lte=now)
+    oldest = due.aggregate(v=Min("run_after"))["v"]
+    by_kind = {
+        kind: n
+        for kind, n in Job.objects.filter(status=Job.Status.QUEUED)
+        .values_list("kind")
+        .annotate(n=Count("id"))
+        .order_by()
+    }
+    return {
+        "queued": by_status.get(Job.Status.QUEUED, 0),
+        "due": due.count(),
+        "running": by_status.get(Job.Status.RUNNING, 0),
+        "failed": by_status.get(Job.Status.FAILED, 0),
+        "oldest_due_seconds": (now - oldest).total_seconds() if oldest else 0,
+        "queued_by_kind": by_kind,
+    }
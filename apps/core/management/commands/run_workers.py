@@ -0,0 +1,59 @@
+# apps/core/management/commands/run_workers.py
+import multiprocessing
+import os
+import signal
+import socket
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from apps.core import jobs
+
+
+class Command(BaseCommand):
+    help = "Run background job workers (grading, notifications)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.JOBS["WORKERS"],
+            help="Number of worker processes.",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once the queue is empty.",
+        )
+
+    def handle(self, *args, workers, burst, **options):
+        jobs.autodiscover()
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        if workers <= 1:
+            jobs.work(f"{prefix}-0", burst=burst)
+            return
+
+        # forked children must not share the parent's DB sockets
+        connections.close_all()
+        ctx = multiprocessing.get_context("fork")
+        procs = [
+            ctx.Process(
+                target=jobs.work, args=(f"{prefix}-{i}",), kwargs={"burst": burst}
+            )
+            for i in range(workers)
+        ]
+        for p in procs:
+            p.start()
+        self.stdout.write(f"Started {workers} workers")
+
+        def _forward(signum, _frame):
+            for p in procs:
+                if p.is_alive():
+                    os.kill(p.pid, signum)
+
+        signal.signal(signal.SIGTERM, _forward)
+        signal.signal(signal.SIGINT, _forward)
+        for p in procs:
+            p.join()
+        self.stdout.write(self.style.SUCCESS("Workers stopped"))
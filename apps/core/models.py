@@ -1,3 +1,39 @@
+# apps/core/models.py
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+
+class Job(models.Model):
+    """Background job; rows are deleted once the handler succeeds."""
+
+    class Status(models.TextChoices):
+        QUEUED = "queued", "Queued"
+        RUNNING = "running", "Running"
+        FAILED = "failed", "Failed"
+
+    kind = models.CharField(max_length=64)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.QUEUED  # type: ignore[attr-defined]
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+
+    locked_by = models.CharField(max_length=64, blank=True, default="")
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default="")
+
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = "core_jobs"
+        ordering = ["run_after", "id"]
+        indexes = [
+            models.Index(
+                fields=["status", "run_after"], name="jobs_status_run_after_idx"
+            ),
+            models.Index(fields=["kind", "status"], name="jobs_kind_status_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}#{self.pk} {self.status}"
@@ -17,7 +17,7 @@ async def _tg_send_async(text: str, chat_id: str):
         "parse_mode": "HTML",
         "disable_web_page_preview": True,
     }
-    timeout = httpx.Timeout(connect=3.0, read=5.0)
+    timeout = httpx.Timeout(5.0, connect=3.0)
     async with httpx.AsyncClient(timeout=timeout) as client:
         r = await client.post(url, json=payload)
         r.raise_for_status()
@@ -31,3 +31,12 @@ def notify_telegram_admin_sync(text: str):
         anyio.run(_tg_send_async, text, settings.TELEGRAM_ADMIN_CHAT_ID)
     except Exception as e:
         log.warning("Telegram notify failed: %s", e)
+
+
+def send_telegram_user_sync(chat_id, text: str):
+    """Like the notify_* helpers, but errors propagate (callers are jobs that retry)."""
+    if not chat_id:
+        return
+    import anyio
+
+    anyio.run(_tg_send_async, text, str(chat_id))
@@ -0,0 +1,173 @@
+# apps/core/pagination.py
+from __future__ import annotations
+
+import base64
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination on ``(field, id)``: every page is an index range scan,
+    so there is no COUNT(*) and no OFFSET. The ordering comes from the view's
+    ``keyset_ordering`` (or the constructor for function views), e.g.
+    ``("-created_at", "-id")``; the last key must be unique.
+
+    Response: ``{"next": url|null, "previous": url|null, "results": [...]}``.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering: Sequence[str] = ("-created_at", "-id")
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self, ordering: Optional[Sequence[str]] = None):
+        if ordering is not None:
+            self.ordering = tuple(ordering)
+
+    # --- cursor encoding -------------------------------------------------
+    @staticmethod
+    def _encode(values: Sequence[Any], reverse: bool) -> str:
+        raw = json.dumps({"v": [str(v) for v in values], "r": int(reverse)})
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    def _decode(self, cursor: str) -> Tuple[List[str], bool]:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            values, reverse = data["v"], bool(data["r"])
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values, reverse
+
+    # --- query -----------------------------------------------------------
+    def _fields(self) -> List[Tuple[str, bool]]:
+        return [(o.lstrip("-"), o.startswith("-")) for o in self.ordering]
+
+    def _after(self, queryset, values: List[str], reverse: bool):
+        """Rows strictly after the cursor in the (possibly reversed) ordering."""
+        model = queryset.model
+        try:
+            parsed = [
+                model._meta.get_field(name).to_python(raw)
+                for (name, _), raw in zip(self._fields(), values)
+            ]
+        except (ValidationError, ValueError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+        if any(value is None for value in parsed):
+            raise NotFound(self.invalid_cursor_message)
+        cond = Q()
+        eq = Q()
+        bound = None
+        for i, ((name, desc), value) in enumerate(zip(self._fields(), parsed)):
+            op = "lt" if desc != reverse else "gt"
+            cond |= eq & Q(**{f"{name}__{op}": value})
+            eq &= Q(**{name: value})
+            if i == 0:
+                # lets the planner start the range scan at the cursor
+                bound = Q(**{f"{name}__{op}e": value})
+        return queryset.filter(bound & cond)
+
+    def get_page_size(self, request) -> int:
+        size = api_settings.PAGE_SIZE or 20
+        raw = request.query_params.get(self.page_size_query_param)
+        if raw:
+            try:
+                size = int(raw)
+            except ValueError:
+                pass
+        return max(1, min(size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if view is not None and getattr(view, "keyset_ordering", None):
+            self.ordering = tuple(view.keyset_ordering)
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        reverse = False
+        if cursor:
+            values, reverse = self._decode(cursor)
+            queryset = self._after(queryset, values, reverse)
+
+        order = [
+            (f"-{name}" if desc != reverse else name) for name, desc in self._fields()
+        ]
+        rows = list(queryset.order_by(*order)[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.page = rows
+        self.has_next = has_more if not reverse else True
+        self.has_previous = bool(cursor) and (has_more if reverse else True)
+        return rows
+
+    def _link(self, row, reverse: bool) -> str:
+        values = [getattr(row, name) for name, _ in self._fields()]
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, self._encode(values, reverse)
+        )
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next or not self.page:
+            return None
+        return self._link(self.page[-1], reverse=False)
+
+    def get_previous_link(self) -> Optional[str]:
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self._link(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Sahifa kursori (`next`/`previous` havolasidan).",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": f"Sahifa hajmi (maks. {self.max_page_size}).",
+                "schema": {"type": "integer"},
+            },
+        ]
@@ -0,0 +1,7 @@
+# apps/core/urls.py
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path("jobs/stats/", views.job_stats, name="job-stats"),
+]
@@ -1,3 +1,18 @@
-from django.shortcuts import render
+# apps/core/views.py
+from drf_spectacular.utils import extend_schema
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
 
-# Create your views here.
+from apps.users.permissions import IsSuperAdmin
+from .jobs import queue_stats
+
+
+@extend_schema(
+    tags=["Core"],
+    summary="Fon vazifalari navbati statistikasi (faqat superadmin)",
+    responses={200: dict},
+)
+@api_view(["GET"])
+@permission_classes([IsSuperAdmin])
+def job_stats(request):
+    return Response(queue_stats())
@@ -3,7 +3,7 @@ from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 
-from .models import Payment
+from .models import ClickWebhookEvent, Payment
 
 
 @admin.register(Payment)
@@ -88,3 +88,13 @@ class PaymentAdmin(admin.ModelAdmin):
 
     def has_delete_permission(self, request, obj=None):
         return False
+
+
+@admin.register(ClickWebhookEvent)
+class ClickWebhookEventAdmin(admin.ModelAdmin):
+    list_display = ("click_trans_id", "action", "payment_id", "created_at")
+    list_filter = ("action",)
+    search_fields = ("click_trans_id", "payment_id")
+    readonly_fields = [f.name for f in ClickWebhookEvent._meta.fields]
+    ordering = ("-created_at",)
+    list_per_page = 50
@@ -0,0 +1,54 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.payments.reconcile import get_client, reconcile, unresolved_stats
+
+
+class Command(BaseCommand):
+    help = "Resolve stale created/pending payments by asking the provider."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--every",
+            type=int,
+            default=0,
+            help="Repeat every N seconds (0 = run once).",
+        )
+        parser.add_argument(
+            "--older-than",
+            type=int,
+            default=settings.PAYMENTS["RECONCILE_AFTER"],
+            help="Only payments without a final callback for N seconds.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.PAYMENTS["RECONCILE_BATCH"],
+        )
+        parser.add_argument(
+            "--stats",
+            action="store_true",
+            help="Only print unresolved payment counts and ages.",
+        )
+
+    def handle(self, *args, every, older_than, batch_size, stats, **options):
+        if stats:
+            for status, s in unresolved_stats().items():
+                self.stdout.write(
+                    f"{status}: {s['count']} ({s['stale']} stale), "
+                    f"oldest {s['oldest_seconds']:.0f}s"
+                )
+            return
+        with get_client() as client:
+            while True:
+                totals = reconcile(
+                    client, older_than=timedelta(seconds=older_than), batch=batch_size
+                )
+                if totals["checked"]:
+                    self.stdout.write(", ".join(f"{k}={v}" for k, v in totals.items()))
+                if every <= 0:
+                    return
+                time.sleep(every)
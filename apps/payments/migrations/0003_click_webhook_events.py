@@ -0,0 +1,34 @@
+# Generated by Django 5.2.6 on 2026-10-18 03:26
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payments", "0002_alter_payment_error_note"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ClickWebhookEvent",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("click_trans_id", models.CharField(max_length=64)),
+                ("action", models.CharField(max_length=16)),
+                ("payment_id", models.UUIDField(db_index=True)),
+                ("payload", models.JSONField(default=dict)),
+                ("response", models.JSONField(default=dict)),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                "db_table": "payment_click_events",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("click_trans_id", "action"), name="uniq_click_event"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-18 03:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payments", "0003_click_webhook_events"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="payment",
+            index=models.Index(
+                condition=models.Q(("status__in", ["created", "pending"])),
+                fields=["status", "created_at"],
+                name="pay_open_status_created_idx",
+            ),
+        ),
+    ]
@@ -64,6 +64,14 @@ class Payment(models.Model):
         indexes = [
             models.Index(fields=["student", "status"], name="pay_student_status_idx"),
             models.Index(fields=["created_at"], name="pay_created_idx"),
+            # only unresolved rows, walked by the reconciler
+            models.Index(
+                fields=["status", "created_at"],
+                name="pay_open_status_created_idx",
+                condition=models.Q(
+                    status__in=[PaymentStatus.CREATED, PaymentStatus.PENDING]
+                ),
+            ),
         ]
         constraints = [
             models.UniqueConstraint(
@@ -75,3 +83,30 @@ class Payment(models.Model):
 
     def __str__(self):
         return f"Payment<{self.id}> {self.provider} {self.status} {self.amount} {self.currency}"
+
+
+class ClickWebhookEvent(models.Model):
+    """
+    Append-only log of processed Click calls. The unique key makes a
+    redelivered (click_trans_id, action) pair a no-op that replays the
+    stored response.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    click_trans_id = models.CharField(max_length=64)
+    action = models.CharField(max_length=16)
+    payment_id = models.UUIDField(db_index=True)
+    payload = models.JSONField(default=dict)
+    response = models.JSONField(default=dict)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = "payment_click_events"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["click_trans_id", "action"], name="uniq_click_event"
+            )
+        ]
+
+    def __str__(self):
+        return f"ClickEvent<{self.click_trans_id}:{self.action}> {self.payment_id}"
@@ -0,0 +1,298 @@
+# apps/payments/reconcile.py
+"""
+Resolves payments that never got a final Click callback. Stale CREATED /
+PENDING rows are read without locks, their state is asked from the
+provider, and the answers are applied with the same guarded UPDATEs the
+webhook uses, so a late callback and the reconciler cannot double-credit
+or downgrade each other.
+"""
+from __future__ import annotations
+
+import abc
+import hashlib
+import logging
+import time
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+import httpx
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Payment, PaymentStatus
+from .services import emit_status, mark_payment_paid_and_topup
+
+log = logging.getLogger(__name__)
+
+__all__ = (
+    "OPEN_STATUSES",
+    "NOT_FOUND",
+    "AMOUNT_MISMATCH",
+    "ProviderResult",
+    "ReconcileClient",
+    "ClickStatusClient",
+    "FakeClient",
+    "get_client",
+    "stale_payments",
+    "apply_results",
+    "reconcile",
+    "unresolved_stats",
+)
+
+OPEN_STATUSES = (PaymentStatus.CREATED, PaymentStatus.PENDING)
+
+# provider has no record of the payment (e.g. the user never paid)
+NOT_FOUND = "not_found"
+# paid at the provider, but not the amount we would credit: left open and
+# flagged for a manual look instead
+AMOUNT_MISMATCH = "amount_mismatch"
+
+
+class ProviderResult(NamedTuple):
+    status: str  # a PaymentStatus value or NOT_FOUND
+    payload: Dict[str, Any]
+    amount: Optional[Decimal] = None  # what the provider says was paid
+
+
+class ReconcileClient(abc.ABC):
+    @abc.abstractmethod
+    def fetch(self, payments: Sequence[Payment]) -> Dict[Any, ProviderResult]:
+        """Maps payment id -> provider state; ids it could not check are left out."""
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "ReconcileClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class ClickStatusClient(ReconcileClient):
+    """Click Merchant API: payment/status and payment/status_by_mti."""
+
+    def __init__(self) -> None:
+        conf = settings.CLICK
+        self.service_id = conf["SERVICE_ID"]
+        self.merchant_user_id = conf["MERCHANT_USER_ID"]
+        self.secret = conf["SECRET_KEY"]
+        self._client = httpx.Client(
+            base_url=conf["API_URL"], timeout=httpx.Timeout(10.0, connect=3.0)
+        )
+
+    def _get(self, path: str) -> Dict[str, Any]:
+        ts = str(int(time.time()))
+        digest = hashlib.sha1((ts + self.secret).encode()).hexdigest()
+        r = self._client.get(
+            path,
+            headers={
+                "Accept": "application/json",
+                "Auth": f"{self.merchant_user_id}:{digest}:{ts}",
+            },
+        )
+        r.raise_for_status()
+        return r.json()
+
+    def close(self) -> None:
+        self._client.close()
+
+    def _one(self, payment: Payment) -> ProviderResult:
+        click_id = payment.provider_txn_id
+        if not click_id:
+            day = timezone.localdate(payment.created_at).isoformat()
+            data = self._get(
+                f"/payment/status_by_mti/{self.service_id}/{payment.id}/{day}"
+            )
+            if int(data.get("error_code", 0)) != 0 or not data.get("payment_id"):
+                return ProviderResult(NOT_FOUND, data)
+            click_id = data["payment_id"]
+        data = self._get(f"/payment/status/{self.service_id}/{click_id}")
+        if int(data.get("error_code", 0)) != 0:
+            return ProviderResult(NOT_FOUND, data)
+        code = int(data.get("payment_status", 0))
+        if code == 2:
+            try:
+                amount = Decimal(str(data.get("payment_amount")))
+            except InvalidOperation:
+                amount = None
+            return ProviderResult(PaymentStatus.PAID, data, amount)
+        if code == -99:
+            return ProviderResult(PaymentStatus.CANCELED, data)
+        if code < 0:
+            return ProviderResult(PaymentStatus.FAILED, data)
+        return ProviderResult(PaymentStatus.PENDING, data)
+
+    def fetch(self, payments: Sequence[Payment]) -> Dict[Any, ProviderResult]:
+        out: Dict[Any, ProviderResult] = {}
+        for p in payments:
+            try:
+                out[p.id] = self._one(p)
+            except (httpx.HTTPError, ValueError) as e:
+                log.warning("Click status check failed for %s: %s", p.id, e)
+        return out
+
+
+class FakeClient(ReconcileClient):
+    """
+    Local stand-in for the provider: answers from ``outcomes``
+    (payment id -> status), everything else gets ``default``.
+    """
+
+    outcomes: Dict[str, str] = {}
+    default = NOT_FOUND
+
+    def fetch(self, payments: Sequence[Payment]) -> Dict[Any, ProviderResult]:
+        return {
+            p.id: ProviderResult(
+                self.outcomes.get(str(p.id), self.default), {"fake": True}, p.amount
+            )
+            for p in payments
+        }
+
+
+def get_client() -> ReconcileClient:
+    return import_string(settings.PAYMENTS["RECONCILE_CLIENT"])()
+
+
+def stale_payments(
+    status: str, *, before, limit: int, after: Optional[tuple] = None
+) -> List[Payment]:
+    """
+    The next ``limit`` payments in ``status`` created before ``before``,
+    walked by (created_at, id) along pay_open_status_created_idx.
+    """
+    qs = Payment.objects.filter(status=status, created_at__lt=before)
+    if after is not None:
+        created_at, pk = after
+        qs = qs.filter(
+            Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+        )
+    return list(
+        qs.order_by("created_at", "id").only(
+            "id", "status", "created_at", "provider_txn_id", "amount"
+        )[:limit]
+    )
+
+
+def apply_results(
+    payments: Iterable[Payment], results: Dict[Any, ProviderResult], *, expire_before
+) -> Dict[str, int]:
+    """
+    Paid payments are credited one by one (each needs its ledger entry);
+    failed, canceled and expired ones are closed with one UPDATE per outcome.
+    A paid result whose amount differs from the payment (or is missing) is
+    not credited: the payment stays open with error_code=amount_mismatch.
+    Returns the number of payments moved (or flagged) per outcome.
+    """
+    paid: List[Payment] = []
+    mismatched: List[Payment] = []
+    close: Dict[str, List] = {PaymentStatus.FAILED: [], PaymentStatus.CANCELED: []}
+    for p in payments:
+        res = results.get(p.id)
+        if res is None:
+            continue
+        if res.status == PaymentStatus.PAID:
+            if res.amount is None or res.amount != p.amount:
+                mismatched.append(p)
+            else:
+                paid.append(p)
+        elif res.status in close:
+            close[res.status].append(p.id)
+        elif p.created_at < expire_before:
+            # pending at the provider or unknown to it for too long
+            close[PaymentStatus.CANCELED].append(p.id)
+
+    moved = {PaymentStatus.PAID: 0, **{s: 0 for s in close}, AMOUNT_MISMATCH: 0}
+    for p in mismatched:
+        got = results[p.id].amount
+        log.error("Payment %s: provider paid %s, expected %s", p.id, got, p.amount)
+        moved[AMOUNT_MISMATCH] += Payment.objects.filter(
+            id=p.id, status__in=OPEN_STATUSES
+        ).update(
+            error_code=AMOUNT_MISMATCH,
+            error_note=f"Reconcile: provider amount {got}, expected {p.amount}",
+            provider_payload=results[p.id].payload,
+            updated_at=timezone.now(),
+        )
+    for p in paid:
+        status = mark_payment_paid_and_topup(
+            payment_id=p.id,
+            webhook_payload={"reconciled": True, **results[p.id].payload},
+        )
+        moved[PaymentStatus.PAID] += status == PaymentStatus.PAID
+    now = timezone.now()
+    for status, ids in close.items():
+        if not ids:
+            continue
+        with transaction.atomic():
+            moved[status] += Payment.objects.filter(
+                id__in=ids, status__in=OPEN_STATUSES
+            ).update(
+                status=status,
+                error_note="Reconciled: no final callback from provider",
+                updated_at=now,
+            )
+            # waiters re-read the row, so a raced id only costs a wake-up
+            for pk in ids:
+                emit_status(pk, status)
+    return moved
+
+
+def reconcile(
+    client: Optional[ReconcileClient] = None,
+    *,
+    older_than: Optional[timedelta] = None,
+    batch: Optional[int] = None,
+) -> Dict[str, int]:
+    """One pass over every stale open payment; returns counts per outcome."""
+    if client is None:
+        with get_client() as client:
+            return reconcile(client, older_than=older_than, batch=batch)
+    conf = settings.PAYMENTS
+    older_than = older_than or timedelta(seconds=conf["RECONCILE_AFTER"])
+    batch = batch or conf["RECONCILE_BATCH"]
+    now = timezone.now()
+    expire_before = now - timedelta(seconds=conf["EXPIRE_AFTER"])
+
+    totals = {"checked": 0}
+    for status in OPEN_STATUSES:
+        after = None
+        while page := stale_payments(
+            status, before=now - older_than, limit=batch, after=after
+        ):
+            after = (page[-1].created_at, page[-1].id)
+            moved = apply_results(page, client.fetch(page), expire_before=expire_before)
+            totals["checked"] += len(page)
+            for k, n in moved.items():
+                totals[k] = totals.get(k, 0) + n
+    return totals
+
+
+def unresolved_stats() -> Dict[str, Any]:
+    now = timezone.now()
+    stale_before = now - timedelta(seconds=settings.PAYMENTS["RECONCILE_AFTER"])
+    rows = (
+        Payment.objects.filter(status__in=OPEN_STATUSES)
+        .values("status")
+        .annotate(
+            n=Count("id"),
+            stale=Count("id", filter=Q(created_at__lt=stale_before)),
+            oldest=Min("created_at"),
+        )
+        .order_by()
+    )
+    out: Dict[str, Any] = {
+        s: {"count": 0, "stale": 0, "oldest_seconds": 0} for s in OPEN_STATUSES
+    }
+    for r in rows:
+        out[r["status"]] = {
+            "count": r["n"],
+            "stale": r["stale"],
+            "oldest_seconds": (now - r["oldest"]).total_seconds(),
+        }
+    return out
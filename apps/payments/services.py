@@ -1,16 +1,33 @@
 # apps/payments/services.py
 import hashlib
 import hmac
-from decimal import Decimal
-from typing import Dict, Any
+import json
+from typing import Dict, Any, Optional, Tuple
 
 from django.conf import settings
-from django.db import transaction
-from django.db.models import F
+from django.db import connection, transaction
 from django.utils import timezone
 
-from apps.profiles.models import StudentProfile, StudentTopUpLog
-from .models import Payment, PaymentStatus
+from apps.core.events import publish
+from apps.profiles.ledger import credit
+from apps.profiles.models import BalanceEntry
+from .models import ClickWebhookEvent, Payment, PaymentStatus
+
+CLICK_PREPARE_ACTIONS = frozenset({"prepare", "check"})
+CLICK_COMPLETE_ACTIONS = frozenset({"complete", "pay"})
+CLICK_ACTIONS = CLICK_PREPARE_ACTIONS | CLICK_COMPLETE_ACTIONS | {"cancel"}
+
+
+def payment_channel(payment_id) -> str:
+    return f"payments:{payment_id}"
+
+
+def emit_status(payment_id, status: str) -> None:
+    """Wakes status waiters of the payment once the transaction commits."""
+    publish(
+        payment_channel(payment_id),
+        {"type": "payment.status", "payment_id": payment_id, "status": status},
+    )
 
 
 def _click_sign(payload: Dict[str, Any]) -> str:
@@ -31,68 +48,226 @@ def verify_click_request(payload: Dict[str, Any]) -> bool:
     return provided == expected
 
 
-@transaction.atomic
-def mark_payment_paid_and_topup(
-    *, payment: Payment, webhook_payload: Dict[str, Any]
-) -> Payment:
+def _current_status(payment_id) -> str:
+    return Payment.objects.values_list("status", flat=True).get(id=payment_id)
 
-    if payment.status == PaymentStatus.PAID:
-        return payment
-    amount = Decimal(str(payment.amount))
 
-    StudentProfile.objects.filter(pk=payment.student.pk).update(
-        balance=F("balance") + amount
+def mark_payment_pending(*, payment_id, webhook_payload: Dict[str, Any]) -> str:
+    """prepare/check: created/failed/canceled -> pending. Returns the status."""
+    updated = Payment.objects.filter(
+        id=payment_id,
+        status__in=[
+            PaymentStatus.CREATED,
+            PaymentStatus.FAILED,
+            PaymentStatus.CANCELED,
+        ],
+    ).update(
+        status=PaymentStatus.PENDING,
+        provider_invoice_id=str(webhook_payload.get("invoice_id", "")),
+        provider_txn_id=str(webhook_payload.get("click_trans_id", "")),
+        provider_payload=webhook_payload,
+        error_code=str(webhook_payload.get("error", "0")),
+        error_note=webhook_payload.get("error_note", ""),
+        updated_at=timezone.now(),
     )
+    if not updated:
+        return _current_status(payment_id)
+    emit_status(payment_id, PaymentStatus.PENDING)
+    return PaymentStatus.PENDING
+
+
+_MARK_PAID_SQL = f"""
+    UPDATE {Payment._meta.db_table}
+       SET status = %s, provider_payload = %s::jsonb,
+           completed_at = %s, updated_at = %s
+     WHERE id = %s AND status <> %s
+    RETURNING student_id, amount
+"""
 
-    payment.student.refresh_from_db(fields=["balance"])
 
-    StudentTopUpLog.objects.create(
-        student=payment.student,
+@transaction.atomic
+def mark_payment_paid_and_topup(*, payment_id, webhook_payload: Dict[str, Any]) -> str:
+    """
+    complete: any status but paid -> paid, and the amount is credited.
+    The guarded UPDATE is the only lock taken, so a concurrent duplicate
+    waits on it and then matches no row instead of crediting twice.
+    """
+    now = timezone.now()
+    with connection.cursor() as cur:
+        cur.execute(
+            _MARK_PAID_SQL,
+            [
+                PaymentStatus.PAID,
+                json.dumps(webhook_payload or {}, default=str),
+                now,
+                now,
+                payment_id,
+                PaymentStatus.PAID,
+            ],
+        )
+        row = cur.fetchone()
+        if row is None:
+            return _current_status(payment_id)
+    student_id, amount = row
+
+    credit(
+        student_id=student_id,
         amount=amount,
-        new_balance=payment.student.balance,
-        actor=None,
-        note=f"Click top-up Payment<{payment.id}>",
+        kind=BalanceEntry.Kind.PAYMENT,
+        note=f"Click top-up Payment<{payment_id}>",
+        reference=payment_id,
     )
+    emit_status(payment_id, PaymentStatus.PAID)
+    return PaymentStatus.PAID
 
-    payment.status = PaymentStatus.PAID
-    payment.provider_payload = webhook_payload or {}
-    payment.completed_at = timezone.now()
-    payment.save(
-        update_fields=[
-            "status",
-            "provider_payload",
-            "completed_at",
-            "updated_at",
-        ]
-    )
 
-    return payment
+def _close_unpaid(
+    *,
+    payment_id,
+    new_status: str,
+    webhook_payload: Dict[str, Any],
+    error_code: str | None,
+    error_note: str | None,
+) -> str:
+    fields: Dict[str, Any] = {
+        "status": new_status,
+        "provider_payload": webhook_payload or {},
+        "updated_at": timezone.now(),
+    }
+    if error_code:
+        fields["error_code"] = error_code
+    if error_note:
+        fields["error_note"] = error_note
+    updated = (
+        Payment.objects.filter(id=payment_id)
+        .exclude(status=PaymentStatus.PAID)
+        .update(**fields)
+    )
+    if not updated:
+        return _current_status(payment_id)
+    emit_status(payment_id, new_status)
+    return new_status
 
 
 def mark_payment_failed(
     *,
-    payment: Payment,
+    payment_id,
     webhook_payload: Dict[str, Any],
     error_code: str | None = None,
     error_note: str | None = None,
-) -> Payment:
+) -> str:
+    """A paid payment is never downgraded; returns the resulting status."""
+    return _close_unpaid(
+        payment_id=payment_id,
+        new_status=PaymentStatus.FAILED,
+        webhook_payload=webhook_payload,
+        error_code=error_code or str(webhook_payload.get("error", "") or ""),
+        error_note=error_note or webhook_payload.get("error_note", ""),
+    )
 
-    payment.status = PaymentStatus.FAILED
-    payment.provider_payload = webhook_payload or {}
 
-    error_code = error_code or str(webhook_payload.get("error", "") or "")
-    error_note = error_note or webhook_payload.get("error_note", "")
+def mark_payment_canceled(
+    *,
+    payment_id,
+    webhook_payload: Dict[str, Any],
+    error_code: str | None = None,
+    error_note: str | None = None,
+) -> str:
+    return _close_unpaid(
+        payment_id=payment_id,
+        new_status=PaymentStatus.CANCELED,
+        webhook_payload=webhook_payload,
+        error_code=error_code,
+        error_note=error_note or "Canceled by user/provider",
+    )
 
-    if error_code:
-        payment.error_code = error_code
-    if error_note:
-        payment.error_note = error_note
 
-    update_fields = ["status", "provider_payload", "updated_at"]
-    if error_code:
-        update_fields.append("error_code")
-    if error_note:
-        update_fields.append("error_note")
+_LOG_EVENT_SQL = f"""
+    INSERT INTO {ClickWebhookEvent._meta.db_table}
+        (click_trans_id, action, payment_id, payload, response, created_at)
+    VALUES (%s, %s, %s, %s::jsonb, '{{}}'::jsonb, %s)
+    ON CONFLICT (click_trans_id, action) DO NOTHING
+    RETURNING id
+"""
+
+
+def _log_click_event(
+    *, click_trans_id: str, action: str, payment_id, payload: Dict[str, Any]
+) -> Tuple[Optional[int], Optional[Dict[str, Any]]]:
+    """
+    Returns (new event id, None), or (None, stored response) for a repeat.
+    A repeat of a call still in flight waits on the unique index entry,
+    not on the Payment row, and sees the response once the first commits.
+    """
+    with connection.cursor() as cur:
+        cur.execute(
+            _LOG_EVENT_SQL,
+            [
+                click_trans_id,
+                action,
+                payment_id,
+                json.dumps(payload, default=str),
+                timezone.now(),
+            ],
+        )
+        row = cur.fetchone()
+    if row is not None:
+        return row[0], None
+    stored = ClickWebhookEvent.objects.values_list("response", flat=True).get(
+        click_trans_id=click_trans_id, action=action
+    )
+    return None, stored
+
+
+@transaction.atomic
+def handle_click_event(
+    *, payment_id, action: str, payload: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Applies one Click call (prepare/check/complete/pay/cancel) and returns
+    the response body. Raises Payment.DoesNotExist for unknown payments.
+    """
+    if not Payment.objects.filter(id=payment_id).exists():
+        raise Payment.DoesNotExist
+
+    event_id = None
+    click_trans_id = str(payload.get("click_trans_id") or "")
+    if click_trans_id:
+        event_id, stored = _log_click_event(
+            click_trans_id=click_trans_id,
+            action=action,
+            payment_id=payment_id,
+            payload=payload,
+        )
+        if stored is not None:
+            return stored
+
+    error = str(payload.get("error", "0"))
+    error_note = payload.get("error_note", "")
+    if action in CLICK_PREPARE_ACTIONS:
+        new_status = mark_payment_pending(
+            payment_id=payment_id, webhook_payload=payload
+        )
+    elif action in CLICK_COMPLETE_ACTIONS and error != "0":
+        new_status = mark_payment_failed(
+            payment_id=payment_id,
+            webhook_payload=payload,
+            error_code=error,
+            error_note=error_note,
+        )
+    elif action in CLICK_COMPLETE_ACTIONS:
+        new_status = mark_payment_paid_and_topup(
+            payment_id=payment_id, webhook_payload=payload
+        )
+    else:
+        new_status = mark_payment_canceled(
+            payment_id=payment_id,
+            webhook_payload=payload,
+            error_code=error,
+            error_note=error_note,
+        )
 
-    payment.save(update_fields=update_fields)
-    return payment
+    response = {"status": new_status, "payment_id": str(payment_id)}
+    if event_id is not None:
+        ClickWebhookEvent.objects.filter(id=event_id).update(response=response)
+    return response
@@ -8,5 +8,8 @@ app_name = "payments"
 urlpatterns = [
     path("topup/", views.create_topup, name="create-topup"),
     path("status/", views.payment_status, name="payment-status"),
+    path("status/wait/", views.payment_status_wait, name="payment-status-wait"),
+    path("status/events/", views.payment_status_events, name="payment-status-events"),
     path("click/webhook/", views.click_webhook, name="click-webhook"),
+    path("reconcile/stats/", views.reconcile_stats, name="reconcile-stats"),
 ]
@@ -1,12 +1,15 @@
 #  apps/payments/views.py
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import logging
+import math
 from uuid import UUID
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from django.db import transaction
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404
 from django.views.decorators.csrf import csrf_exempt
 from drf_spectacular.types import OpenApiTypes
@@ -15,8 +18,11 @@ from rest_framework import permissions, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 
+from apps.core.events import sse_response, stream_user, subscription
 from apps.profiles.models import StudentProfile
+from apps.users.permissions import IsSuperAdmin
 from .models import Payment, PaymentStatus, PaymentProvider
+from .reconcile import unresolved_stats
 from .serializers import (
     PaymentCreateSerializer,
     PaymentPublicSerializer,
@@ -43,8 +49,11 @@ def verify_click_request(payload: dict) -> bool:
 
 
 from .services import (
+    CLICK_ACTIONS,
+    CLICK_COMPLETE_ACTIONS,
+    handle_click_event,
     mark_payment_failed as svc_mark_payment_failed,
-    mark_payment_paid_and_topup as svc_mark_payment_paid_and_topup,
+    payment_channel,
 )
 
 
@@ -136,6 +145,7 @@ def create_topup(request):
 )
 @csrf_exempt
 @api_view(["POST"])
+@permission_classes([permissions.AllowAny])  # guarded by IP allowlist + signature
 def click_webhook(request):
     allowed_ips = set(settings.CLICK.get("ALLOWED_IPS", []))
     remote_ip = request.META.get("REMOTE_ADDR", "")
@@ -144,7 +154,8 @@ def click_webhook(request):
         log.warning("❌ Click webhook blocked by IP: %s", remote_ip)
         return Response({"error": "IP not allowed"}, status=status.HTTP_403_FORBIDDEN)
 
-    payload = request.data.copy()
+    data = request.data
+    payload = data.dict() if hasattr(data, "dict") else dict(data)
 
     if not verify_click_request(payload):
         log.warning("❌ Click webhook invalid signature: %s", payload)
@@ -161,76 +172,24 @@ def click_webhook(request):
         )
 
     action = str(payload.get("action", "")).lower()
-    error = str(payload.get("error", "0"))
-    error_note = payload.get("error_note", "")
-
-    with transaction.atomic():
-        payment = get_object_or_404(
-            Payment.objects.select_for_update(), id=payment_id  # noqa
-        )  # noqa
-
-        if action in {"prepare", "check"}:
-            if payment.status in {
-                PaymentStatus.CREATED,
-                PaymentStatus.FAILED,
-                PaymentStatus.CANCELED,
-            }:
-                payment.status = PaymentStatus.PENDING
-                payment.provider_invoice_id = payload.get("invoice_id", "")
-                payment.provider_txn_id = payload.get("click_trans_id", "")
-                payment.provider_payload = payload
-                payment.error_code = error
-                payment.error_note = error_note
-                payment.save(
-                    update_fields=[
-                        "status",
-                        "provider_invoice_id",
-                        "provider_txn_id",
-                        "provider_payload",
-                        "error_code",
-                        "error_note",
-                        "updated_at",
-                    ]
-                )
-            return Response({"status": "pending", "payment_id": str(payment.id)})
-
-        if action in {"complete", "pay"}:
-            if error != "0":
-                svc_mark_payment_failed(
-                    payment, payload, error_code=error, error_note=error_note  # noqa
-                )  # noqa
-                return Response({"status": "failed", "payment_id": str(payment.id)})
-
-            try:
-                svc_mark_payment_paid_and_topup(payment, payload)
-            except Exception as exc:
-                log.exception("❌ Top-up failed for payment %s: %s", payment.id, exc)
-                svc_mark_payment_failed(payment, payload)  # noqa
-                return Response(
-                    {"error": "Top-up failed"},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                )
-
-            return Response({"status": "paid", "payment_id": str(payment.id)})
-
-        if action == "cancel":
-            payment.status = PaymentStatus.CANCELED
-            payment.provider_payload = payload
-            payment.error_code = error
-            payment.error_note = error_note or "Canceled by user/provider"
-            payment.save(
-                update_fields=[
-                    "status",
-                    "provider_payload",
-                    "error_code",
-                    "error_note",
-                    "updated_at",
-                ]
-            )
-            return Response({"status": "canceled", "payment_id": str(payment.id)})
-
+    if action not in CLICK_ACTIONS:
         return Response({"error": "Unknown action"}, status=status.HTTP_400_BAD_REQUEST)
 
+    try:
+        body = handle_click_event(payment_id=payment_id, action=action, payload=payload)
+    except Payment.DoesNotExist:
+        raise Http404
+    except Exception as exc:
+        if action not in CLICK_COMPLETE_ACTIONS:
+            raise
+        log.exception("❌ Top-up failed for payment %s: %s", payment_id, exc)
+        svc_mark_payment_failed(payment_id=payment_id, webhook_payload=payload)
+        return Response(
+            {"error": "Top-up failed"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+    return Response(body)
+
 
 @extend_schema(
     tags=["Payments"],
@@ -252,3 +211,94 @@ def payment_status(request):
     pid = request.query_params.get("payment_id")
     payment = get_object_or_404(Payment, id=pid, student__user=request.user)
     return Response(PaymentDetailSerializer(payment).data)
+
+
+FINAL_STATUSES = {PaymentStatus.PAID, PaymentStatus.FAILED, PaymentStatus.CANCELED}
+
+
+def _payment_detail(payment_id, user):
+    payment = Payment.objects.filter(id=payment_id, student__user=user).first()
+    return PaymentDetailSerializer(payment).data if payment else None
+
+
+def _payment_id(request):
+    try:
+        return UUID(request.GET.get("payment_id", ""))
+    except ValueError:
+        return None
+
+
+async def payment_status_wait(request):
+    """
+    Long-poll variant of ``payment_status`` (ASGI only). Answers at once
+    when the status is final or differs from ``?since=``, otherwise as soon
+    as the webhook or reconciler moves the payment, or after ``?timeout=``
+    seconds with the unchanged status. Auth: ``Authorization: Bearer``.
+    """
+    user = await stream_user(request)
+    if user is None:
+        return JsonResponse({"detail": "Authentication required."}, status=401)
+    pid = _payment_id(request)
+    if pid is None:
+        return JsonResponse({"error": "payment_id noto'g'ri"}, status=400)
+    max_wait = settings.PAYMENTS["STATUS_WAIT_SECONDS"]
+    try:
+        timeout = float(request.GET.get("timeout", max_wait))
+    except ValueError:
+        timeout = max_wait
+    if not math.isfinite(timeout):
+        return JsonResponse({"error": "timeout noto'g'ri"}, status=400)
+    timeout = min(max(timeout, 0), max_wait)
+    since = request.GET.get("since", "")
+
+    # subscribe before reading, so a change in between still wakes us
+    async with subscription([payment_channel(pid)]) as q:
+        data = await sync_to_async(_payment_detail)(pid, user)
+        if data is None:
+            return JsonResponse({"detail": "Not found."}, status=404)
+        if data["status"] in FINAL_STATUSES or (since and data["status"] != since):
+            return JsonResponse(data)
+        try:
+            await asyncio.wait_for(q.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return JsonResponse(data)
+    data = await sync_to_async(_payment_detail)(pid, user)
+    return JsonResponse(data)
+
+
+async def payment_status_events(request):
+    """
+    SSE stream of ``payment.status`` events for one payment (ASGI only);
+    the current status is sent first. Auth: ``Authorization: Bearer`` or
+    ``?token=``. Clients close it once the status is final.
+    """
+    user = await stream_user(request)
+    if user is None:
+        return JsonResponse({"detail": "Authentication required."}, status=401)
+    pid = _payment_id(request)
+    if pid is None:
+        return JsonResponse({"error": "payment_id noto'g'ri"}, status=400)
+    owned = Payment.objects.filter(id=pid, student__user=user)
+    if not await owned.aexists():
+        return JsonResponse({"detail": "Not found."}, status=404)
+
+    async def snapshot():
+        current = await Payment.objects.values_list("status", flat=True).aget(id=pid)
+        return {"type": "payment.status", "payment_id": pid, "status": current}
+
+    return sse_response([payment_channel(pid)], snapshot)
+
+
+@extend_schema(
+    tags=["Payments"],
+    summary="Yakunlanmagan to'lovlar statistikasi (faqat superadmin)",
+    description=(
+        "`created` va `pending` holatidagi to'lovlar soni, ulardan qanchasi "
+        "eskirgani (`stale`) va eng eskisining yoshi (soniyada)."
+    ),
+    responses={200: dict},
+)
+@api_view(["GET"])
+@permission_classes([IsSuperAdmin])
+def reconcile_stats(request):
+    return Response(unresolved_stats())
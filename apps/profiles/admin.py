@@ -3,15 +3,20 @@ from __future__ import annotations
 
 from decimal import Decimal
 
+from django.conf import settings
 from django.contrib import admin, messages
 from django.db import transaction
+from django.urls import reverse
+from django.utils.html import format_html
 from django.utils.timezone import localtime
 
+from .bulk import apply_action, start_bulk_action
 from .models import (
+    BalanceEntry,
+    StudentBulkAction,
     StudentProfile,
     TeacherProfile,
     StudentApprovalLog,
-    StudentTopUpLog,
 )
 
 
@@ -28,12 +33,12 @@ class StudentApprovalLogInline(admin.TabularInline):
         return False
 
 
-class StudentTopUpLogInline(admin.TabularInline):
-    model = StudentTopUpLog
+class BalanceEntryInline(admin.TabularInline):
+    model = BalanceEntry
     extra = 0
     can_delete = False
-    fields = ("created_at", "amount", "new_balance", "actor", "note")
-    readonly_fields = ("created_at", "amount", "new_balance", "actor", "note")
+    fields = ("created_at", "kind", "amount", "balance_after", "actor", "note")
+    readonly_fields = ("created_at", "kind", "amount", "balance_after", "actor", "note")
     ordering = ("-created_at",)
     show_change_link = False
 
@@ -43,7 +48,7 @@ class StudentTopUpLogInline(admin.TabularInline):
 
 @admin.register(StudentProfile)
 class StudentProfileAdmin(admin.ModelAdmin):
-    inlines = [StudentApprovalLogInline, StudentTopUpLogInline]
+    inlines = [StudentApprovalLogInline, BalanceEntryInline]
 
     list_display = (
         "id",
@@ -65,7 +70,8 @@ class StudentProfileAdmin(admin.ModelAdmin):
     ordering = ("-created_at",)
     date_hierarchy = "created_at"
 
-    readonly_fields = ("created_at", "updated_at", "type")
+    # balance only changes through the ledger (top-up actions, payments)
+    readonly_fields = ("created_at", "updated_at", "type", "balance")
     fieldsets = (
         ("User", {"fields": ("user",)}),
         (
@@ -109,65 +115,46 @@ class StudentProfileAdmin(admin.ModelAdmin):
     def created_local(self, obj: StudentProfile) -> str:
         return localtime(obj.created_at).strftime("%Y-%m-%d %H:%M")
 
+    def _run_bulk(self, request, queryset, action: str, amount=None) -> None:
+        ids = list(queryset.values_list("pk", flat=True))
+        if len(ids) > settings.STUDENT_BULK_ACTIONS["SYNC_LIMIT"]:
+            bulk = start_bulk_action(
+                action=action, student_ids=ids, actor=request.user, amount=amount
+            )
+            url = reverse("admin:profiles_studentbulkaction_change", args=[bulk.pk])
+            self.message_user(
+                request,
+                format_html(
+                    '{} students queued as a background job: <a href="{}">progress</a>.',
+                    len(ids),
+                    url,
+                ),
+                level=messages.INFO,
+            )
+            return
+        with transaction.atomic():
+            updated = apply_action(action, ids, actor=request.user, amount=amount)
+        if action == StudentBulkAction.Action.TOPUP:
+            text, level = (
+                f"Topped up {updated} student(s) by {amount} UZS.",
+                messages.SUCCESS,
+            )
+        elif action == StudentBulkAction.Action.APPROVE:
+            text, level = f"{updated} student(s) approved.", messages.SUCCESS
+        else:
+            text, level = f"{updated} student(s) disapproved.", messages.WARNING
+        self.message_user(request, text, level=level)
+
     @admin.action(description="Approve selected students")
     def approve_selected(self, request, queryset):
-        updated = 0
-        with transaction.atomic():
-            for sp in queryset.select_for_update():
-                if not sp.is_approved:
-                    sp.is_approved = True
-                    sp.save(update_fields=["is_approved", "type", "updated_at"])
-                    StudentApprovalLog.objects.create(
-                        student=sp,
-                        approved=True,
-                        actor=request.user,
-                        note="Admin approve",
-                    )
-                    updated += 1
-        self.message_user(
-            request, f"{updated} student(s) approved.", level=messages.SUCCESS
-        )
+        self._run_bulk(request, queryset, StudentBulkAction.Action.APPROVE)
 
     @admin.action(description="Disapprove selected students")
     def disapprove_selected(self, request, queryset):
-        updated = 0
-        with transaction.atomic():
-            for sp in queryset.select_for_update():
-                if sp.is_approved:
-                    sp.is_approved = False
-                    sp.save(update_fields=["is_approved", "type", "updated_at"])
-                    StudentApprovalLog.objects.create(
-                        student=sp,
-                        approved=False,
-                        actor=request.user,
-                        note="Admin disapprove",
-                    )
-                    updated += 1
-        self.message_user(
-            request, f"{updated} student(s) disapproved.", level=messages.WARNING
-        )
+        self._run_bulk(request, queryset, StudentBulkAction.Action.DISAPPROVE)
 
     def _bulk_topup(self, request, queryset, amount: Decimal):
-        updated = 0
-        with transaction.atomic():
-            for sp in queryset.select_for_update():
-                old = sp.balance
-                new_balance = (old + amount).quantize(Decimal("0.01"))
-                sp.balance = new_balance
-                sp.save(update_fields=["balance", "updated_at"])
-                StudentTopUpLog.objects.create(
-                    student=sp,
-                    amount=amount,
-                    new_balance=new_balance,
-                    actor=request.user,
-                    note=f"Admin bulk topup +{amount}",
-                )
-                updated += 1
-        self.message_user(
-            request,
-            f"Topped up {updated} student(s) by {amount} UZS.",
-            level=messages.SUCCESS,
-        )
+        self._run_bulk(request, queryset, StudentBulkAction.Action.TOPUP, amount)
 
     @admin.action(description="Top up +50,000 UZS")
     def topup_50k(self, request, queryset):
@@ -280,31 +267,35 @@ class StudentApprovalLogAdmin(admin.ModelAdmin):
         return (obj.note or "")[:60]
 
 
-@admin.register(StudentTopUpLog)
-class StudentTopUpLogAdmin(admin.ModelAdmin):
+@admin.register(BalanceEntry)
+class BalanceEntryAdmin(admin.ModelAdmin):
     list_display = (
         "id",
         "student_id",
+        "kind",
         "amount",
-        "new_balance",
+        "balance_after",
         "actor_name",
         "created_local",
         "note_short",
     )
-    list_filter = (("created_at", admin.DateFieldListFilter),)
+    list_filter = ("kind", ("created_at", admin.DateFieldListFilter))
     search_fields = (
         "student__user__fullname",
         "student__user__phone_number",
         "actor__fullname",
         "note",
+        "reference",
     )
     ordering = ("-created_at",)
     readonly_fields = (
         "student",
+        "kind",
         "amount",
-        "new_balance",
+        "balance_after",
         "actor",
         "note",
+        "reference",
         "created_at",
         "updated_at",
     )
@@ -317,9 +308,11 @@ class StudentTopUpLogAdmin(admin.ModelAdmin):
             .select_related("student__user", "actor")
             .only(
                 "id",
+                "kind",
                 "amount",
-                "new_balance",
+                "balance_after",
                 "note",
+                "reference",
                 "created_at",
                 "updated_at",
                 "student__id",
@@ -329,14 +322,70 @@ class StudentTopUpLogAdmin(admin.ModelAdmin):
             )
         )
 
+    # entries are append-only
+    def has_add_permission(self, request):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
     @admin.display(description="Actor")
-    def actor_name(self, obj: StudentTopUpLog) -> str:
+    def actor_name(self, obj: BalanceEntry) -> str:
         return obj.actor.fullname if obj.actor else "system"
 
     @admin.display(description="Created")
-    def created_local(self, obj: StudentTopUpLog) -> str:
+    def created_local(self, obj: BalanceEntry) -> str:
         return localtime(obj.created_at).strftime("%Y-%m-%d %H:%M")
 
     @admin.display(description="Note")
-    def note_short(self, obj: StudentTopUpLog) -> str:
+    def note_short(self, obj: BalanceEntry) -> str:
         return (obj.note or "")[:60]
+
+
+@admin.register(StudentBulkAction)
+class StudentBulkActionAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "action",
+        "amount",
+        "status",
+        "progress",
+        "affected",
+        "actor_name",
+        "created_local",
+    )
+    list_filter = ("status", "action")
+    ordering = ("-created_at",)
+    fields = (
+        "action",
+        "amount",
+        "status",
+        "progress",
+        "affected",
+        "actor",
+        "created_at",
+        "updated_at",
+    )
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        return False
+
+    def get_queryset(self, request):
+        # the id list can be large and is never shown
+        return (
+            super().get_queryset(request).select_related("actor").defer("student_ids")
+        )
+
+    @admin.display(description="Progress")
+    def progress(self, obj: StudentBulkAction) -> str:
+        pct = obj.processed * 100 // obj.total if obj.total else 100
+        return f"{obj.processed}/{obj.total} ({pct}%)"
+
+    @admin.display(description="Actor")
+    def actor_name(self, obj: StudentBulkAction) -> str:
+        return obj.actor.fullname if obj.actor else "system"
+
+    @admin.display(description="Created")
+    def created_local(self, obj: StudentBulkAction) -> str:
+        return localtime(obj.created_at).strftime("%Y-%m-%d %H:%M")
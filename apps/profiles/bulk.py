@@ -0,0 +1,147 @@
+# apps/profiles/bulk.py
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Iterable, List, Optional
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from apps.core.jobs import enqueue
+from .dashboard import invalidate_dashboards
+from .ledger import post_bulk
+from .models import (
+    BalanceEntry,
+    StudentApprovalLog,
+    StudentBulkAction,
+    StudentProfile,
+)
+
+__all__ = (
+    "BULK_ACTION_JOB",
+    "set_approval",
+    "topup",
+    "apply_action",
+    "start_bulk_action",
+    "run_bulk_chunk",
+)
+
+BULK_ACTION_JOB = "profiles.bulk_action"
+
+_SET_APPROVAL_SQL = f"""
+    WITH target AS (
+        SELECT id FROM {StudentProfile._meta.db_table}
+         WHERE id = ANY(%(students)s::uuid[]) AND is_approved <> %(approved)s
+         ORDER BY id
+           FOR UPDATE
+    )
+    UPDATE {StudentProfile._meta.db_table} AS sp
+       SET is_approved = %(approved)s, type = %(type)s, updated_at = %(now)s
+      FROM target
+     WHERE sp.id = target.id
+    RETURNING sp.id, sp.user_id
+"""
+
+
+def _ids(student_ids: Iterable) -> List[str]:
+    return [str(pk) for pk in student_ids]
+
+
+def set_approval(
+    *, student_ids: Iterable, approved: bool, actor=None, note: str = ""
+) -> int:
+    """Approves/disapproves students whose flag differs; returns how many."""
+    with connection.cursor() as cur:
+        cur.execute(
+            _SET_APPROVAL_SQL,
+            {
+                "students": _ids(student_ids),
+                "approved": approved,
+                # StudentProfile.save() derives type the same way
+                "type": (
+                    StudentProfile.TYPE_OFFLINE
+                    if approved
+                    else StudentProfile.TYPE_ONLINE
+                ),
+                "now": timezone.now(),
+            },
+        )
+        rows = cur.fetchall()
+    StudentApprovalLog.objects.bulk_create(
+        [
+            StudentApprovalLog(
+                student_id=student_id, approved=approved, actor=actor, note=note
+            )
+            for student_id, _ in rows
+        ]
+    )
+    invalidate_dashboards(user_id for _, user_id in rows)
+    return len(rows)
+
+
+def topup(*, student_ids: Iterable, amount: Decimal, actor=None) -> int:
+    return post_bulk(
+        student_ids=student_ids,
+        amount=amount,
+        kind=BalanceEntry.Kind.TOPUP,
+        actor=actor,
+        note=f"Admin bulk topup +{amount}",
+    )
+
+
+def apply_action(
+    action: str, student_ids: Iterable, *, actor=None, amount: Optional[Decimal] = None
+) -> int:
+    if action == StudentBulkAction.Action.TOPUP:
+        return topup(student_ids=student_ids, amount=amount, actor=actor)
+    approved = action == StudentBulkAction.Action.APPROVE
+    return set_approval(
+        student_ids=student_ids,
+        approved=approved,
+        actor=actor,
+        note="Admin approve" if approved else "Admin disapprove",
+    )
+
+
+def start_bulk_action(
+    *, action: str, student_ids: Iterable, actor=None, amount=None
+) -> StudentBulkAction:
+    """Records the selection and queues a job that works through it in chunks."""
+    ids = _ids(student_ids)
+    bulk = StudentBulkAction.objects.create(
+        action=action, amount=amount, student_ids=ids, total=len(ids), actor=actor
+    )
+    enqueue(BULK_ACTION_JOB, {"id": str(bulk.id)})
+    return bulk
+
+
+def run_bulk_chunk(payload) -> None:
+    """
+    Applies the next chunk and its progress in one transaction (the job's),
+    so a retried job never applies a chunk twice; queues itself again
+    until the selection is done.
+    """
+    bulk = (
+        StudentBulkAction.objects.select_for_update(of=("self",))
+        .select_related("actor")
+        .filter(id=payload["id"])
+        .exclude(status=StudentBulkAction.Status.DONE)
+        .first()
+    )
+    if bulk is None:
+        return
+    size = settings.STUDENT_BULK_ACTIONS["CHUNK_SIZE"]
+    chunk = bulk.student_ids[bulk.processed : bulk.processed + size]
+    if chunk:
+        bulk.affected += apply_action(
+            bulk.action, chunk, actor=bulk.actor, amount=bulk.amount
+        )
+    bulk.processed += len(chunk)
+    done = bulk.processed >= bulk.total
+    bulk.status = (
+        StudentBulkAction.Status.DONE if done else StudentBulkAction.Status.RUNNING
+    )
+    bulk.save(update_fields=["processed", "affected", "status", "updated_at"])
+    if not done:
+        enqueue(BULK_ACTION_JOB, {"id": str(bulk.id)})
@@ -0,0 +1,172 @@
+#  apps/profiles/dashboard.py
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.contrib.postgres.expressions import ArraySubquery
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Exists, OuterRef, TextField, Value
+from django.db.models.functions import Cast, JSONObject
+from django.utils.dateparse import parse_datetime
+from rest_framework import serializers
+
+from apps.core.cache import get_version, invalidate
+from apps.tests.models.ielts import Test
+from apps.user_tests.models import UserTest, TestResult
+from .models import StudentProfile
+from .serializers import StudentProfileSerializer
+
+DASHBOARD_NAMESPACE = "profiles:student_dashboard"
+
+_datetime = serializers.DateTimeField()
+
+
+def _text(expr: str) -> Cast:
+    return Cast(expr, output_field=TextField())
+
+
+def _sections_qs(user_id, *, all_limit: int, my_limit: int, res_limit: int):
+    """
+    The profile row with every section embedded as a JSON array: one
+    round-trip. Ids and decimals are cast to text so they match the
+    serializer output.
+    """
+    all_tests = (
+        Test.objects.annotate(
+            purchased=Exists(
+                UserTest.objects.filter(
+                    user_id=OuterRef(OuterRef("user_id")), test_id=OuterRef("pk")
+                )
+            )
+        )
+        .order_by("-created_at", "-id")
+        .values(
+            json=JSONObject(
+                id=_text("id"),
+                title="title",
+                price=_text("price"),
+                purchased="purchased",
+            )
+        )[:all_limit]
+    )
+    my_tests = (
+        UserTest.objects.filter(user_id=OuterRef("user_id"))
+        .order_by("-created_at", "-id")
+        .values(
+            json=JSONObject(
+                id=_text("id"),
+                status="status",
+                started_at="started_at",
+                completed_at="completed_at",
+                price_paid=_text("price_paid"),
+                test=JSONObject(
+                    id=_text("test__id"),
+                    title="test__title",
+                    price=_text("test__price"),
+                    purchased=Value(True),
+                ),
+            )
+        )[:my_limit]
+    )
+    results = (
+        TestResult.objects.filter(user_test__user_id=OuterRef("user_id"))
+        .order_by("-created_at", "-id")
+        .values(
+            json=JSONObject(
+                user_test_id=_text("user_test_id"),
+                test_id=_text("user_test__test_id"),
+                test_title="user_test__test__title",
+                listening_score="listening_score",
+                reading_score="reading_score",
+                writing_score="writing_score",
+                overall_score="overall_score",
+                created_at="created_at",
+            )
+        )[:res_limit]
+    )
+    return (
+        StudentProfile.objects.select_related("user")
+        .filter(user_id=user_id)
+        .annotate(
+            all_tests=ArraySubquery(all_tests),
+            my_tests=ArraySubquery(my_tests),
+            results=ArraySubquery(results),
+        )
+    )
+
+
+def _dt(value: Optional[str]) -> Optional[str]:
+    return _datetime.to_representation(parse_datetime(value)) if value else None
+
+
+def _score(value) -> Optional[float]:
+    return None if value is None else float(value)
+
+
+def _my_tests(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    for r in rows:
+        r["started_at"] = _dt(r["started_at"])
+        r["completed_at"] = _dt(r["completed_at"])
+    return rows
+
+
+def _results(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    for r in rows:
+        for k in ("listening_score", "reading_score", "writing_score", "overall_score"):
+            r[k] = _score(r[k])
+        r["created_at"] = _dt(r["created_at"])
+    return rows
+
+
+def build_student_dashboard(
+    user_id, *, all_limit: int, my_limit: int, res_limit: int
+) -> Optional[Dict[str, Any]]:
+    sp = _sections_qs(
+        user_id, all_limit=all_limit, my_limit=my_limit, res_limit=res_limit
+    ).first()
+    if sp is None:
+        return None
+    return {
+        "profile": StudentProfileSerializer(sp).data,
+        "sections": {
+            "all_tests": sp.all_tests,
+            "my_tests": _my_tests(sp.my_tests),
+            "results": _results(sp.results),
+        },
+    }
+
+
+def _limit(value: int) -> int:
+    conf = settings.STUDENT_DASHBOARD
+    if value <= 0:
+        return conf["DEFAULT_LIMIT"]
+    return min(value, conf["MAX_LIMIT"])
+
+
+def get_student_dashboard(
+    user_id, *, all_limit: int = 0, my_limit: int = 0, res_limit: int = 0
+) -> Optional[Dict[str, Any]]:
+    """
+    Cached per user for STUDENT_DASHBOARD["CACHE_TTL"] seconds; purchases,
+    top-ups, results and profile changes bump the user's version.
+    """
+    limits = (_limit(all_limit), _limit(my_limit), _limit(res_limit))
+    version = get_version(DASHBOARD_NAMESPACE, user_id)
+    key = f"{DASHBOARD_NAMESPACE}:{user_id}:{version}:" + ":".join(map(str, limits))
+    data = cache.get(key)
+    if data is None:
+        data = build_student_dashboard(
+            user_id, all_limit=limits[0], my_limit=limits[1], res_limit=limits[2]
+        )
+        if data is None:
+            return None
+        cache.set(key, data, timeout=settings.STUDENT_DASHBOARD["CACHE_TTL"])
+    return data
+
+
+def invalidate_dashboards(user_ids: Iterable) -> None:
+    ids = {uid for uid in user_ids if uid is not None}
+    if ids:
+        transaction.on_commit(lambda: invalidate(DASHBOARD_NAMESPACE, ids))
@@ -0,0 +1,8 @@
+# apps/profiles/jobs.py
+from apps.core.jobs import job
+from .bulk import BULK_ACTION_JOB, run_bulk_chunk
+
+
+@job(BULK_ACTION_JOB)
+def bulk_action(payload):
+    run_bulk_chunk(payload)
@@ -0,0 +1,152 @@
+# apps/profiles/ledger.py
+from __future__ import annotations
+
+import uuid
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from django.core.exceptions import ValidationError
+from django.db import connection, router
+from django.db.models.signals import post_save
+from django.utils import timezone
+
+from .models import BalanceEntry, StudentProfile
+
+__all__ = ("InsufficientBalance", "post_entry", "credit", "debit", "post_bulk")
+
+
+class InsufficientBalance(ValidationError):
+    pass
+
+
+# The balance change and its ledger row are one statement: the UPDATE takes
+# the only row lock, and the guard makes overdrafts match no row.
+_POST_SQL = f"""
+    WITH account AS (
+        UPDATE {StudentProfile._meta.db_table}
+           SET balance = balance + %(amount)s, updated_at = %(now)s
+         WHERE id = %(student)s AND balance + %(amount)s >= 0
+        RETURNING id, balance
+    )
+    INSERT INTO {BalanceEntry._meta.db_table} (
+        id, created_at, updated_at, student_id, kind, amount, balance_after,
+        actor_id, note, reference
+    )
+    SELECT %(id)s, %(now)s, %(now)s, account.id, %(kind)s, %(amount)s,
+           account.balance, %(actor)s, %(note)s, %(reference)s
+      FROM account
+    RETURNING *
+"""
+
+
+def post_entry(
+    *,
+    student_id,
+    amount: Decimal,
+    kind: str,
+    actor=None,
+    note: str = "",
+    reference: str = "",
+) -> BalanceEntry:
+    """
+    Applies a signed ``amount`` to the student's balance and records it.
+    Raises InsufficientBalance when a debit would make the balance negative.
+    """
+    amount = Decimal(amount).quantize(Decimal("0.01"))
+    if not amount:
+        raise ValidationError("Summa 0 bo'lishi mumkin emas.")
+    params = {
+        "id": uuid.uuid4(),
+        "student": student_id,
+        "amount": amount,
+        "kind": kind,
+        "actor": getattr(actor, "pk", actor),
+        "note": note[:255],
+        "reference": str(reference)[:64],
+        "now": timezone.now(),
+    }
+    entry: Optional[BalanceEntry] = next(
+        iter(BalanceEntry.objects.raw(_POST_SQL, params)), None
+    )
+    if entry is None:
+        raise InsufficientBalance("Balance yetarli emas!")
+    # raw SQL skips the model signals; the dashboard cache listens to this one
+    post_save.send(
+        sender=BalanceEntry,
+        instance=entry,
+        created=True,
+        update_fields=None,
+        raw=False,
+        using=router.db_for_write(BalanceEntry),
+    )
+    return entry
+
+
+def credit(*, student_id, amount: Decimal, kind: str, **kwargs) -> BalanceEntry:
+    return post_entry(student_id=student_id, amount=abs(amount), kind=kind, **kwargs)
+
+
+def debit(*, student_id, amount: Decimal, kind: str, **kwargs) -> BalanceEntry:
+    return post_entry(student_id=student_id, amount=-abs(amount), kind=kind, **kwargs)
+
+
+# Rows are locked in id order first, so two bulk postings over overlapping
+# selections cannot deadlock each other.
+_POST_BULK_SQL = f"""
+    WITH target AS (
+        SELECT id FROM {StudentProfile._meta.db_table}
+         WHERE id = ANY(%(students)s::uuid[])
+         ORDER BY id
+           FOR UPDATE
+    ), account AS (
+        UPDATE {StudentProfile._meta.db_table} AS sp
+           SET balance = sp.balance + %(amount)s, updated_at = %(now)s
+          FROM target
+         WHERE sp.id = target.id AND sp.balance + %(amount)s >= 0
+        RETURNING sp.id, sp.user_id, sp.balance
+    ), entries AS (
+        INSERT INTO {BalanceEntry._meta.db_table} (
+            id, created_at, updated_at, student_id, kind, amount, balance_after,
+            actor_id, note, reference
+        )
+        SELECT gen_random_uuid(), %(now)s, %(now)s, account.id, %(kind)s,
+               %(amount)s, account.balance, %(actor)s, %(note)s, %(reference)s
+          FROM account
+    )
+    SELECT user_id FROM account
+"""
+
+
+def post_bulk(
+    *,
+    student_ids: Iterable,
+    amount: Decimal,
+    kind: str,
+    actor=None,
+    note: str = "",
+    reference: str = "",
+) -> int:
+    """
+    Applies the same ``amount`` to many students in one statement and
+    returns how many were changed; students a debit would overdraw are
+    skipped.
+    """
+    from .dashboard import invalidate_dashboards
+
+    amount = Decimal(amount).quantize(Decimal("0.01"))
+    if not amount:
+        raise ValidationError("Summa 0 bo'lishi mumkin emas.")
+    params = {
+        "students": [str(pk) for pk in student_ids],
+        "amount": amount,
+        "kind": kind,
+        "actor": getattr(actor, "pk", actor),
+        "note": note[:255],
+        "reference": str(reference)[:64],
+        "now": timezone.now(),
+    }
+    with connection.cursor() as cur:
+        cur.execute(_POST_BULK_SQL, params)
+        user_ids = [row[0] for row in cur.fetchall()]
+    invalidate_dashboards(user_ids)
+    return len(user_ids)
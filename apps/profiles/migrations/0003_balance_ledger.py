@@ -0,0 +1,152 @@
+# Generated by Django 5.2.6 on 2026-10-18 03:29
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+# existing top-up history becomes ledger credits, ids kept
+COPY_TOPUPS_SQL = """
+    INSERT INTO student_balance_entries (
+        id, created_at, updated_at, student_id, kind, amount, balance_after,
+        actor_id, note, reference
+    )
+    SELECT id, created_at, updated_at, student_id,
+           CASE WHEN actor_id IS NULL THEN 'payment' ELSE 'topup' END,
+           amount, new_balance, actor_id, note, ''
+      FROM student_topup_logs
+"""
+
+# debits were never logged: one opening entry per student makes the sum of
+# the entries equal the stored balance
+OPENING_SQL = """
+    INSERT INTO student_balance_entries (
+        id, created_at, updated_at, student_id, kind, amount, balance_after,
+        actor_id, note, reference
+    )
+    SELECT gen_random_uuid(), now(), now(), sp.id, 'opening',
+           sp.balance - coalesce(e.total, 0), sp.balance, NULL,
+           'Balance carried over to the ledger', ''
+      FROM student_profiles sp
+      LEFT JOIN (
+        SELECT student_id, sum(amount) AS total
+          FROM student_balance_entries GROUP BY student_id
+      ) e ON e.student_id = sp.id
+     WHERE sp.balance <> coalesce(e.total, 0)
+"""
+
+TOPUP_VIEW_SQL = """
+    DROP TABLE student_topup_logs;
+    CREATE VIEW student_topup_logs AS
+    SELECT id, created_at, updated_at, student_id, amount,
+           balance_after AS new_balance, actor_id, note
+      FROM student_balance_entries
+     WHERE kind IN ('topup', 'payment');
+"""
+
+TOPUP_TABLE_SQL = """
+    DROP VIEW student_topup_logs;
+    CREATE TABLE student_topup_logs AS
+    SELECT id, created_at, updated_at, student_id, amount,
+           balance_after AS new_balance, actor_id, note
+      FROM student_balance_entries
+     WHERE kind IN ('topup', 'payment');
+    ALTER TABLE student_topup_logs ADD PRIMARY KEY (id);
+    CREATE INDEX studtopuplog_created_idx ON student_topup_logs (created_at);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("profiles", "0002_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BalanceEntry",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        db_index=True, default=django.utils.timezone.now
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("opening", "Opening balance"),
+                            ("topup", "Admin top-up"),
+                            ("payment", "Online payment"),
+                            ("speaking_fee", "Speaking fee"),
+                            ("test_purchase", "Test purchase"),
+                            ("adjustment", "Adjustment"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("amount", models.DecimalField(decimal_places=2, max_digits=12)),
+                ("balance_after", models.DecimalField(decimal_places=2, max_digits=12)),
+                ("note", models.CharField(blank=True, default="", max_length=255)),
+                ("reference", models.CharField(blank=True, default="", max_length=64)),
+                (
+                    "actor",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="balance_entries",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "student",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="balance_entries",
+                        to="profiles.studentprofile",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "student_balance_entries",
+                "indexes": [
+                    models.Index(
+                        fields=["student", "-created_at"], name="balentry_student_idx"
+                    ),
+                    models.Index(fields=["kind"], name="balentry_kind_idx"),
+                ],
+                "constraints": [
+                    models.CheckConstraint(
+                        condition=models.Q(("amount", 0), _negated=True),
+                        name="balentry_amount_nonzero",
+                    ),
+                    models.CheckConstraint(
+                        condition=models.Q(("balance_after__gte", 0)),
+                        name="balentry_balance_gte_0",
+                    ),
+                ],
+            },
+        ),
+        migrations.RunSQL(COPY_TOPUPS_SQL, migrations.RunSQL.noop),
+        migrations.RunSQL(OPENING_SQL, migrations.RunSQL.noop),
+        migrations.RunSQL(TOPUP_VIEW_SQL, TOPUP_TABLE_SQL),
+        migrations.AlterModelOptions(
+            name="studenttopuplog",
+            options={"managed": False},
+        ),
+    ]
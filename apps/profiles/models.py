@@ -98,10 +98,67 @@ class StudentApprovalLog(UUIDPrimaryKeyMixin, TimeStampedMixin):
         return f"ApprovalLog<{self.student_id}> approved={self.approved} by {who}"  # type: ignore[attr-defined]
 
 
+class BalanceEntry(UUIDPrimaryKeyMixin, TimeStampedMixin):
+    """
+    One movement of a student's balance: ``amount`` is signed (credit > 0,
+    debit < 0) and ``balance_after`` is the running balance it produced.
+    The counter account is given by ``kind``.
+    """
+
+    class Kind(models.TextChoices):
+        OPENING = "opening", "Opening balance"
+        TOPUP = "topup", "Admin top-up"
+        PAYMENT = "payment", "Online payment"
+        SPEAKING_FEE = "speaking_fee", "Speaking fee"
+        TEST_PURCHASE = "test_purchase", "Test purchase"
+        ADJUSTMENT = "adjustment", "Adjustment"
+
+    # credits shown to the student as top-ups (StudentTopUpLog)
+    TOPUP_KINDS = (Kind.TOPUP, Kind.PAYMENT)
+
+    student = models.ForeignKey(
+        StudentProfile, on_delete=models.CASCADE, related_name="balance_entries"
+    )
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    balance_after = models.DecimalField(max_digits=12, decimal_places=2)
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="balance_entries",
+    )
+    note = models.CharField(max_length=255, blank=True, default="")
+    reference = models.CharField(max_length=64, blank=True, default="")
+
+    class Meta:
+        db_table = "student_balance_entries"
+        indexes = [
+            models.Index(
+                fields=["student", "-created_at"], name="balentry_student_idx"
+            ),
+            models.Index(fields=["kind"], name="balentry_kind_idx"),
+        ]
+        constraints = [
+            models.CheckConstraint(check=~Q(amount=0), name="balentry_amount_nonzero"),
+            models.CheckConstraint(
+                check=Q(balance_after__gte=0), name="balentry_balance_gte_0"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"BalanceEntry<{self.student_id}> {self.kind} {self.amount:+} = {self.balance_after}"  # type: ignore[attr-defined]
+
+
 class StudentTopUpLog(UUIDPrimaryKeyMixin, TimeStampedMixin):
+    """Read-only view over the top-up credits in ``student_balance_entries``."""
 
     student = models.ForeignKey(
-        StudentProfile, on_delete=models.CASCADE, related_name="topup_logs"
+        StudentProfile,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="topup_logs",
     )
     amount = models.DecimalField(
         max_digits=12, decimal_places=2, validators=[MinValueValidator(Decimal("0.01"))]
@@ -109,18 +166,56 @@ class StudentTopUpLog(UUIDPrimaryKeyMixin, TimeStampedMixin):
     new_balance = models.DecimalField(max_digits=12, decimal_places=2)
     actor = models.ForeignKey(
         settings.AUTH_USER_MODEL,
-        on_delete=models.SET_NULL,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
         null=True,
         related_name="student_topup_actions",
     )
     note = models.CharField(max_length=255, blank=True, default="")
 
     class Meta:
+        managed = False
         db_table = "student_topup_logs"
-        indexes = [
-            models.Index(fields=["created_at"], name="studtopuplog_created_idx"),
-        ]
 
     def __str__(self) -> str:
         who = self.actor.fullname if self.actor else "system"
         return f"TopUpLog<{self.student_id}> +{self.amount} by {who}, new={self.new_balance}"  # type: ignore[attr-defined]
+
+
+class StudentBulkAction(UUIDPrimaryKeyMixin, TimeStampedMixin):
+    """An admin action over a large selection, applied in chunks by a job."""
+
+    class Action(models.TextChoices):
+        APPROVE = "approve", "Approve"
+        DISAPPROVE = "disapprove", "Disapprove"
+        TOPUP = "topup", "Top up"
+
+    class Status(models.TextChoices):
+        QUEUED = "queued", "Queued"
+        RUNNING = "running", "Running"
+        DONE = "done", "Done"
+
+    action = models.CharField(max_length=20, choices=Action.choices)
+    amount = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    student_ids = models.JSONField(default=list)
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    affected = models.PositiveIntegerField(default=0)
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.QUEUED
+    )
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="student_bulk_actions",
+    )
+
+    class Meta:
+        db_table = "student_bulk_actions"
+        indexes = [
+            models.Index(fields=["created_at"], name="studbulk_created_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"BulkAction<{self.action}> {self.processed}/{self.total} {self.status}"
@@ -3,8 +3,10 @@ from django.db import transaction
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
+from apps.user_tests.models import UserTest, TestResult
 from apps.users.models import User
-from .models import StudentProfile, TeacherProfile
+from .dashboard import invalidate_dashboards
+from .models import BalanceEntry, StudentProfile, TeacherProfile
 
 
 @receiver(post_save, sender=User)
@@ -16,3 +18,32 @@ def create_role_profile(sender, instance: User, created: bool, **kwargs):
             StudentProfile.objects.get_or_create(user=instance)
         elif instance.role == User.Roles.TEACHER:
             TeacherProfile.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender=StudentProfile)
+def invalidate_dashboard_profile(sender, instance: StudentProfile, **kwargs):
+    invalidate_dashboards([instance.user_id])  # type: ignore[attr-defined]
+
+
+@receiver(post_save, sender=BalanceEntry)
+@receiver(post_save, sender="speaking.SpeakingRequest")
+def invalidate_dashboard_balance(sender, instance, **kwargs):
+    invalidate_dashboards(
+        StudentProfile.objects.filter(pk=instance.student_id).values_list(
+            "user_id", flat=True
+        )
+    )
+
+
+@receiver(post_save, sender=UserTest)
+def invalidate_dashboard_user_test(sender, instance: UserTest, **kwargs):
+    invalidate_dashboards([instance.user_id])  # type: ignore[attr-defined]
+
+
+@receiver(post_save, sender=TestResult)
+def invalidate_dashboard_result(sender, instance: TestResult, **kwargs):
+    invalidate_dashboards(
+        UserTest.objects.filter(pk=instance.user_test_id).values_list(
+            "user_id", flat=True
+        )
+    )
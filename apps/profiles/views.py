@@ -1,9 +1,9 @@
 #  apps/profiles/views.py
 from __future__ import annotations
 
-from typing import Dict, Any, List
+from typing import Dict, Any
 
-from django.db.models import Exists, OuterRef
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
@@ -11,9 +11,9 @@ from rest_framework import generics, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 
+from apps.teacher_checking.counters import counts_for
 from apps.teacher_checking.models import TeacherSubmission
-from apps.tests.models.ielts import Test
-from apps.user_tests.models import UserTest, TestResult
+from .dashboard import get_student_dashboard
 from .models import (
     StudentProfile,
     TeacherProfile,
@@ -26,9 +26,6 @@ from .serializers import (
     TeacherProfileSerializer,
     StudentTopUpLogSerializer,
     StudentApprovalLogSerializer,
-    AllTestItemSerializer,
-    MyTestItemSerializer,
-    ResultItemSerializer,
     StudentDashboardResponseSerializer,
     TeacherDashboardResponseSerializer,
 )
@@ -138,19 +135,19 @@ class StudentApprovalLogListView(generics.ListAPIView):
             name="all_limit",
             type=OpenApiTypes.INT,
             location="query",
-            description="All tests limit.",
+            description="All tests limit (default 50, max 200).",
         ),
         OpenApiParameter(
             name="my_limit",
             type=OpenApiTypes.INT,
             location="query",
-            description="My tests limit.",
+            description="My tests limit (default 50, max 200).",
         ),
         OpenApiParameter(
             name="res_limit",
             type=OpenApiTypes.INT,
             location="query",
-            description="Results limit.",
+            description="Results limit (default 50, max 200).",
         ),
     ],
     responses={200: StudentDashboardResponseSerializer},
@@ -158,96 +155,15 @@ class StudentApprovalLogListView(generics.ListAPIView):
 @api_view(["GET"])
 @permission_classes([permissions.IsAuthenticated, IsStudent])
 def student_dashboard(request):
-
-    user = request.user
-    sp = get_object_or_404(  # noqa
-        StudentProfile.objects.select_related("user"),
-        user=user,
-    )
-
-    all_limit = _qp_int(request.query_params, "all_limit")
-    my_limit = _qp_int(request.query_params, "my_limit")
-    res_limit = _qp_int(request.query_params, "res_limit")
-
-    purchased_qs = UserTest.objects.filter(user=user, test=OuterRef("pk"))
-    all_qs = (
-        Test.objects.all()
-        .annotate(purchased=Exists(purchased_qs))
-        .order_by("-created_at")
-    )
-    if all_limit > 0:
-        all_qs = all_qs[:all_limit]
-
-    all_tests: List[Dict[str, Any]] = [
-        {
-            "id": t.id,  # type: ignore[attr-defined]
-            "title": t.title,
-            "price": getattr(t, "price", 0),
-            "purchased": bool(getattr(t, "purchased", False)),
-        }
-        for t in all_qs
-    ]
-    all_tests_data = AllTestItemSerializer(all_tests, many=True).data
-
-    my_qs = (
-        UserTest.objects.filter(user=user)
-        .select_related("test")
-        .order_by("-created_at")
-    )
-    if my_limit > 0:
-        my_qs = my_qs[:my_limit]
-
-    my_tests: List[Dict[str, Any]] = [
-        {
-            "id": ut.id,
-            "status": ut.status,
-            "started_at": ut.started_at,
-            "completed_at": ut.completed_at,
-            "price_paid": ut.price_paid,
-            "test": {
-                "id": ut.test.id,
-                "title": ut.test.title,
-                "price": getattr(ut.test, "price", 0),
-                "purchased": True,
-            },
-        }
-        for ut in my_qs
-    ]
-    my_tests_data = MyTestItemSerializer(my_tests, many=True).data
-
-    res_qs = (
-        TestResult.objects.filter(user_test__user=user)
-        .select_related("user_test__test")
-        .order_by("-created_at")
-    )
-    if res_limit > 0:
-        res_qs = res_qs[:res_limit]
-
-    results: List[Dict[str, Any]] = [
-        {
-            "user_test_id": tr.user_test_id,  # type: ignore[attr-defined]
-            "test_id": tr.user_test.test_id,
-            "test_title": tr.user_test.test.title,
-            "listening_score": tr.listening_score,
-            "reading_score": tr.reading_score,
-            "writing_score": tr.writing_score,
-            "overall_score": tr.overall_score,
-            "created_at": tr.created_at,
-        }
-        for tr in res_qs
-    ]
-    results_data = ResultItemSerializer(results, many=True).data
-
-    return Response(
-        {
-            "profile": StudentProfileSerializer(sp).data,
-            "sections": {
-                "all_tests": all_tests_data,
-                "my_tests": my_tests_data,
-                "results": results_data,
-            },
-        }
+    data = get_student_dashboard(
+        request.user.id,
+        all_limit=_qp_int(request.query_params, "all_limit"),
+        my_limit=_qp_int(request.query_params, "my_limit"),
+        res_limit=_qp_int(request.query_params, "res_limit"),
     )
+    if data is None:
+        raise Http404
+    return Response(data)
 
 
 @extend_schema(
@@ -290,13 +206,13 @@ def teacher_dashboard(request):
     done_limit = _qp_int(request.query_params, "done_limit")
 
     base_sel = ("user_test__user", "user_test__test", "teacher")
+    counts = counts_for(user.id)
 
     all_qs = (
         TeacherSubmission.objects.filter(status=TeacherSubmission.Status.REQUESTED)
         .select_related(*base_sel)
         .order_by("submitted_at")
     )
-    all_count = all_qs.count()
     if all_limit > 0:
         all_qs = all_qs[:all_limit]
 
@@ -307,7 +223,6 @@ def teacher_dashboard(request):
         .select_related(*base_sel)
         .order_by("-updated_at")
     )
-    chk_count = chk_qs.count()
     if chk_limit > 0:
         chk_qs = chk_qs[:chk_limit]
 
@@ -318,7 +233,6 @@ def teacher_dashboard(request):
         .select_related(*base_sel)
         .order_by("-checked_at")
     )
-    done_count = done_qs.count()
     if done_limit > 0:
         done_qs = done_qs[:done_limit]
 
@@ -327,15 +241,15 @@ def teacher_dashboard(request):
             "profile": TeacherProfileSerializer(tp).data,
             "sections": {
                 "all_writing": {
-                    "count": all_count,
+                    "count": counts[TeacherSubmission.Status.REQUESTED],
                     "items": [_sub_to_item(x) for x in all_qs],
                 },
                 "my_checking": {
-                    "count": chk_count,
+                    "count": counts[TeacherSubmission.Status.IN_CHECKING],
                     "items": [_sub_to_item(x) for x in chk_qs],
                 },
                 "my_checked": {
-                    "count": done_count,
+                    "count": counts[TeacherSubmission.Status.CHECKED],
                     "items": [_sub_to_item(x) for x in done_qs],
                 },
             },
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.6 on 2026-10-18 03:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("profiles", "0002_initial"),
+        (
+            "speaking",
+            "0002_speakingrequest_checklist_speakingrequest_full_name_and_more",
+        ),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="speakingrequest",
+            index=models.Index(
+                fields=["student", "created_at", "id"],
+                name="spreq_student_created_id_idx",
+            ),
+        ),
+    ]
@@ -6,9 +6,9 @@ from typing import Any, Dict
 
 from django.conf import settings
 from django.db import transaction
-from django.db.models import F
 
-from apps.profiles.models import StudentProfile
+from apps.profiles.ledger import InsufficientBalance, debit
+from apps.profiles.models import BalanceEntry, StudentProfile
 from apps.core.notifications import notify_telegram_admin_sync
 from .models import SpeakingRequest
 
@@ -45,10 +45,14 @@ def create_speaking_request(
     if fee <= 0:
         raise ValueError("Speaking FEE misconfigured (SPEAKING.FEE <= 0)")
 
-    updated = StudentProfile.objects.filter(pk=student.pk, balance__gte=fee).update(
-        balance=F("balance") - fee
-    )
-    if updated == 0:
+    try:
+        debit(
+            student_id=student.pk,
+            amount=fee,
+            kind=BalanceEntry.Kind.SPEAKING_FEE,
+            note="Speaking request fee",
+        )
+    except InsufficientBalance:
         raise ValueError("Hisobingizda mablag' yetarli emas.")
 
     # ── Snapshot student info ──
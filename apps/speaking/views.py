@@ -7,6 +7,7 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 
+from apps.core.pagination import KeysetPagination
 from apps.profiles.models import StudentProfile
 from .serializers import SpeakingRequestCreateSerializer, SpeakingRequestSerializer
 from .services import create_speaking_request
@@ -53,5 +54,9 @@ def request_speaking(request):
 @permission_classes([permissions.IsAuthenticated])
 def my_speaking_requests(request):
     sp = get_object_or_404(StudentProfile, user=request.user)
-    qs = SpeakingRequest.objects.filter(student=sp).order_by("-created_at")
-    return Response(SpeakingRequestSerializer(qs, many=True).data)
+    qs = SpeakingRequest.objects.filter(student=sp)
+    paginator = KeysetPagination()
+    page = paginator.paginate_queryset(qs, request)
+    return paginator.get_paginated_response(
+        SpeakingRequestSerializer(page, many=True).data
+    )
@@ -0,0 +1,122 @@
+#  apps/teacher_checking/counters.py
+from __future__ import annotations
+
+from collections import Counter
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Q, Sum
+
+from .models import SubmissionCounter, TeacherSubmission
+
+__all__ = ("record_transition", "bump", "counts_for", "reconcile")
+
+Status = TeacherSubmission.Status
+Key = Tuple[Optional[object], str]  # (teacher_id | None for the pool, status)
+
+_TABLE = SubmissionCounter._meta.db_table
+
+
+def _key(teacher_id, status: str) -> Key:
+    # requested submissions form one shared pool, whoever touched them last
+    return (None if status == Status.REQUESTED else teacher_id, status)
+
+
+def bump(changes: Dict[Key, int]) -> None:
+    """
+    Applies counter deltas with a single upsert, in the caller's transaction.
+    Pool deltas land in the slot picked by the backend pid: stable within a
+    transaction, different for concurrent connections.
+    """
+    rows = sorted(
+        ((t, s, d) for (t, s), d in changes.items() if d),
+        key=lambda r: (r[0] is not None, str(r[0]), r[1]),  # stable lock order
+    )
+    if not rows:
+        return
+    values, params = [], []
+    for teacher_id, status, delta in rows:
+        if teacher_id is None:
+            values.append("(%s, %s, pg_backend_pid() %% %s, %s)")
+            params += [None, status, settings.TEACHER_CHECKING["COUNTER_SLOTS"], delta]
+        else:
+            values.append("(%s, %s, 0, %s)")
+            params += [teacher_id, status, delta]
+    with connection.cursor() as cur:
+        cur.execute(
+            f"INSERT INTO {_TABLE} (teacher_id, status, slot, count) "
+            f"VALUES {', '.join(values)} "
+            f"ON CONFLICT (teacher_id, status, slot) "
+            f"DO UPDATE SET count = {_TABLE}.count + EXCLUDED.count",
+            params,
+        )
+
+
+def record_transition(
+    *,
+    old_teacher_id=None,
+    old_status: Optional[str] = None,
+    new_teacher_id=None,
+    new_status: Optional[str] = None,
+) -> None:
+    """``old_status=None`` is a new submission, ``new_status=None`` a deletion."""
+    changes: Counter = Counter()
+    if old_status:
+        changes[_key(old_teacher_id, old_status)] -= 1
+    if new_status:
+        changes[_key(new_teacher_id, new_status)] += 1
+    bump(changes)
+
+
+def counts_for(teacher_id) -> Dict[str, int]:
+    rows = (
+        SubmissionCounter.objects.filter(
+            Q(teacher__isnull=True, status=Status.REQUESTED)
+            | Q(teacher_id=teacher_id, status__in=[Status.IN_CHECKING, Status.CHECKED])
+        )
+        .values("status")
+        .annotate(n=Sum("count"))
+        .values_list("status", "n")
+        .order_by()
+    )
+    counts = {s: 0 for s in Status.values}
+    counts.update(rows)
+    return counts
+
+
+def _actual() -> Dict[Key, int]:
+    actual: Dict[Key, int] = Counter()
+    rows: Iterable = (
+        TeacherSubmission.objects.values("teacher_id", "status")
+        .annotate(n=Count("id"))
+        .values_list("teacher_id", "status", "n")
+        .order_by()
+    )
+    for teacher_id, status, n in rows:
+        actual[_key(teacher_id, status)] += n
+    return actual
+
+
+@transaction.atomic
+def reconcile() -> int:
+    """
+    Rebuilds the counters from teacher_submissions and returns how many
+    were wrong. The EXCLUSIVE lock waits for in-flight transitions to
+    commit and holds new ones back until the recount is written.
+    """
+    with connection.cursor() as cur:
+        cur.execute(f"LOCK TABLE {_TABLE} IN EXCLUSIVE MODE")
+    actual = _actual()
+    stored: Dict[Key, int] = Counter()
+    for t, s, n in SubmissionCounter.objects.values_list(
+        "teacher_id", "status", "count"
+    ):
+        stored[(t, s)] += n
+    drift = {
+        k: actual.get(k, 0) - stored.get(k, 0)
+        for k in set(actual) | set(stored)
+        if actual.get(k, 0) != stored.get(k, 0)
+    }
+    bump(drift)
+    return len(drift)
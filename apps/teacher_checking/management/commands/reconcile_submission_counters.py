@@ -0,0 +1,26 @@
+# apps/teacher_checking/management/commands/reconcile_submission_counters.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.teacher_checking.counters import reconcile
+
+
+class Command(BaseCommand):
+    help = "Recount teacher dashboard counters from teacher_submissions."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--every",
+            type=int,
+            default=0,
+            help="Repeat every N seconds (0 = run once).",
+        )
+
+    def handle(self, *args, every, **options):
+        while True:
+            fixed = reconcile()
+            self.stdout.write(f"Counters reconciled, {fixed} corrected")
+            if every <= 0:
+                return
+            time.sleep(every)
@@ -0,0 +1,29 @@
+# apps/teacher_checking/management/commands/sweep_leases.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.teacher_checking.services import requeue_expired
+
+
+class Command(BaseCommand):
+    help = "Return expired in_checking claims to the requested pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--every",
+            type=int,
+            default=0,
+            help="Repeat every N seconds (0 = run once).",
+        )
+
+    def handle(self, *args, every, **options):
+        while True:
+            total = 0
+            while n := requeue_expired():
+                total += n
+            if total:
+                self.stdout.write(f"Requeued {total} expired claims")
+            if every <= 0:
+                return
+            time.sleep(every)
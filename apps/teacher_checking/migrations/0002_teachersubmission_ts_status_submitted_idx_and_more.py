@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-18 03:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("teacher_checking", "0001_initial"),
+        ("user_tests", "0003_testresult_tr_created_id_idx_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="teachersubmission",
+            index=models.Index(
+                fields=["status", "submitted_at", "id"], name="ts_status_submitted_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="teachersubmission",
+            index=models.Index(
+                fields=["teacher", "status", "updated_at", "id"],
+                name="ts_teacher_updated_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="teachersubmission",
+            index=models.Index(
+                fields=["teacher", "status", "checked_at", "id"],
+                name="ts_teacher_checked_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.6 on 2026-10-18 03:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("teacher_checking", "0003_submissioncounter"),
+        ("user_tests", "0003_testresult_tr_created_id_idx_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="teachersubmission",
+            name="lease_expires_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="teachersubmission",
+            index=models.Index(
+                condition=models.Q(("status", "in_checking")),
+                fields=["lease_expires_at"],
+                name="ts_lease_expiry_idx",
+            ),
+        ),
+        # existing claims get a fresh lease instead of expiring at once
+        migrations.RunSQL(
+            sql=(
+                "UPDATE teacher_submissions "
+                "SET lease_expires_at = now() + interval '1 hour' "
+                "WHERE status = 'in_checking'"
+            ),
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 03:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("teacher_checking", "0004_teachersubmission_lease_expires_at_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="teachersubmission",
+            name="requeue_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
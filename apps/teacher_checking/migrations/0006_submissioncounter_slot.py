@@ -0,0 +1,32 @@
+# Generated by Django 5.2.6 on 2026-10-18 03:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("teacher_checking", "0005_teachersubmission_requeue_count"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="submissioncounter",
+            name="uniq_submission_counter",
+        ),
+        migrations.AddField(
+            model_name="submissioncounter",
+            name="slot",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddConstraint(
+            model_name="submissioncounter",
+            constraint=models.UniqueConstraint(
+                fields=("teacher", "status", "slot"),
+                name="uniq_submission_counter",
+                nulls_distinct=False,
+            ),
+        ),
+    ]
@@ -42,6 +42,10 @@ class TeacherSubmission(models.Model):
 
     submitted_at = models.DateTimeField(default=timezone.now)
     checked_at = models.DateTimeField(null=True, blank=True)
+    # in_checking claims expire unless the teacher heartbeats; see
+    # services.requeue_expired (run by the sweep_leases command)
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    requeue_count = models.PositiveIntegerField(default=0)
 
     created_at = models.DateTimeField(default=timezone.now, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -56,7 +60,57 @@ class TeacherSubmission(models.Model):
         indexes = [
             models.Index(fields=["status"], name="ts_status_idx"),
             models.Index(fields=["teacher", "status"], name="ts_teacher_status_idx"),
+            # keyset pagination of the teacher lists
+            models.Index(
+                fields=["status", "submitted_at", "id"], name="ts_status_submitted_idx"
+            ),
+            models.Index(
+                fields=["teacher", "status", "updated_at", "id"],
+                name="ts_teacher_updated_idx",
+            ),
+            models.Index(
+                fields=["teacher", "status", "checked_at", "id"],
+                name="ts_teacher_checked_idx",
+            ),
+            models.Index(
+                fields=["lease_expires_at"],
+                name="ts_lease_expiry_idx",
+                condition=models.Q(status="in_checking"),
+            ),
         ]
 
     def __str__(self):
         return f"{self.user_test_id} {self.task} {self.status}"  # type: ignore[attr-defined]
+
+
+class SubmissionCounter(models.Model):
+    """
+    Running number of submissions per (teacher, status), kept in step by
+    the services; ``teacher`` is NULL for the shared requested pool. The
+    pool is split over ``slot`` rows so concurrent writers rarely share a
+    row lock; readers sum the slots.
+    """
+
+    teacher = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="submission_counters",
+    )
+    status = models.CharField(max_length=20, choices=TeacherSubmission.Status.choices)  # type: ignore[attr-defined]
+    slot = models.PositiveSmallIntegerField(default=0)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "teacher_submission_counters"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["teacher", "status", "slot"],
+                name="uniq_submission_counter",
+                nulls_distinct=False,
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.teacher_id or 'pool'} {self.status}={self.count}"  # type: ignore[attr-defined]
@@ -22,6 +22,7 @@ class TeacherSubmissionSerializer(serializers.ModelSerializer):
             "feedback",
             "submitted_at",
             "checked_at",
+            "lease_expires_at",
         ]
         read_only_fields = [
             "status",
@@ -30,6 +31,7 @@ class TeacherSubmissionSerializer(serializers.ModelSerializer):
             "feedback",
             "submitted_at",
             "checked_at",
+            "lease_expires_at",
         ]
 
 
@@ -43,6 +45,15 @@ class ClaimSerializer(serializers.Serializer):
     submission_id = serializers.UUIDField()
 
 
+class ClaimNextSerializer(serializers.Serializer):
+    n = serializers.IntegerField(min_value=1, max_value=10, default=1)
+    task = serializers.ChoiceField(
+        choices=TeacherSubmission.Task.choices,  # type: ignore[attr-defined]
+        required=False,
+        allow_null=True,
+    )
+
+
 class GradeSerializer(serializers.Serializer):
     submission_id = serializers.UUIDField()
     score = serializers.FloatField(min_value=0, max_value=9)
@@ -1,15 +1,48 @@
 from __future__ import annotations
 
+from collections import Counter
+from datetime import timedelta
+from typing import List, Optional
+
+from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db import transaction
+from django.db import connection, transaction
+from django.db.models import Count, Min, Sum
 from django.utils import timezone
 
-from apps.user_tests.models import UserTest, TestResult
+from apps.core.events import publish
+from apps.user_tests.models import UserTest
+from apps.user_tests.results import upsert_result
 from apps.users.models import User
-from .models import TeacherSubmission
+from .counters import bump, counts_for, record_transition
+from .models import SubmissionCounter, TeacherSubmission
+
+
+__all__ = (
+    "submit_writing",
+    "claim_submission",
+    "claim_next",
+    "extend_lease",
+    "requeue_expired",
+    "lease_stats",
+    "grade_submission",
+)
 
+SUBMISSIONS_CHANNEL = "teacher_checking.submissions"
 
-__all__ = ("submit_writing", "claim_submission", "grade_submission")
+
+def _emit(kind: str, sub: TeacherSubmission) -> None:
+    publish(
+        SUBMISSIONS_CHANNEL,
+        {
+            "type": f"submission.{kind}",
+            "id": sub.id,
+            "user_test_id": sub.user_test_id,  # type: ignore[attr-defined]
+            "task": sub.task,
+            "status": sub.status,
+            "teacher_id": sub.teacher_id,  # type: ignore[attr-defined]
+        },
+    )
 
 
 @transaction.atomic
@@ -19,12 +52,19 @@ def submit_writing(*, user_test: UserTest, task: str, text: str) -> TeacherSubmi
         task=task,
         defaults={"submitted_text": text, "status": TeacherSubmission.Status.REQUESTED},
     )
+    transition = {"new_status": TeacherSubmission.Status.REQUESTED}
     if not created:
+        sub = TeacherSubmission.objects.select_for_update().get(pk=sub.pk)
         if sub.status == TeacherSubmission.Status.CHECKED:
             raise ValidationError("This task is already checked.")
+        transition.update(
+            old_teacher_id=sub.teacher_id,  # type: ignore[attr-defined]
+            old_status=sub.status,
+        )
         sub.submitted_text = text
         sub.status = TeacherSubmission.Status.REQUESTED
         sub.teacher = None
+        sub.lease_expires_at = None
         sub.score = None
         sub.feedback = ""
         sub.submitted_at = timezone.now()
@@ -33,17 +73,42 @@ def submit_writing(*, user_test: UserTest, task: str, text: str) -> TeacherSubmi
                 "submitted_text",
                 "status",
                 "teacher",
+                "lease_expires_at",
                 "score",
                 "feedback",
                 "submitted_at",
                 "updated_at",
             ]
         )
+    _emit("requested", sub)
+    # counters last: the pool row lock is then held only until commit
+    record_transition(**transition)
     return sub
 
 
+def _lease_expiry():
+    return timezone.now() + timedelta(
+        seconds=settings.TEACHER_CHECKING["LEASE_SECONDS"]
+    )
+
+
+def _claim_capacity(teacher: User) -> int:
+    """
+    Free in-flight slots of a teacher. The advisory lock serialises claims
+    of the same teacher until commit, so parallel requests cannot overshoot.
+    """
+    with connection.cursor() as cur:
+        cur.execute(
+            "SELECT pg_advisory_xact_lock(hashtext(%s))", [f"claim:{teacher.id}"]
+        )
+    limit = settings.TEACHER_CHECKING["MAX_IN_FLIGHT"]
+    return limit - counts_for(teacher.id)[TeacherSubmission.Status.IN_CHECKING]
+
+
 @transaction.atomic
 def claim_submission(*, submission_id, teacher: User) -> TeacherSubmission:
+    if _claim_capacity(teacher) <= 0:
+        raise ValidationError("In-checking limit reached; grade a submission first.")
     # SELECT ... FOR UPDATE SKIP LOCKED
     qs = TeacherSubmission.objects.select_for_update(skip_locked=True).filter(
         id=submission_id,
@@ -57,10 +122,175 @@ def claim_submission(*, submission_id, teacher: User) -> TeacherSubmission:
         )
     sub.status = TeacherSubmission.Status.IN_CHECKING
     sub.teacher = teacher
-    sub.save(update_fields=["status", "teacher", "updated_at"])
+    sub.lease_expires_at = _lease_expiry()
+    sub.save(update_fields=["status", "teacher", "lease_expires_at", "updated_at"])
+    _emit("claimed", sub)
+    record_transition(
+        old_status=TeacherSubmission.Status.REQUESTED,
+        new_teacher_id=teacher.id,
+        new_status=sub.status,
+    )
     return sub
 
 
+_CLAIM_NEXT_SQL = """
+    UPDATE teacher_submissions
+       SET status = %(in_checking)s, teacher_id = %(teacher)s,
+           lease_expires_at = %(lease)s, updated_at = %(now)s
+     WHERE id IN (
+            SELECT id
+              FROM teacher_submissions
+             WHERE status = %(requested)s {task_filter}
+             ORDER BY submitted_at, id
+             LIMIT %(n)s
+               FOR UPDATE SKIP LOCKED
+           )
+ RETURNING id
+"""
+
+
+@transaction.atomic
+def claim_next(
+    *, teacher: User, n: int = 1, task: Optional[str] = None
+) -> List[TeacherSubmission]:
+    """
+    Takes the oldest ``n`` requested submissions in one UPDATE ... RETURNING.
+    Rows locked by other claimers are skipped, not waited on, so concurrent
+    teachers get disjoint batches.
+    """
+    n = min(n, settings.TEACHER_CHECKING["MAX_CLAIM_BATCH"], _claim_capacity(teacher))
+    if n <= 0:
+        raise ValidationError("In-checking limit reached; grade a submission first.")
+
+    sql = _CLAIM_NEXT_SQL.format(task_filter="AND task = %(task)s" if task else "")
+    with connection.cursor() as cur:
+        cur.execute(
+            sql,
+            {
+                "in_checking": TeacherSubmission.Status.IN_CHECKING,
+                "requested": TeacherSubmission.Status.REQUESTED,
+                "teacher": teacher.id,
+                "now": timezone.now(),
+                "lease": _lease_expiry(),
+                "n": n,
+                "task": task,
+            },
+        )
+        ids = [row[0] for row in cur.fetchall()]
+    if not ids:
+        return []
+
+    subs = list(
+        TeacherSubmission.objects.filter(id__in=ids)
+        .select_related("user_test__user", "user_test__test", "teacher")
+        .order_by("submitted_at", "id")
+    )
+    for sub in subs:
+        _emit("claimed", sub)
+    # counters last: the pool slot is locked only until commit
+    bump(
+        {
+            (None, TeacherSubmission.Status.REQUESTED): -len(ids),
+            (teacher.id, TeacherSubmission.Status.IN_CHECKING): len(ids),
+        }
+    )
+    return subs
+
+
+@transaction.atomic
+def extend_lease(*, submission_id, teacher: User) -> TeacherSubmission:
+    """Heartbeat: pushes the claim expiry forward while the teacher works."""
+    updated = TeacherSubmission.objects.filter(
+        id=submission_id,
+        teacher=teacher,
+        status=TeacherSubmission.Status.IN_CHECKING,
+    ).update(lease_expires_at=_lease_expiry(), updated_at=timezone.now())
+    if not updated:
+        raise ValidationError("Submission is not in checking by you (lease lost).")
+    return TeacherSubmission.objects.get(id=submission_id)
+
+
+_REQUEUE_SQL = """
+    WITH expired AS (
+        SELECT id, teacher_id
+          FROM teacher_submissions
+         WHERE status = %(in_checking)s AND lease_expires_at < %(now)s
+         ORDER BY lease_expires_at
+         LIMIT %(limit)s
+           FOR UPDATE SKIP LOCKED
+    )
+    UPDATE teacher_submissions ts
+       SET status = %(requested)s, teacher_id = NULL,
+           lease_expires_at = NULL, requeue_count = ts.requeue_count + 1,
+           updated_at = %(now)s
+      FROM expired
+     WHERE ts.id = expired.id
+ RETURNING ts.id, ts.user_test_id, ts.task, expired.teacher_id
+"""
+
+
+@transaction.atomic
+def requeue_expired(*, limit: Optional[int] = None) -> int:
+    """
+    Returns up to ``limit`` expired in_checking claims to the pool in one
+    statement (partial index on lease_expires_at) and returns how many.
+    """
+    limit = limit or settings.TEACHER_CHECKING["SWEEP_BATCH"]
+    with connection.cursor() as cur:
+        cur.execute(
+            _REQUEUE_SQL,
+            {
+                "in_checking": TeacherSubmission.Status.IN_CHECKING,
+                "requested": TeacherSubmission.Status.REQUESTED,
+                "now": timezone.now(),
+                "limit": limit,
+            },
+        )
+        rows = cur.fetchall()
+    if not rows:
+        return 0
+
+    changes = Counter()
+    for sub_id, user_test_id, task, teacher_id in rows:
+        changes[(teacher_id, TeacherSubmission.Status.IN_CHECKING)] -= 1
+        changes[(None, TeacherSubmission.Status.REQUESTED)] += 1
+        publish(
+            SUBMISSIONS_CHANNEL,
+            {
+                "type": "submission.requeued",
+                "id": sub_id,
+                "user_test_id": user_test_id,
+                "task": task,
+                "status": TeacherSubmission.Status.REQUESTED,
+                "teacher_id": teacher_id,
+            },
+        )
+    bump(changes)
+    return len(rows)
+
+
+def lease_stats() -> dict:
+    now = timezone.now()
+    stale = TeacherSubmission.objects.filter(
+        status=TeacherSubmission.Status.IN_CHECKING, lease_expires_at__lt=now
+    ).aggregate(n=Count("id"), oldest=Min("lease_expires_at"))
+    return {
+        "in_checking": SubmissionCounter.objects.filter(
+            status=TeacherSubmission.Status.IN_CHECKING
+        ).aggregate(n=Sum("count"))["n"]
+        or 0,
+        "stale_leases": stale["n"],
+        "oldest_stale_seconds": (
+            (now - stale["oldest"]).total_seconds() if stale["oldest"] else 0
+        ),
+        "requeued_total": TeacherSubmission.objects.aggregate(n=Sum("requeue_count"))[
+            "n"
+        ]
+        or 0,
+        "lease_seconds": settings.TEACHER_CHECKING["LEASE_SECONDS"],
+    }
+
+
 @transaction.atomic
 def grade_submission(
     *, submission_id, teacher: User, score: float, feedback: str
@@ -75,11 +305,18 @@ def grade_submission(
     if sub.status != TeacherSubmission.Status.IN_CHECKING:
         raise ValidationError("Submission must be in 'in_checking' state to grade.")
 
+    record_transition(
+        old_teacher_id=sub.teacher_id,  # type: ignore[attr-defined]
+        old_status=sub.status,
+        new_teacher_id=teacher.id,
+        new_status=TeacherSubmission.Status.CHECKED,
+    )
     sub.score = float(score)
     sub.feedback = feedback or ""
     sub.status = TeacherSubmission.Status.CHECKED
     sub.checked_at = timezone.now()
     sub.teacher = teacher
+    sub.lease_expires_at = None
     sub.save(
         update_fields=[
             "score",
@@ -87,26 +324,12 @@ def grade_submission(
             "status",
             "checked_at",
             "teacher",
+            "lease_expires_at",
             "updated_at",
         ]
     )
 
-    ut = sub.user_test
-    tr, _ = TestResult.objects.get_or_create(user_test=ut)
-
-    scores = list(
-        TeacherSubmission.objects.filter(
-            user_test=ut, status=TeacherSubmission.Status.CHECKED
-        ).values_list("score", flat=True)
-    )
-    if scores:
-        tr.writing_score = round(sum(scores) / len(scores), 1)
-        comps = [
-            x
-            for x in (tr.listening_score, tr.reading_score, tr.writing_score)
-            if x is not None
-        ]
-        tr.overall_score = round(sum(comps) / len(comps), 1) if comps else None
-        tr.save(update_fields=["writing_score", "overall_score", "updated_at"])
+    upsert_result(sub.user_test_id)
 
+    _emit("graded", sub)
     return sub
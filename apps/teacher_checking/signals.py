@@ -0,0 +1,14 @@
+# apps/teacher_checking/signals.py
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .counters import record_transition
+from .models import TeacherSubmission
+
+
+@receiver(post_delete, sender=TeacherSubmission)
+def release_submission_counter(sender, instance: TeacherSubmission, **kwargs):
+    record_transition(
+        old_teacher_id=instance.teacher_id,  # type: ignore[attr-defined]
+        old_status=instance.status,
+    )
@@ -5,8 +5,12 @@ from .views import (
     MyCheckingList,
     MyCheckedList,
     claim_view,
+    claim_next_view,
+    heartbeat_view,
+    lease_stats_view,
     grade_view,
     student_submit_writing,
+    submission_events,
 )
 
 urlpatterns = [
@@ -18,5 +22,10 @@ urlpatterns = [
     path("checked/", MyCheckedList.as_view(), name="my-checked"),
     # teacher actions
     path("claim/", claim_view, name="claim-writing"),
+    path("claim-next/", claim_next_view, name="claim-next-writing"),
+    path("heartbeat/", heartbeat_view, name="claim-heartbeat"),
     path("grade/", grade_view, name="grade-writing"),
+    path("leases/stats/", lease_stats_view, name="lease-stats"),
+    # live updates (SSE)
+    path("events/", submission_events, name="submission-events"),
 ]
@@ -1,20 +1,34 @@
 #  apps/teacher_checking/views.py
+from django.core.exceptions import ValidationError
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404
 from drf_spectacular.utils import extend_schema
 from rest_framework import generics, permissions, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 
+from apps.core.events import sse_response, stream_user
+from apps.core.pagination import KeysetPagination
 from apps.profiles.permissions import IsTeacherOrSuperAdmin
+from apps.users.permissions import IsSuperAdmin
 from apps.user_tests.models import UserTest
 from .models import TeacherSubmission
 from .serializers import (
     TeacherSubmissionSerializer,
     SubmissionCreateSerializer,
     ClaimSerializer,
+    ClaimNextSerializer,
     GradeSerializer,
 )
-from .services import submit_writing, claim_submission, grade_submission
+from .services import (
+    SUBMISSIONS_CHANNEL,
+    submit_writing,
+    claim_submission,
+    claim_next,
+    extend_lease,
+    lease_stats,
+    grade_submission,
+)
 
 
 @extend_schema(
@@ -40,43 +54,39 @@ def student_submit_writing(request):
 class AllWritingList(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated, IsTeacherOrSuperAdmin]
     serializer_class = TeacherSubmissionSerializer
+    pagination_class = KeysetPagination
+    keyset_ordering = ("submitted_at", "id")
 
     def get_queryset(self):
-        return (
-            TeacherSubmission.objects.filter(status=TeacherSubmission.Status.REQUESTED)
-            .select_related("user_test__user", "user_test__test", "teacher")
-            .order_by("submitted_at")
-        )
+        return TeacherSubmission.objects.filter(
+            status=TeacherSubmission.Status.REQUESTED
+        ).select_related("user_test__user", "user_test__test", "teacher")
 
 
 @extend_schema(tags=["Teacher Checking"], summary="My Checking — in_checking")
 class MyCheckingList(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated, IsTeacherOrSuperAdmin]
     serializer_class = TeacherSubmissionSerializer
+    pagination_class = KeysetPagination
+    keyset_ordering = ("-updated_at", "-id")
 
     def get_queryset(self):
-        return (
-            TeacherSubmission.objects.filter(
-                status=TeacherSubmission.Status.IN_CHECKING, teacher=self.request.user
-            )
-            .select_related("user_test__user", "user_test__test", "teacher")
-            .order_by("-updated_at")
-        )
+        return TeacherSubmission.objects.filter(
+            status=TeacherSubmission.Status.IN_CHECKING, teacher=self.request.user
+        ).select_related("user_test__user", "user_test__test", "teacher")
 
 
 @extend_schema(tags=["Teacher Checking"], summary="Checked — by me")
 class MyCheckedList(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated, IsTeacherOrSuperAdmin]
     serializer_class = TeacherSubmissionSerializer
+    pagination_class = KeysetPagination
+    keyset_ordering = ("-checked_at", "-id")
 
     def get_queryset(self):
-        return (
-            TeacherSubmission.objects.filter(
-                status=TeacherSubmission.Status.CHECKED, teacher=self.request.user
-            )
-            .select_related("user_test__user", "user_test__test", "teacher")
-            .order_by("-checked_at")
-        )
+        return TeacherSubmission.objects.filter(
+            status=TeacherSubmission.Status.CHECKED, teacher=self.request.user
+        ).select_related("user_test__user", "user_test__test", "teacher")
 
 
 @extend_schema(
@@ -90,6 +100,7 @@ class MyCheckedList(generics.ListAPIView):
         "tekshirishni boshlamasligi uchun.\n"
         "- Agar submission allaqachon boshqa teacher tomonidan olingan bo‘lsa, "
         "xato qaytariladi (`already claimed`).\n"
+        "- Teacher'dagi `in_checking` soni limitga yetganda 400 qaytadi.\n"
         "- Faqat `Teacher` yoki `SuperAdmin` rollarida ishlaydi.\n\n"
         "**Frontend tomonidan to‘g‘ridan-to‘g‘ri chaqirilmaydi.**"
     ),
@@ -99,12 +110,84 @@ class MyCheckedList(generics.ListAPIView):
 def claim_view(request):
     ser = ClaimSerializer(data=request.data)
     ser.is_valid(raise_exception=True)
-    sub = claim_submission(
-        submission_id=ser.validated_data["submission_id"], teacher=request.user
-    )
+    try:
+        sub = claim_submission(
+            submission_id=ser.validated_data["submission_id"], teacher=request.user
+        )
+    except ValidationError as e:
+        return Response({"error": e.messages[0]}, status=400)
     return Response(TeacherSubmissionSerializer(sub).data)
 
 
+@extend_schema(
+    tags=["Teacher Checking"],
+    summary="Navbatdagi N ta submission'ni olish (claim next)",
+    description=(
+        "Eng eski `requested` submission'lardan `n` tasini bitta so'rovda "
+        "teacher'ga biriktiradi (`FOR UPDATE SKIP LOCKED`). Boshqa teacher "
+        "olayotgan qatorlar o'tkazib yuboriladi, shuning uchun `already taken` "
+        "xatosi bo'lmaydi.\n\n"
+        "- `task` berilsa faqat shu task (`task1`/`task2`) olinadi.\n"
+        "- Teacher bir vaqtda ushlab turadigan `in_checking` soni cheklangan; "
+        "limitga yetganda 400 qaytadi.\n"
+        "- Navbat bo'sh bo'lsa bo'sh ro'yxat qaytadi."
+    ),
+    request=ClaimNextSerializer,
+    responses={200: TeacherSubmissionSerializer(many=True)},
+)
+@api_view(["POST"])
+@permission_classes([permissions.IsAuthenticated, IsTeacherOrSuperAdmin])
+def claim_next_view(request):
+    ser = ClaimNextSerializer(data=request.data)
+    ser.is_valid(raise_exception=True)
+    try:
+        subs = claim_next(
+            teacher=request.user,
+            n=ser.validated_data["n"],
+            task=ser.validated_data.get("task"),
+        )
+    except ValidationError as e:
+        return Response({"error": e.messages[0]}, status=400)
+    return Response(TeacherSubmissionSerializer(subs, many=True).data)
+
+
+@extend_schema(
+    tags=["Teacher Checking"],
+    summary="Claim muddatini uzaytirish (heartbeat)",
+    description=(
+        "`in_checking` submission teacher'da `lease_expires_at` gacha turadi. "
+        "Tekshirish davom etayotgan bo'lsa frontend vaqti-vaqti bilan shu "
+        "endpoint'ni chaqiradi; muddati o'tgan claim'lar avtomatik ravishda "
+        "`requested` navbatiga qaytariladi."
+    ),
+    request=ClaimSerializer,
+    responses={200: TeacherSubmissionSerializer},
+)
+@api_view(["POST"])
+@permission_classes([permissions.IsAuthenticated, IsTeacherOrSuperAdmin])
+def heartbeat_view(request):
+    ser = ClaimSerializer(data=request.data)
+    ser.is_valid(raise_exception=True)
+    try:
+        sub = extend_lease(
+            submission_id=ser.validated_data["submission_id"], teacher=request.user
+        )
+    except ValidationError as e:
+        return Response({"error": e.messages[0]}, status=409)
+    return Response(TeacherSubmissionSerializer(sub).data)
+
+
+@extend_schema(
+    tags=["Teacher Checking"],
+    summary="Claim lease statistikasi (faqat superadmin)",
+    responses={200: dict},
+)
+@api_view(["GET"])
+@permission_classes([IsSuperAdmin])
+def lease_stats_view(request):
+    return Response(lease_stats())
+
+
 @extend_schema(tags=["Teacher Checking"], summary="Grade submission and finish")
 @api_view(["POST"])
 @permission_classes([permissions.IsAuthenticated, IsTeacherOrSuperAdmin])
@@ -118,3 +201,16 @@ def grade_view(request):
         feedback=ser.validated_data.get("feedback") or "",
     )
     return Response(TeacherSubmissionSerializer(sub).data)
+
+
+async def submission_events(request):
+    """
+    SSE stream of ``submission.requested|claimed|graded`` events for teacher
+    dashboards (ASGI only). Auth: ``Authorization: Bearer`` or ``?token=``.
+    """
+    user = await stream_user(request)
+    if user is None:
+        return JsonResponse({"detail": "Authentication required."}, status=401)
+    if user.role not in {"teacher", "superadmin"}:
+        return JsonResponse({"detail": "Forbidden."}, status=403)
+    return sse_response([SUBMISSIONS_CHANNEL])
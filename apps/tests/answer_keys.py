@@ -0,0 +1,202 @@
+#  apps/tests/answer_keys.py
+from __future__ import annotations
+
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from itertools import product
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .cache import content_version
+from .models.question import (
+    Question,
+    QuestionType,
+    is_listening_type,
+    is_reading_type,
+)
+
+__all__ = (
+    "normalize_answer",
+    "accepted_variants",
+    "KeyEntry",
+    "AnswerKey",
+    "get_answer_key",
+    "warm_answer_keys",
+)
+
+_EDGE_PUNCT = " \t\n.,;:!?\"'`"
+_WS_RE = re.compile(r"\s+")
+_OPTIONAL_RE = re.compile(r"\(([^()]*)\)")
+
+_JUDGEMENT_TYPES = {
+    QuestionType.R_YES_NO_NOT_GIVEN,
+    QuestionType.R_TRUE_FALSE_NOT_GIVEN,
+}
+_JUDGEMENT_ALIASES = {
+    "t": "true",
+    "f": "false",
+    "y": "yes",
+    "n": "no",
+    "ng": "not given",
+    "notgiven": "not given",
+    "not-given": "not given",
+}
+# "choose TWO letters": each answer_list entry is an expected item worth a
+# mark; for every other type the entries are alternative spellings
+_MULTI_ANSWER_TYPES = {
+    QuestionType.R_MULTIPLE_CHOICE,
+    QuestionType.L_MULTIPLE_CHOICE,
+}
+
+
+def normalize_answer(value: Any, question_type: str = "") -> str:
+    if value is None:
+        return ""
+    text = _WS_RE.sub(" ", str(value).casefold()).strip(_EDGE_PUNCT)
+    if question_type in _JUDGEMENT_TYPES:
+        text = _JUDGEMENT_ALIASES.get(text, text)
+    return text
+
+
+def accepted_variants(entry: Any, question_type: str = "") -> frozenset[str]:
+    """
+    Normalised spellings accepted for one answer slot. ``entry`` is a string
+    or a list of alternatives; "(the) library" accepts both with and without
+    the bracketed words.
+    """
+    alternatives = entry if isinstance(entry, (list, tuple)) else [entry]
+    out: set[str] = set()
+    for alt in alternatives:
+        text = str(alt or "")
+        parts = _OPTIONAL_RE.split(text)
+        # parts: [plain, optional, plain, optional, ...]
+        choices = [(p,) if i % 2 == 0 else (p, "") for i, p in enumerate(parts)]
+        for combo in product(*choices):
+            norm = normalize_answer("".join(combo), question_type)
+            if norm:
+                out.add(norm)
+    return frozenset(out)
+
+
+@dataclass(frozen=True)
+class KeyEntry:
+    question_type: str
+    skill: str  # "listening" | "reading"
+    group_id: int  # listening section / reading passage
+    slots: Tuple[Tuple[str, frozenset[str]], ...] = ()  # answer_dict blanks
+    items: Tuple[frozenset[str], ...] = ()  # answer_list entries
+    multi: bool = False  # items are expected together, not alternatives
+
+    @property
+    def marks(self) -> int:
+        # as score_entry() grades them: one per blank, one per expected item,
+        # otherwise one for the whole entry
+        if self.slots:
+            return len(self.slots)
+        if self.multi:
+            return len(self.items)
+        return int(bool(self.items))
+
+    @property
+    def any_of(self) -> frozenset[str]:
+        return frozenset().union(*self.items)
+
+
+@dataclass(frozen=True)
+class AnswerKey:
+    test_id: int
+    version: str
+    entries: Dict[int, KeyEntry] = field(default_factory=dict)
+
+    def total_marks(self, skill: str) -> int:
+        return sum(e.marks for e in self.entries.values() if e.skill == skill)
+
+    def has_skill(self, skill: str) -> bool:
+        return any(e.skill == skill for e in self.entries.values())
+
+
+def _compile(qtype: str, answer_list: Any, answer_dict: Any) -> dict:
+    if answer_dict:
+        return {
+            "slots": tuple(
+                (str(k), accepted_variants(v, qtype)) for k, v in answer_dict.items()
+            )
+        }
+    items = tuple(accepted_variants(e, qtype) for e in answer_list or [])
+    return {"items": items, "multi": qtype in _MULTI_ANSWER_TYPES and len(items) > 1}
+
+
+def build_answer_key(test_id: int, version: str) -> AnswerKey:
+    entries: Dict[int, KeyEntry] = {}
+    plans = (
+        ("listening", "sets__listeningsection", "listening__test"),
+        ("reading", "sets__readingpassage", "reading__test"),
+    )
+    for skill, group, to_test in plans:
+        rows = (
+            Question.objects.filter(**{f"{group}__{to_test}": test_id})
+            .values_list(
+                "id", "question_type", "answer_list", "answer_dict", f"{group}__id"
+            )
+            .distinct()
+        )
+        for qid, qtype, answer_list, answer_dict, group_id in rows:
+            if skill == "listening" and not is_listening_type(qtype):
+                continue
+            if skill == "reading" and not is_reading_type(qtype):
+                continue
+            entries[qid] = KeyEntry(
+                question_type=qtype,
+                skill=skill,
+                group_id=group_id,
+                **_compile(qtype, answer_list, answer_dict),
+            )
+    return AnswerKey(test_id=test_id, version=version, entries=entries)
+
+
+_LOCAL: "OrderedDict[int, AnswerKey]" = OrderedDict()
+_LOCAL_MAX = 256
+
+
+def _remember(key: AnswerKey) -> AnswerKey:
+    _LOCAL[key.test_id] = key
+    _LOCAL.move_to_end(key.test_id)
+    while len(_LOCAL) > _LOCAL_MAX:
+        _LOCAL.popitem(last=False)
+    return key
+
+
+def _cache_key(test_id: int, version: str) -> str:
+    return f"tests:answer_key:v2:{test_id}:{version}"
+
+
+def get_answer_key(test_id: int) -> AnswerKey:
+    """
+    Process memory first, then the shared cache, then the DB. All three are
+    keyed by the test content version, which lives in the shared cache
+    (CACHE_URL, enforced outside DEBUG): a bump made by web is seen by the
+    grading workers on their next lookup, so signals never need to reach
+    into other processes' memory.
+    """
+    version = content_version(test_id)
+    local: Optional[AnswerKey] = _LOCAL.get(test_id)
+    if local is not None and local.version == version:
+        return local
+
+    key = cache.get(_cache_key(test_id, version))
+    if key is None:
+        key = build_answer_key(test_id, version)
+        cache.set(
+            _cache_key(test_id, version),
+            key,
+            timeout=settings.IELTS_TESTS["ANSWER_KEY_CACHE_TTL"],
+        )
+    return _remember(key)
+
+
+def warm_answer_keys(test_ids: Iterable[int]) -> None:
+    for test_id in test_ids:
+        get_answer_key(test_id)
@@ -0,0 +1,109 @@
+#  apps/tests/cache.py
+from __future__ import annotations
+
+import hashlib
+from typing import Callable, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+from apps.core.cache import get_version, invalidate
+from .models import (
+    Test,
+    Listening,
+    ListeningSection,
+    Reading,
+    ReadingPassage,
+    Writing,
+    TaskOne,
+    TaskTwo,
+    QuestionSet,
+    Question,
+)
+
+CONTENT_NAMESPACE = "tests:content"
+PAYLOAD_SCHEMA = 1
+
+# model -> Test lookup(s) used to find every test that embeds the object
+_TEST_LOOKUPS = {
+    Test: ("pk",),
+    Listening: ("listening",),
+    ListeningSection: ("listening__sections",),
+    Reading: ("reading",),
+    ReadingPassage: ("reading__passages",),
+    Writing: ("writing",),
+    TaskOne: ("writing__task_one",),
+    TaskTwo: ("writing__task_one", "writing__task_two"),
+    QuestionSet: (
+        "listening__sections__questions_set",
+        "reading__passages__questions_set",
+    ),
+    Question: (
+        "listening__sections__questions_set__questions",
+        "reading__passages__questions_set__questions",
+    ),
+}
+
+Payload = Tuple[bytes, str]
+
+
+def content_version(test_id: int) -> str:
+    return get_version(CONTENT_NAMESPACE, test_id)
+
+
+def test_ids_for(model, pks: Iterable) -> set[int]:
+    pks = [pk for pk in pks if pk is not None]
+    lookups = _TEST_LOOKUPS.get(model)
+    if not pks or not lookups:
+        return set()
+    if model is Test:
+        return {int(pk) for pk in pks}
+    q = Q()
+    for lookup in lookups:
+        q |= Q(**{f"{lookup}__in": pks})
+    return set(Test.objects.filter(q).values_list("id", flat=True).distinct())
+
+
+def _refresh(test_ids: set[int]) -> None:
+    from .answer_keys import warm_answer_keys
+
+    invalidate(CONTENT_NAMESPACE, test_ids)
+    warm_answer_keys(Test.objects.filter(id__in=test_ids).values_list("id", flat=True))
+
+
+def invalidate_tests(test_ids: Iterable[int]) -> None:
+    ids = set(test_ids)
+    if ids:
+        transaction.on_commit(lambda: _refresh(ids))
+
+
+def invalidate_tests_for(model, pks: Iterable) -> None:
+    invalidate_tests(test_ids_for(model, pks))
+
+
+def _payload_key(test_id: int, version: str, base_url: str) -> str:
+    base = hashlib.md5(base_url.encode()).hexdigest()[:8]  # noqa
+    return f"tests:detail:{PAYLOAD_SCHEMA}:{test_id}:{version}:{base}"
+
+
+def get_detail_payload(
+    test_id: int, *, base_url: str, build: Callable[[], Optional[bytes]]
+) -> Optional[Payload]:
+    """
+    Pre-encoded detail JSON + ETag. ``build`` runs only on a miss and returns
+    None when the test does not exist. Media URLs are absolute, so the key
+    includes the request base URL.
+    """
+    key = _payload_key(test_id, content_version(test_id), base_url)
+    payload = cache.get(key)
+    if payload is not None:
+        return payload
+
+    body = build()
+    if body is None:
+        return None
+    payload = (body, f'"{hashlib.sha1(body).hexdigest()}"')  # noqa
+    cache.set(key, payload, timeout=settings.IELTS_TESTS["PAYLOAD_CACHE_TTL"])
+    return payload
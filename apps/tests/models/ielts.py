@@ -36,6 +36,9 @@ class Test(models.Model):
         verbose_name_plural = _("Tests")
         verbose_name = _("Test")
         ordering = ["created_at"]
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="test_created_id_idx"),
+        ]
 
     def __str__(self):
         return self.title
@@ -1,8 +1,9 @@
 # apps/tests/signals.py
 from django.db import transaction
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, pre_delete
 from django.dispatch import receiver
 
+from .cache import invalidate_tests_for
 from .models import (
     Test,
     Listening,
@@ -12,6 +13,8 @@ from .models import (
     Writing,
     TaskOne,
     TaskTwo,
+    QuestionSet,
+    Question,
 )
 
 
@@ -48,3 +51,27 @@ def create_sections_for_test(sender, instance: Test, created, **kwargs):
         Test.objects.filter(pk=instance.pk).update(
             listening=listening, reading=reading, writing=writing
         )
+
+
+@receiver(post_save, sender=Test)
+@receiver(post_save, sender=Listening)
+@receiver(post_save, sender=ListeningSection)
+@receiver(post_save, sender=Reading)
+@receiver(post_save, sender=ReadingPassage)
+@receiver(post_save, sender=Writing)
+@receiver(post_save, sender=TaskOne)
+@receiver(post_save, sender=TaskTwo)
+@receiver(post_save, sender=QuestionSet)
+@receiver(post_save, sender=Question)
+@receiver(pre_delete, sender=Test)
+@receiver(pre_delete, sender=Listening)
+@receiver(pre_delete, sender=ListeningSection)
+@receiver(pre_delete, sender=Reading)
+@receiver(pre_delete, sender=ReadingPassage)
+@receiver(pre_delete, sender=Writing)
+@receiver(pre_delete, sender=TaskOne)
+@receiver(pre_delete, sender=TaskTwo)
+@receiver(pre_delete, sender=QuestionSet)
+@receiver(pre_delete, sender=Question)
+def invalidate_test_content(sender, instance, **kwargs):
+    invalidate_tests_for(sender, [instance.pk])
@@ -3,7 +3,9 @@ from django.core.exceptions import ValidationError
 from django.db.models.signals import m2m_changed
 from django.dispatch import receiver
 
+from .cache import invalidate_tests, test_ids_for
 from .models.listening import Listening, ListeningSection
+from .models.question import QuestionSet
 from .models.reading import Reading, ReadingPassage
 
 
@@ -49,3 +51,19 @@ def limit_passage_question_sets(
             raise ValidationError(
                 "Passage ichida maksimal 3 ta question set bo‘lishi mumkin."
             )
+
+
+@receiver(m2m_changed, sender=Listening.sections.through)
+@receiver(m2m_changed, sender=ListeningSection.questions_set.through)
+@receiver(m2m_changed, sender=Reading.passages.through)
+@receiver(m2m_changed, sender=ReadingPassage.questions_set.through)
+@receiver(m2m_changed, sender=QuestionSet.questions.through)
+def invalidate_test_content_m2m(sender, instance, action, model, pk_set, **kwargs):
+    # Resolve while the affected links exist: after add, before remove/clear.
+    if action == "pre_clear":
+        invalidate_tests(test_ids_for(type(instance), [instance.pk]))
+    elif action in {"post_add", "pre_remove"}:
+        invalidate_tests(
+            test_ids_for(type(instance), [instance.pk])
+            | test_ids_for(model, pk_set or [])
+        )
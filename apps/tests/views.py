@@ -1,8 +1,11 @@
 # apps/tests/views.py
 from django.db.models import Count, Prefetch
+from django.http import Http404, HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse
-from rest_framework import viewsets, mixins, permissions, filters
+from rest_framework import viewsets, mixins, permissions, filters, throttling
+from rest_framework.renderers import JSONRenderer
 
 from apps.tests.models.ielts import Test
 from apps.tests.models.listening import ListeningSection
@@ -14,6 +17,7 @@ from apps.tests.serializers import (
     QuestionSetSummarySerializer,
     QuestionSetDetailSerializer,
 )
+from .cache import get_detail_payload
 
 LISTENING_PREFETCH = Prefetch(
     "listening__sections",
@@ -29,6 +33,10 @@ READING_PREFETCH = Prefetch(
 )
 
 
+class TestDetailThrottle(throttling.AnonRateThrottle):
+    scope = "test_detail"
+
+
 @extend_schema(
     tags=["Tests"],
     summary="IELTS testlari ro'yxati",
@@ -57,6 +65,21 @@ class TestViewSet(
     ordering = ["-created_at"]
     lookup_value_regex = r"\d+"
 
+    def _is_detail_route(self) -> bool:
+        return getattr(self, "action_map", {}).get("get") == "retrieve"
+
+    def get_authenticators(self):
+        # Detail payload is the same for everyone; skipping JWT user lookup
+        # keeps a cached retrieve free of DB queries.
+        if self._is_detail_route():
+            return []
+        return super().get_authenticators()
+
+    def get_throttles(self):
+        if self._is_detail_route():
+            return [TestDetailThrottle()]
+        return super().get_throttles()
+
     def get_queryset(self):
         base = Test.objects.all()  # noqa
         if getattr(self, "action", None) == "list":
@@ -85,11 +108,34 @@ class TestViewSet(
     @extend_schema(
         responses={
             200: OpenApiResponse(response=TestDetailSerializer, description="OK"),
+            304: OpenApiResponse(description="Not Modified (ETag)"),
             404: OpenApiResponse(description="Not Found"),
         }
     )
     def retrieve(self, request, *args, **kwargs):
-        return super().retrieve(request, *args, **kwargs)
+        def build():
+            try:
+                instance = self.get_object()
+            except Http404:
+                return None
+            return JSONRenderer().render(self.get_serializer(instance).data)
+
+        payload = get_detail_payload(
+            int(kwargs[self.lookup_field]),
+            base_url=request.build_absolute_uri("/"),
+            build=build,
+        )
+        if payload is None:
+            raise Http404
+
+        body, etag = payload
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(body, content_type="application/json")
+        response["ETag"] = etag
+        response["Cache-Control"] = "no-cache"
+        return response
 
 
 @extend_schema(
@@ -0,0 +1,83 @@
+#  apps/user_tests/bands.py
+from __future__ import annotations
+
+import math
+from decimal import Decimal
+from typing import Optional, Sequence, Tuple
+
+# (min raw correct out of 40, band) — official IELTS conversion tables
+LISTENING_BANDS: Tuple[Tuple[int, float], ...] = (
+    (39, 9.0),
+    (37, 8.5),
+    (35, 8.0),
+    (32, 7.5),
+    (30, 7.0),
+    (26, 6.5),
+    (23, 6.0),
+    (18, 5.5),
+    (16, 5.0),
+    (13, 4.5),
+    (10, 4.0),
+    (8, 3.5),
+    (6, 3.0),
+    (4, 2.5),
+    (2, 2.0),
+    (1, 1.0),
+)
+
+# Academic Reading
+READING_BANDS: Tuple[Tuple[int, float], ...] = (
+    (39, 9.0),
+    (37, 8.5),
+    (35, 8.0),
+    (33, 7.5),
+    (30, 7.0),
+    (27, 6.5),
+    (23, 6.0),
+    (19, 5.5),
+    (15, 5.0),
+    (13, 4.5),
+    (10, 4.0),
+    (8, 3.5),
+    (6, 3.0),
+    (4, 2.5),
+    (2, 2.0),
+    (1, 1.0),
+)
+
+
+def _to_band(raw: int, table: Sequence[Tuple[int, float]]) -> float:
+    for threshold, band in table:
+        if raw >= threshold:
+            return band
+    return 0.0
+
+
+def listening_band(raw: int) -> float:
+    return _to_band(raw, LISTENING_BANDS)
+
+
+def reading_band(raw: int) -> float:
+    return _to_band(raw, READING_BANDS)
+
+
+def overall_score(
+    listening: Optional[float], reading: Optional[float], writing: Optional[float]
+) -> Optional[float]:
+    """
+    Mean of the available bands rounded to the nearest half band; .25 and
+    .75 round up (6.25 -> 6.5, 6.75 -> 7.0, 6.125 -> 6.0).
+    """
+    comps = [x for x in (listening, reading, writing) if x is not None]
+    if not comps:
+        return None
+    mean = Decimal(repr(sum(comps))) / len(comps)
+    return math.floor(mean * 2 + Decimal("0.5")) / 2
+
+
+def overall_sql(*components: str) -> str:
+    """SQL twin of ``overall_score`` over column expressions."""
+    total = " + ".join(f"COALESCE({c}, 0)" for c in components)
+    present = " + ".join(f"({c} IS NOT NULL)::int" for c in components)
+    mean = f"({total})::numeric / NULLIF({present}, 0)"
+    return f"(floor({mean} * 2 + 0.5) / 2)::float8"
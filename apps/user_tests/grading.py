@@ -0,0 +1,94 @@
+#  apps/user_tests/grading.py
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Tuple
+
+from django.db import transaction
+
+from apps.tests.answer_keys import AnswerKey, KeyEntry, get_answer_key, normalize_answer
+from .bands import listening_band, reading_band
+from .models import UserTest, UserAnswer, TestResult
+from .results import upsert_result
+
+__all__ = ("score_entry", "grade_user_test")
+
+
+def score_entry(entry: KeyEntry, raw_answer: Any) -> Tuple[int, int]:
+    """
+    Returns (earned, marks). A keyed dict answer gives one mark per key; a
+    multi-answer entry ("choose TWO letters") gives one mark per expected
+    item found in the answer; otherwise the items are alternative spellings
+    and one matching answer earns the single mark. ``marks`` always equals
+    ``entry.marks``.
+    """
+    qtype = entry.question_type
+    if entry.slots:
+        given = raw_answer if isinstance(raw_answer, dict) else {}
+        earned = sum(
+            normalize_answer(given.get(k), qtype) in accepted
+            for k, accepted in entry.slots
+        )
+        return earned, len(entry.slots)
+
+    if not entry.items:
+        return 0, 0
+
+    values = raw_answer if isinstance(raw_answer, (list, tuple)) else [raw_answer]
+    given = {normalize_answer(x, qtype) for x in values} - {""}
+    marks = entry.marks
+    if len(given) > marks:
+        return 0, marks  # more picks than marks: no credit for guessing
+    if entry.multi:
+        return sum(any(g in e for g in given) for e in entry.items), marks
+    return int(bool(given & entry.any_of)), marks
+
+
+def _grade_rows(
+    rows: Iterable[UserAnswer], key: AnswerKey
+) -> Tuple[Dict[str, int], Dict[str, int]]:
+    raw: Dict[str, int] = defaultdict(int)
+    by_group: Dict[str, int] = defaultdict(int)
+    for ua in rows:
+        entry = key.entries.get(ua.question_id)  # type: ignore[attr-defined]
+        if entry is None:
+            ua.is_correct = None
+            continue
+        earned, marks = score_entry(entry, ua.raw_answer)
+        ua.is_correct = (earned == marks) if marks else None
+        raw[entry.skill] += earned
+        by_group[f"{entry.skill}:{entry.group_id}"] += earned
+    return raw, by_group
+
+
+@transaction.atomic
+def grade_user_test(user_test: UserTest) -> TestResult:
+    """
+    Scores listening/reading answers of a UserTest against the precompiled
+    answer key: one SELECT of the answer rows, one bulk UPDATE of
+    ``is_correct``, then one upsert of the result row.
+    """
+    key = get_answer_key(user_test.test_id)  # type: ignore[attr-defined]
+    answers = list(
+        UserAnswer.objects.filter(user_test=user_test).only(
+            "id", "question_id", "raw_answer", "is_correct"
+        )
+    )
+    raw, by_group = _grade_rows(answers, key)
+    if answers:
+        UserAnswer.objects.bulk_update(answers, ["is_correct"])
+
+    return upsert_result(
+        user_test.pk,
+        listening=(
+            listening_band(raw["listening"]) if key.has_skill("listening") else None
+        ),
+        reading=reading_band(raw["reading"]) if key.has_skill("reading") else None,
+        errors_analysis={
+            "listening_raw": raw["listening"],
+            "reading_raw": raw["reading"],
+            "listening_total": key.total_marks("listening"),
+            "reading_total": key.total_marks("reading"),
+            "by_group": dict(by_group),
+        },
+    )
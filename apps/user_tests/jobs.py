@@ -0,0 +1,39 @@
+# apps/user_tests/jobs.py
+from apps.core.jobs import enqueue, job
+from apps.core.notifications import send_telegram_user_sync
+from .grading import grade_user_test
+from .models import UserTest
+
+GRADE_USER_TEST = "user_tests.grade"
+NOTIFY_RESULT = "user_tests.notify_result"
+
+
+def _fmt(score):
+    return "-" if score is None else score
+
+
+@job(GRADE_USER_TEST)
+def grade(payload):
+    ut = (
+        UserTest.objects.select_related("test", "user")
+        .filter(id=payload["user_test_id"], status=UserTest.Status.COMPLETED)
+        .first()
+    )
+    if ut is None:
+        return
+    tr = grade_user_test(ut)
+    text = (
+        f"✅ <b>{ut.test.title}</b> natijasi tayyor\n"
+        f"Listening: {_fmt(tr.listening_score)}\n"
+        f"Reading: {_fmt(tr.reading_score)}\n"
+        f"Overall: {_fmt(tr.overall_score)}"
+    )
+    chat_id = ut.user.telegram_id
+    if chat_id:
+        # its own job, so a failed send is retried and kept in last_error
+        enqueue(NOTIFY_RESULT, {"chat_id": chat_id, "text": text})
+
+
+@job(NOTIFY_RESULT)
+def notify_result(payload):
+    send_telegram_user_sync(payload["chat_id"], payload["text"])
@@ -0,0 +1,26 @@
+# apps/user_tests/management/commands/recompute_results.py
+from django.core.management.base import BaseCommand
+
+from apps.user_tests.results import recompute_overall
+
+
+class Command(BaseCommand):
+    help = "Recalculate overall_score of every TestResult with the band rules."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Results updated per statement.",
+        )
+
+    def handle(self, *args, batch_size, **options):
+        last_id, scanned, updated = None, 0, 0
+        while True:
+            last_id, n, changed = recompute_overall(last_id, batch_size)
+            if last_id is None:
+                break
+            scanned += n
+            updated += changed
+        self.stdout.write(f"Checked {scanned} results, updated {updated}")
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.6 on 2026-10-18 03:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tests", "0010_test_test_created_id_idx"),
+        ("user_tests", "0002_alltestsproxy_alter_testresult_options_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="testresult",
+            index=models.Index(fields=["created_at", "id"], name="tr_created_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="usertest",
+            index=models.Index(
+                fields=["user", "created_at", "id"], name="ut_user_created_id_idx"
+            ),
+        ),
+    ]
@@ -51,6 +51,9 @@ class UserTest(models.Model):
         indexes = [
             models.Index(fields=["user", "status"], name="ut_user_status_idx"),
             models.Index(fields=["created_at"], name="ut_created_idx"),
+            models.Index(
+                fields=["user", "created_at", "id"], name="ut_user_created_id_idx"
+            ),
         ]
 
     def __str__(self):
@@ -126,6 +129,7 @@ class TestResult(models.Model):
         indexes = [
             models.Index(fields=["overall_score"], name="tr_overall_idx"),
             models.Index(fields=["created_at"], name="tr_created_idx"),
+            models.Index(fields=["created_at", "id"], name="tr_created_id_idx"),
         ]
 
     def __str__(self):
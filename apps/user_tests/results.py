@@ -0,0 +1,129 @@
+#  apps/user_tests/results.py
+from __future__ import annotations
+
+import json
+import uuid
+from typing import Any, Dict, Optional, Tuple
+
+from django.db import connection, router
+from django.db.models.signals import post_save
+from django.utils import timezone
+
+from apps.teacher_checking.models import TeacherSubmission
+from .bands import overall_sql
+from .models import TestResult, UserTest
+
+__all__ = ("upsert_result", "recompute_overall")
+
+_UNSET: Any = object()
+
+
+def _keep(column: str) -> str:
+    # listening/reading are only overwritten when the caller passed them
+    return f"CASE WHEN %(set_{column})s THEN EXCLUDED.{column} ELSE tr.{column} END"
+
+
+_LISTENING = _keep("listening_score")
+_READING = _keep("reading_score")
+
+_UPSERT_SQL = f"""
+    INSERT INTO {TestResult._meta.db_table} AS tr (
+        id, user_test_id, listening_score, reading_score, writing_score,
+        overall_score, feedback, errors_analysis, created_at, updated_at
+    )
+    SELECT %(id)s, %(user_test)s, %(listening)s, %(reading)s, w.score,
+           {overall_sql("%(listening)s::float8", "%(reading)s::float8", "w.score")},
+           '', %(errors)s::jsonb, %(now)s, %(now)s
+      FROM (
+        SELECT round(avg(score)::numeric, 1)::float8 AS score
+          FROM {TeacherSubmission._meta.db_table}
+         WHERE user_test_id = %(user_test)s AND status = %(checked)s
+      ) AS w
+    ON CONFLICT (user_test_id) DO UPDATE SET
+        listening_score = {_LISTENING},
+        reading_score = {_READING},
+        writing_score = EXCLUDED.writing_score,
+        overall_score = {overall_sql(_LISTENING, _READING, "EXCLUDED.writing_score")},
+        errors_analysis = tr.errors_analysis || EXCLUDED.errors_analysis,
+        updated_at = EXCLUDED.updated_at
+    RETURNING tr.*, (tr.xmax = 0) AS created
+"""
+
+
+def upsert_result(
+    user_test_id,
+    *,
+    listening: Optional[float] = _UNSET,
+    reading: Optional[float] = _UNSET,
+    errors_analysis: Optional[Dict[str, Any]] = None,
+) -> TestResult:
+    """
+    Creates or updates the TestResult of a UserTest in one statement.
+    Writing is always re-aggregated from the checked teacher submissions,
+    listening/reading change only when passed, and ``overall_score`` is
+    computed from the row being written, so the auto grader and teachers
+    grading concurrently cannot overwrite each other's bands.
+    """
+    params = {
+        "id": uuid.uuid4(),
+        "user_test": user_test_id,
+        "checked": TeacherSubmission.Status.CHECKED,
+        "listening": None if listening is _UNSET else listening,
+        "reading": None if reading is _UNSET else reading,
+        "set_listening_score": listening is not _UNSET,
+        "set_reading_score": reading is not _UNSET,
+        "errors": json.dumps(errors_analysis or {}),
+        "now": timezone.now(),
+    }
+    tr = next(iter(TestResult.objects.raw(_UPSERT_SQL, params)))
+    # raw SQL skips the model signals; receivers (e.g. dashboard caches) rely on them
+    post_save.send(
+        sender=TestResult,
+        instance=tr,
+        created=tr.created,
+        update_fields=None,
+        raw=False,
+        using=router.db_for_write(TestResult),
+    )
+    return tr
+
+
+_NEW_OVERALL = overall_sql("tr.listening_score", "tr.reading_score", "tr.writing_score")
+
+_RECOMPUTE_SQL = f"""
+    WITH batch AS (
+        SELECT id FROM {TestResult._meta.db_table}
+         WHERE %(after)s::uuid IS NULL OR id > %(after)s::uuid
+         ORDER BY id
+         LIMIT %(limit)s
+    ), changed AS (
+        UPDATE {TestResult._meta.db_table} AS tr
+           SET overall_score = {_NEW_OVERALL}, updated_at = now()
+          FROM {UserTest._meta.db_table} AS ut
+         WHERE tr.id IN (SELECT id FROM batch)
+           AND ut.id = tr.user_test_id
+           AND tr.overall_score IS DISTINCT FROM {_NEW_OVERALL}
+        RETURNING ut.user_id
+    )
+    SELECT (SELECT id FROM batch ORDER BY id DESC LIMIT 1),
+           (SELECT count(*) FROM batch),
+           (SELECT count(*) FROM changed),
+           (SELECT array_agg(DISTINCT user_id) FROM changed)
+"""
+
+
+def recompute_overall(
+    after=None, limit: int = 1000
+) -> Tuple[Optional[uuid.UUID], int, int]:
+    """
+    Re-derives ``overall_score`` for the next ``limit`` results by id after
+    ``after`` in one UPDATE. Returns (last id, scanned, changed);
+    the last id is None once the table is exhausted.
+    """
+    from apps.profiles.dashboard import invalidate_dashboards
+
+    with connection.cursor() as cur:
+        cur.execute(_RECOMPUTE_SQL, {"after": after, "limit": limit})
+        last_id, scanned, changed, users = cur.fetchone()
+    invalidate_dashboards(users or ())
+    return last_id, scanned, changed
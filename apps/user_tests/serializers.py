@@ -53,3 +53,23 @@ class TestResultSerializer(serializers.ModelSerializer):
             "errors_analysis",
             "created_at",
         ]
+
+
+class AnswersBatchSerializer(serializers.Serializer):
+    MAX_BATCH = 200
+
+    answers = serializers.DictField(
+        child=serializers.JSONField(allow_null=True),
+        allow_empty=False,
+        help_text='{"<question_id>": <raw_answer>, ...} — faqat o\'zgargan javoblar',
+    )
+
+    def validate_answers(self, value):
+        if len(value) > self.MAX_BATCH:
+            raise serializers.ValidationError(
+                f"Bir so'rovda maksimal {self.MAX_BATCH} ta javob."
+            )
+        try:
+            return {int(k): v for k, v in value.items()}
+        except (TypeError, ValueError):
+            raise serializers.ValidationError("Question id butun son bo'lishi kerak.")
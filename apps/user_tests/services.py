@@ -1,12 +1,18 @@
 #  apps/user_tests/services.py
 from decimal import Decimal
+from typing import Any, Dict
 
 from django.core.exceptions import ValidationError
 from django.db import transaction
+from django.db.models import Q
 
-from apps.profiles.models import StudentProfile
+from apps.core.jobs import enqueue
+from apps.profiles.ledger import debit
+from apps.profiles.models import BalanceEntry, StudentProfile
 from apps.tests.models.ielts import Test
-from .models import UserTest
+from apps.tests.models.question import Question
+from .jobs import GRADE_USER_TEST
+from .models import UserTest, UserAnswer
 
 
 @transaction.atomic
@@ -28,11 +34,58 @@ def purchase_test(*, user, test: Test) -> UserTest:
         return ut  # allaqachon sotib olingan
 
     if price > 0:
-        # concurrency-safe balansni tekshirish
-        sp = StudentProfile.objects.select_for_update().get(pk=sp.pk)
-        if sp.balance < price:
-            raise ValidationError("Balance yetarli emas!")
-        sp.balance -= price
-        sp.save(update_fields=["balance"])
+        # mablag' yetarli bo'lmasa atomic blok UserTest yaratilishini ham bekor qiladi
+        debit(
+            student_id=sp.pk,
+            amount=price,
+            kind=BalanceEntry.Kind.TEST_PURCHASE,
+            note=f"Test: {test.title}",
+            reference=ut.pk,
+        )
 
     return ut
+
+
+@transaction.atomic
+def save_answers(*, user_test: UserTest, answers: Dict[int, Any]) -> int:
+    # the row lock orders this save against complete_user_test: answers
+    # either land before completion or are refused
+    locked = UserTest.objects.select_for_update().get(pk=user_test.pk)
+    if locked.status == UserTest.Status.COMPLETED:
+        raise ValidationError("Test allaqachon yakunlangan.")
+
+    known = set(
+        Question.objects.filter(id__in=answers.keys())
+        .filter(
+            Q(sets__listeningsection__listening__test=user_test.test_id)
+            | Q(sets__readingpassage__reading__test=user_test.test_id)
+        )
+        .values_list("id", flat=True)
+        .distinct()
+    )
+    unknown = sorted(set(answers) - known)
+    if unknown:
+        raise ValidationError(f"Savollar bu testga tegishli emas: {unknown}")
+
+    UserAnswer.objects.bulk_create(
+        [
+            UserAnswer(user_test=user_test, question_id=qid, raw_answer=raw)
+            for qid, raw in answers.items()
+        ],
+        update_conflicts=True,
+        unique_fields=["user_test", "question"],
+        update_fields=["raw_answer", "is_correct"],
+    )
+
+    if locked.status == UserTest.Status.NOT_STARTED:
+        locked.mark_started()
+    user_test.status, user_test.started_at = locked.status, locked.started_at
+    return len(answers)
+
+
+@transaction.atomic
+def complete_user_test(*, user_test: UserTest) -> UserTest:
+    """Marks the test completed and queues listening/reading grading."""
+    user_test.mark_completed()
+    enqueue(GRADE_USER_TEST, {"user_test_id": str(user_test.id)}, dedupe=True)
+    return user_test
@@ -7,4 +7,6 @@ urlpatterns = [
     path("purchase/<int:test_id>/", views.purchase_test_api, name="purchase-test"),
     path("my-tests/", views.my_tests, name="my-tests"),
     path("results/", views.my_results, name="my-results"),
+    path("<uuid:user_test_id>/answers/", views.save_answers_api, name="save-answers"),
+    path("<uuid:user_test_id>/complete/", views.complete_test, name="complete-test"),
 ]
@@ -1,4 +1,5 @@
 # apps/user_tests/views.py
+from django.core.exceptions import ValidationError
 from django.db.models import Exists, OuterRef
 from django.shortcuts import get_object_or_404
 from drf_spectacular.types import OpenApiTypes
@@ -8,14 +9,16 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from apps.core.pagination import KeysetPagination
 from apps.tests.models.ielts import Test
 from .models import UserTest, TestResult
 from .serializers import (
     TestListItemSerializer,
     UserTestSerializer,
     TestResultSerializer,
+    AnswersBatchSerializer,
 )
-from .services import purchase_test
+from .services import purchase_test, save_answers, complete_user_test
 
 
 @extend_schema(
@@ -27,12 +30,12 @@ from .services import purchase_test
 @permission_classes([IsAuthenticated])
 def all_tests(request):
     purchased_qs = UserTest.objects.filter(user=request.user, test=OuterRef("pk"))
-    tests = (
-        Test.objects.all()
-        .annotate(purchased=Exists(purchased_qs))
-        .order_by("-created_at")
+    tests = Test.objects.annotate(purchased=Exists(purchased_qs))
+    paginator = KeysetPagination()
+    page = paginator.paginate_queryset(tests, request)
+    return paginator.get_paginated_response(
+        TestListItemSerializer(page, many=True).data
     )
-    return Response(TestListItemSerializer(tests, many=True).data)
 
 
 @extend_schema(
@@ -74,12 +77,10 @@ def purchase_test_api(request, test_id: int):
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def my_tests(request):
-    uts = (
-        UserTest.objects.filter(user=request.user)
-        .select_related("test")
-        .order_by("-created_at")
-    )
-    return Response(UserTestSerializer(uts, many=True).data)
+    uts = UserTest.objects.filter(user=request.user).select_related("test")
+    paginator = KeysetPagination()
+    page = paginator.paginate_queryset(uts, request)
+    return paginator.get_paginated_response(UserTestSerializer(page, many=True).data)
 
 
 @extend_schema(
@@ -90,9 +91,55 @@ def my_tests(request):
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def my_results(request):
-    results = (
-        TestResult.objects.filter(user_test__user=request.user)
-        .select_related("user_test__test")
-        .order_by("-created_at")
+    results = TestResult.objects.filter(user_test__user=request.user).select_related(
+        "user_test__test"
+    )
+    paginator = KeysetPagination()
+    page = paginator.paginate_queryset(results, request)
+    return paginator.get_paginated_response(TestResultSerializer(page, many=True).data)
+
+
+@extend_schema(
+    tags=["UserTests"],
+    summary="Javoblarni saqlash (autosave, batch)",
+    description=(
+        "Faqat o'zgargan javoblar yuboriladi: "
+        '`{"answers": {"<question_id>": <raw_answer>}}`. '
+        "Mavjud javoblar ustidan yoziladi (upsert). Birinchi saqlashda test "
+        "`in_progress` holatiga o'tadi."
+    ),
+    request=AnswersBatchSerializer,
+    responses={200: dict},
+)
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def save_answers_api(request, user_test_id):
+    ut = get_object_or_404(UserTest, id=user_test_id, user=request.user)
+    ser = AnswersBatchSerializer(data=request.data)
+    ser.is_valid(raise_exception=True)
+    try:
+        saved = save_answers(user_test=ut, answers=ser.validated_data["answers"])
+    except ValidationError as e:
+        return Response({"error": e.messages[0]}, status=400)
+    return Response({"saved": saved, "status": ut.status})
+
+
+@extend_schema(
+    tags=["UserTests"],
+    summary="Testni yakunlash",
+    description=(
+        "Listening/reading fon rejimida baholanadi; natija tayyor bo'lgach "
+        "`results/` ro'yxatida chiqadi."
+    ),
+    request=None,
+    responses={202: dict},
+)
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def complete_test(request, user_test_id):
+    ut = get_object_or_404(UserTest, id=user_test_id, user=request.user)
+    complete_user_test(user_test=ut)
+    return Response(
+        {"id": str(ut.id), "status": ut.status, "grading": "queued"},
+        status=status.HTTP_202_ACCEPTED,
     )
-    return Response(TestResultSerializer(results, many=True).data)
@@ -151,6 +151,7 @@ class User(UUIDPrimaryKeyMixin, TimeStampedMixin, AbstractBaseUser, PermissionsM
             models.Index(fields=["role"], name="users_role_idx"),
             models.Index(fields=["telegram_id"], name="users_tgid_idx"),
             models.Index(fields=["created_at"], name="users_created_idx"),
+            models.Index(fields=["created_at", "id"], name="users_created_id_idx"),
         ]
         constraints = [
             models.CheckConstraint(
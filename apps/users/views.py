@@ -7,6 +7,7 @@ from rest_framework import generics, permissions, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 
+from apps.core.pagination import KeysetPagination
 from .models import User
 from .permissions import IsSuperAdmin
 from .serializers import (
@@ -68,9 +69,10 @@ class MeView(generics.RetrieveUpdateAPIView):
 class UsersListView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated, IsSuperAdmin]
     serializer_class = UserReadSerializer
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
-        qs = User.objects.all().order_by("-created_at")
+        qs = User.objects.all()
         q = self.request.query_params.get("q")  # noqa
         role = self.request.query_params.get("role")  # noqa
         is_active = self.request.query_params.get("is_active")  # noqa
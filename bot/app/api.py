@@ -1,29 +1,141 @@
 # bot/app/api.py
 from __future__ import annotations
 
-import os
-from typing import Any
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Optional
 
 import httpx
 
-BACKEND_BASE_URL = os.getenv("BACKEND_BASE_URL", "http://web:8700")
-INGEST_TOKEN = os.getenv("BOT_INGEST_TOKEN")
+from .config import settings
+from .metrics import backend_latency
+
+log = logging.getLogger(__name__)
+
+RETRY_STATUSES = (502, 503, 504)
+
+
+class BackendUnavailable(httpx.HTTPError):
+    """Raised without a request while the circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Opens after ``threshold`` consecutive failures and fails fast for
+    ``reset_after`` seconds; then lets one trial call through (half-open)
+    and closes again on its success.
+    """
+
+    def __init__(self, threshold: int, reset_after: float):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial = False
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def allow(self) -> bool:
+        if self.opened_at is None:
+            return True
+        if self._trial or time.monotonic() - self.opened_at < self.reset_after:
+            return False
+        self._trial = True
+        return True
+
+    def success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+
+    def release(self) -> None:
+        """Frees the half-open slot of a call that ended without a verdict."""
+        self._trial = False
+
+    def failure(self) -> None:
+        self.failures += 1
+        self._trial = False
+        if self.opened_at is not None or self.failures >= self.threshold:
+            if self.opened_at is None:
+                log.warning("Backend circuit opened after %s failures", self.failures)
+            self.opened_at = time.monotonic()
 
 
 class BackendClient:
     def __init__(self) -> None:
-        self._client = httpx.AsyncClient(base_url=BACKEND_BASE_URL, timeout=10.0)
-        self._hdr = {"X-Bot-Token": INGEST_TOKEN or ""}
+        self._client = httpx.AsyncClient(
+            base_url=settings.backend_base_url,
+            timeout=httpx.Timeout(
+                settings.backend_timeout, connect=settings.backend_connect_timeout
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.backend_max_connections,
+                max_keepalive_connections=settings.backend_max_keepalive,
+                keepalive_expiry=30,
+            ),
+        )
+        self._hdr = {"X-Bot-Token": settings.bot_ingest_token or ""}
+        self.breaker = CircuitBreaker(
+            settings.backend_breaker_threshold, settings.backend_breaker_reset
+        )
 
     async def close(self) -> None:
         await self._client.aclose()
 
+    async def _request(
+        self, method: str, path: str, *, retry: bool = False, **kwargs
+    ) -> httpx.Response:
+        """
+        Sends one call through the circuit breaker. ``retry`` marks the call
+        idempotent: transport errors and 502/503/504 are retried with
+        exponential backoff and full jitter.
+        """
+        attempts = 1 + (settings.backend_retries if retry else 0)
+        for attempt in range(attempts):
+            if not self.breaker.allow():
+                raise BackendUnavailable(f"Backend circuit open: {method} {path}")
+            trial = self.breaker.is_open
+            started = time.perf_counter()
+            try:
+                r = await self._client.request(
+                    method, path, headers=self._hdr, **kwargs
+                )
+            except httpx.TransportError as e:
+                backend_latency.observe(
+                    time.perf_counter() - started, path, type(e).__name__
+                )
+                self.breaker.failure()
+                if attempt + 1 >= attempts:
+                    raise
+            else:
+                backend_latency.observe(
+                    time.perf_counter() - started, path, str(r.status_code)
+                )
+                if r.status_code < 500:
+                    self.breaker.success()
+                    return r
+                self.breaker.failure()
+                if r.status_code not in RETRY_STATUSES or attempt + 1 >= attempts:
+                    return r
+            finally:
+                # cancellation or a non-transport error must not hold the slot
+                if trial:
+                    self.breaker.release()
+            delay = settings.backend_backoff * (2**attempt)
+            await asyncio.sleep(random.uniform(0, delay))
+        raise AssertionError("unreachable")
+
     async def get_otp_status(
         self, *, telegram_id: int, telegram_username: str, purpose: str
     ) -> dict[str, Any]:
-        r = await self._client.get(
+        r = await self._request(
+            "GET",
             "/api/accounts/otp/status/",
-            headers=self._hdr,
+            retry=True,
             params={
                 "telegram_id": telegram_id,
                 "telegram_username": telegram_username or "",
@@ -36,9 +148,9 @@ class BackendClient:
     async def push_otp(
         self, *, telegram_id: int, telegram_username: str, code: str, purpose: str
     ) -> httpx.Response:
-        r = await self._client.post(
+        r = await self._request(
+            "POST",
             "/api/accounts/otp/ingest/",
-            headers=self._hdr,
             json={
                 "telegram_id": telegram_id,
                 "telegram_username": telegram_username or "",
@@ -50,5 +162,25 @@ class BackendClient:
             r.raise_for_status()
         return r
 
+    async def issue_otp(
+        self, *, telegram_id: int, telegram_username: str, code: str, purpose: str
+    ) -> httpx.Response:
+        """201 stored, 200 an alive code already exists, 409 code collision."""
+        # a repeated call with the same code answers 201 again, so it is retried
+        r = await self._request(
+            "POST",
+            "/api/accounts/otp/issue/",
+            retry=True,
+            json={
+                "telegram_id": telegram_id,
+                "telegram_username": telegram_username or "",
+                "code": code,
+                "purpose": purpose,
+            },
+        )
+        if r.status_code not in (200, 201, 409):
+            r.raise_for_status()
+        return r
+
 
 backend_client = BackendClient()
@@ -2,12 +2,12 @@
 from __future__ import annotations
 
 import logging
-import time
 from aiogram import Router, types, F
 
 from ..otp import generate_otp
 from ..api import backend_client
 from ..otp_cache import get_code, set_code
+from ..state import state
 
 router = Router(name="auth")
 log = logging.getLogger(__name__)
@@ -28,41 +28,62 @@ LOGIN_ALIASES = [
     "Login code🔐",
 ]
 
-_last_press: dict[int, float] = {}
 DEBOUNCE_SEC = 2
+RATE_WINDOW_SEC = 10 * 60
+RATE_MAX_PRESSES = 10
 
 
-def _debounced(user_id: int) -> bool:
-    now = time.time()
-    last = _last_press.get(user_id, 0)
-    _last_press[user_id] = now
-    return (now - last) < DEBOUNCE_SEC
+async def _debounced(user_id: int) -> bool:
+    return not await state.add(f"press:{user_id}", "1", DEBOUNCE_SEC)
+
+
+async def _rate_limited(user_id: int) -> bool:
+    return await state.incr(f"presses:{user_id}", RATE_WINDOW_SEC) > RATE_MAX_PRESSES
 
 
 async def _handle_purpose(msg: types.Message, purpose: str) -> None:
     if not msg.from_user:
         await msg.answer("Telegram foydalanuvchi ma’lumoti yo‘q.")
         return
-    if _debounced(msg.from_user.id):
+    if await _debounced(msg.from_user.id):
+        return
+    if await _rate_limited(msg.from_user.id):
+        await msg.answer("⏳ Juda ko‘p so‘rov. Birozdan so‘ng urinib ko‘ring.")
         return
 
     tg_id = msg.from_user.id
     tg_username = msg.from_user.username or ""
 
     try:
-        status = await backend_client.get_otp_status(
-            telegram_id=tg_id, telegram_username=tg_username, purpose=purpose
-        )
+        for _ in range(3):
+            new_code = generate_otp()
+            r = await backend_client.issue_otp(
+                telegram_id=tg_id,
+                telegram_username=tg_username,
+                code=new_code,
+                purpose=purpose,
+            )
+            # another user holds the same code right now: pick a new one
+            if r.status_code != 409:
+                break
     except Exception as e:
-        log.exception("Status check failed: %s", e)
+        log.exception("OTP issue failed: %s", e)
         await msg.answer("❌ Server bilan aloqa xatosi. Keyinroq urinib ko‘ring.")
         return
 
-    active = bool(status.get("active"))
-    remaining = int(status.get("remaining_seconds") or 0)
+    if r.status_code == 201:
+        await set_code(tg_id, purpose, new_code, ttl_seconds=120)
+        await msg.answer(
+            f"✅ {purpose.title()} OTP: *{new_code}*\n"
+            "Kod 2 daqiqa ichida amal qiladi.\n"
+            "Iltimos, ilovadagi mos oynaga kodni kiriting.",
+            parse_mode="Markdown",
+        )
+        return
 
-    if active and remaining > 0:
-        cached = get_code(tg_id, purpose)
+    if r.status_code == 200:
+        remaining = int(r.json().get("remaining_seconds") or 0)
+        cached = await get_code(tg_id, purpose)
         if cached:
             code, rem = cached
             await msg.answer(
@@ -76,43 +97,6 @@ async def _handle_purpose(msg: types.Message, purpose: str) -> None:
             )
         return
 
-    new_code = generate_otp()
-    try:
-        r = await backend_client.push_otp(
-            telegram_id=tg_id,
-            telegram_username=tg_username,
-            code=new_code,
-            purpose=purpose,
-        )
-    except Exception as e:
-        log.exception("OTP ingest failed: %s", e)
-        await msg.answer("❌ Kodni saqlashda xatolik. Keyinroq urinib ko‘ring.")
-        return
-
-    if r.status_code == 201:
-        set_code(tg_id, purpose, new_code, ttl_seconds=120)
-        await msg.answer(
-            f"✅ {purpose.title()} OTP: *{new_code}*\n"
-            "Kod 2 daqiqa ichida amal qiladi.\n"
-            "Iltimos, ilovadagi mos oynaga kodni kiriting.",
-            parse_mode="Markdown",
-        )
-        return
-
-    if r.status_code == 409:
-        try:
-            status = await backend_client.get_otp_status(
-                telegram_id=tg_id, telegram_username=tg_username, purpose=purpose
-            )
-            remaining = int(status.get("remaining_seconds") or 0)
-        except Exception:
-            remaining = 0
-        await msg.answer(
-            "⚠️ Aktiv kod allaqachon mavjud.\n"
-            + (f"Qolgan vaqt: {remaining} soniya." if remaining else "")
-        )
-        return
-
     await msg.answer("❌ Kutilmagan xatolik.")
 
 
@@ -1,20 +1,28 @@
 #  bot/app/health.py
 from __future__ import annotations
 
+from typing import Optional
+
 from aiohttp import web
 
 from .config import settings
+from .metrics import handle_metrics
 
 
 async def handle_health(_request: web.Request) -> web.Response:
     return web.Response(text="healthy\n")
 
 
-async def start_health_server() -> None:
+def build_app() -> web.Application:
     app = web.Application()
     app.router.add_get("/health", handle_health)
+    app.router.add_get("/metrics", handle_metrics)
+    return app
+
 
-    runner = web.AppRunner(app)
+async def start_health_server(app: Optional[web.Application] = None) -> web.AppRunner:
+    runner = web.AppRunner(app or build_app())
     await runner.setup()
     site = web.TCPSite(runner, settings.health_host, settings.health_port)
     await site.start()
+    return runner
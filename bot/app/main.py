@@ -7,7 +7,43 @@ import logging
 from .logger import setup_logging
 from .bot import build_bot, build_dispatcher
 from .api import backend_client
-from .health import start_health_server
+from .config import settings
+from .health import build_app, start_health_server
+from .state import run_sweeper, state
+from .webhook import UpdatePipeline, webhook_handler
+
+
+async def _run_polling(bot, dp, log: logging.Logger) -> None:
+    asyncio.create_task(start_health_server())
+    await bot.delete_webhook(drop_pending_updates=True)
+    log.info("Starting polling...")
+    await dp.start_polling(bot, allowed_updates=["message"])
+
+
+async def _run_webhook(bot, dp, log: logging.Logger) -> None:
+    pipeline = UpdatePipeline(
+        bot,
+        dp,
+        concurrency=settings.webhook_concurrency,
+        max_pending=settings.webhook_max_pending,
+    )
+    app = build_app()
+    app.router.add_post(settings.webhook_path, webhook_handler(pipeline))
+    runner = await start_health_server(app)
+
+    url = settings.webhook_base_url.rstrip("/") + settings.webhook_path
+    await bot.set_webhook(
+        url,
+        secret_token=settings.webhook_secret,
+        allowed_updates=["message"],
+        max_connections=100,
+    )
+    log.info("Receiving updates via webhook at %s", url)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()  # stop accepting, then finish what was accepted
+        await pipeline.drain()
 
 
 async def _main() -> None:
@@ -17,14 +53,15 @@ async def _main() -> None:
     bot = build_bot()
     dp = build_dispatcher()
 
-    asyncio.create_task(start_health_server())
-
-    await bot.delete_webhook(drop_pending_updates=True)
-
-    log.info("Starting polling...")
+    sweeper = asyncio.create_task(run_sweeper(settings.state_sweep_interval))
     try:
-        await dp.start_polling(bot, allowed_updates=["message"])
+        if settings.bot_mode == "webhook":
+            await _run_webhook(bot, dp, log)
+        else:
+            await _run_polling(bot, dp, log)
     finally:
+        sweeper.cancel()
+        await state.close()
         await backend_client.close()
         await bot.session.close()
         log.info("Bot stopped.")
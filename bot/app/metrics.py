@@ -0,0 +1,62 @@
+# bot/app/metrics.py
+"""Tiny Prometheus-format metrics for the bot's /metrics endpoint."""
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from aiohttp import web
+
+# seconds
+BUCKETS: Tuple[float, ...] = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets=BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        # label values -> [per-bucket counts..., +Inf count]
+        self._counts: Dict[Tuple[str, ...], List[int]] = defaultdict(
+            lambda: [0] * (len(buckets) + 1)
+        )
+        self._sums: Dict[Tuple[str, ...], float] = defaultdict(float)
+        self.labels: Tuple[str, ...] = ("endpoint", "outcome")
+
+    def observe(self, value: float, *label_values: str) -> None:
+        self._counts[label_values][bisect_left(self.buckets, value)] += 1
+        self._sums[label_values] += value
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for values, counts in sorted(self._counts.items()):
+            labels = ",".join(f'{k}="{v}"' for k, v in zip(self.labels, values))
+            total = 0
+            for bound, n in zip((*self.buckets, "+Inf"), counts):
+                total += n
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {total}')
+            lines.append(f"{self.name}_sum{{{labels}}} {self._sums[values]:.6f}")
+            lines.append(f"{self.name}_count{{{labels}}} {total}")
+        return lines
+
+
+backend_latency = Histogram(
+    "bot_backend_request_seconds", "Latency of backend API calls."
+)
+
+
+async def handle_metrics(_request: web.Request) -> web.Response:
+    from .api import backend_client
+
+    lines = backend_latency.render()
+    lines += [
+        "# HELP bot_backend_circuit_open 1 while backend calls fail fast.",
+        "# TYPE bot_backend_circuit_open gauge",
+        f"bot_backend_circuit_open {int(backend_client.breaker.is_open)}",
+    ]
+    body = "\n".join(lines) + "\n"
+    return web.Response(text=body, content_type="text/plain")
@@ -1,30 +1,24 @@
 # bot/app/otp_cache.py
 from __future__ import annotations
 
-import time
 from typing import Optional, Tuple
 
-_store: dict[tuple[int, str], tuple[str, float]] = {}
+from .state import now, state
 
 
-def set_code(telegram_id: int, purpose: str, code: str, ttl_seconds: int) -> None:
-    _store[(telegram_id, purpose)] = (code, time.time() + ttl_seconds)
+def _key(telegram_id: int, purpose: str) -> str:
+    return f"otp:{telegram_id}:{purpose}"
 
 
-def get_code(telegram_id: int, purpose: str) -> Optional[Tuple[str, int]]:
-    data = _store.get((telegram_id, purpose))
-    if not data:
-        return None
-    code, exp = data
-    remaining = int(exp - time.time())
-    if remaining <= 0:
-        _store.pop((telegram_id, purpose), None)
-        return None
-    return code, remaining
+async def set_code(telegram_id: int, purpose: str, code: str, ttl_seconds: int) -> None:
+    expires_at = now() + ttl_seconds
+    await state.set(_key(telegram_id, purpose), f"{code}:{expires_at}", ttl_seconds)
 
 
-def clear_expired() -> None:
-    now = time.time()
-    for k, (_, exp) in list(_store.items()):
-        if exp <= now:
-            _store.pop(k, None)
+async def get_code(telegram_id: int, purpose: str) -> Optional[Tuple[str, int]]:
+    value = await state.get(_key(telegram_id, purpose))
+    if not value:
+        return None
+    code, exp = value.split(":", 1)
+    remaining = int(float(exp) - now())
+    return (code, remaining) if remaining > 0 else None
@@ -1,83 +1,224 @@
 # bot/app/state.py
+"""
+Short-lived bot state (debounce marks, rate-limit windows, issued codes)
+behind one small async interface. ``STATE_URL`` picks the backend:
+
+- ``memory://``                — per process, bounded LRU (default)
+- ``sqlite:////data/state.db`` — replicas on one host sharing a volume
+- ``postgresql://...``         — replicas anywhere
+"""
 from __future__ import annotations
 
+import abc
+import asyncio
+import logging
+import sqlite3
+import threading
 import time
-from dataclasses import dataclass
-from typing import Dict, Tuple, Optional
+from collections import OrderedDict
+from typing import Optional, Tuple
 
+from .config import settings
 
-@dataclass
-class OtpEntry:
-    code: str
-    expires_at: float
-    last_req_at: float
-    hits_window_start: float
-    hits_in_window: int
-
-
-_otp_cache: Dict[Tuple[int, str], OtpEntry] = {}
-
-OTP_TTL_SEC = 120
-MIN_INTERVAL_SEC = 2
-WINDOW_SEC = 10
-MAX_HITS_IN_WINDOW = 5
+log = logging.getLogger(__name__)
 
 
 def now() -> float:
     return time.time()
 
 
-def get_active_otp(tg_id: int, purpose: str) -> Optional[OtpEntry]:
-    key = (tg_id, purpose)
-    entry = _otp_cache.get(key)
-    if not entry:
-        return None
-    if entry.expires_at <= now():
-        _otp_cache.pop(key, None)
-        return None
-    return entry
-
-
-def can_request(tg_id: int, purpose: str) -> Tuple[bool, float]:
-    t = now()
-    key = (tg_id, purpose)
-    entry = _otp_cache.get(key)
-
-    if entry and (t - entry.last_req_at) < MIN_INTERVAL_SEC:
-        return False, max(0.0, MIN_INTERVAL_SEC - (t - entry.last_req_at))
-
-    if entry:
-        if (t - entry.hits_window_start) > WINDOW_SEC:
-            entry.hits_window_start = t
-            entry.hits_in_window = 0
-        if entry.hits_in_window >= MAX_HITS_IN_WINDOW:
-            return False, max(0.0, WINDOW_SEC - (t - entry.hits_window_start))
-    return True, 0.0
-
-
-def record_hit(tg_id: int, purpose: str) -> None:
-    t = now()
-    key = (tg_id, purpose)
-    entry = _otp_cache.get(key)
-    if entry:
-        entry.last_req_at = t
-        if (t - entry.hits_window_start) > WINDOW_SEC:
-            entry.hits_window_start = t
-            entry.hits_in_window = 1
-        else:
-            entry.hits_in_window += 1
-
-
-def save_new_otp(
-    tg_id: int, purpose: str, code: str, ttl_sec: int = OTP_TTL_SEC
-) -> OtpEntry:
-    t = now()
-    entry = OtpEntry(
-        code=code,
-        expires_at=t + ttl_sec,
-        last_req_at=t,
-        hits_window_start=t,
-        hits_in_window=1,
-    )
-    _otp_cache[(tg_id, purpose)] = entry
-    return entry
+class StateBackend(abc.ABC):
+    @abc.abstractmethod
+    async def get(self, key: str) -> Optional[str]: ...
+
+    @abc.abstractmethod
+    async def set(self, key: str, value: str, ttl: float) -> None: ...
+
+    @abc.abstractmethod
+    async def add(self, key: str, value: str, ttl: float) -> bool:
+        """Sets ``key`` only if it is absent or expired; True if it was set."""
+
+    @abc.abstractmethod
+    async def incr(self, key: str, ttl: float) -> int:
+        """Counter that starts at 1 and resets ``ttl`` seconds after its first hit."""
+
+    @abc.abstractmethod
+    async def sweep(self) -> int:
+        """Drops expired keys; returns how many."""
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryState(StateBackend):
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+    def _alive(self, key: str) -> Optional[Tuple[str, float]]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        if item[1] <= now():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return item
+
+    def _put(self, key: str, value: str, expires_at: float) -> None:
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)  # least recently used
+
+    async def get(self, key: str) -> Optional[str]:
+        item = self._alive(key)
+        return item[0] if item else None
+
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        self._put(key, value, now() + ttl)
+
+    async def add(self, key: str, value: str, ttl: float) -> bool:
+        if self._alive(key):
+            return False
+        self._put(key, value, now() + ttl)
+        return True
+
+    async def incr(self, key: str, ttl: float) -> int:
+        item = self._alive(key)
+        if item is None:
+            self._put(key, "1", now() + ttl)
+            return 1
+        n = int(item[0]) + 1
+        self._put(key, str(n), item[1])
+        return n
+
+    async def sweep(self) -> int:
+        t = now()
+        dead = [k for k, (_, exp) in self._data.items() if exp <= t]
+        for k in dead:
+            del self._data[k]
+        return len(dead)
+
+
+# Shared SQL for the database backends ("%s" placeholders, SQLite gets "?")
+_TABLE = "bot_state"
+_CREATE = (
+    f"CREATE TABLE IF NOT EXISTS {_TABLE} ("
+    "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at DOUBLE PRECISION NOT NULL)"
+)
+_GET = f"SELECT value FROM {_TABLE} WHERE key = %s AND expires_at > %s"
+_SET = (
+    f"INSERT INTO {_TABLE} (key, value, expires_at) VALUES (%s, %s, %s) "
+    "ON CONFLICT (key) DO UPDATE SET value = excluded.value, "
+    "expires_at = excluded.expires_at"
+)
+_ADD = _SET + f" WHERE {_TABLE}.expires_at <= %s RETURNING key"
+_INCR = (
+    f"INSERT INTO {_TABLE} (key, value, expires_at) VALUES (%s, '1', %s) "
+    "ON CONFLICT (key) DO UPDATE SET "
+    f"value = CASE WHEN {_TABLE}.expires_at <= %s THEN '1' "
+    f"ELSE CAST(CAST({_TABLE}.value AS INTEGER) + 1 AS TEXT) END, "
+    f"expires_at = CASE WHEN {_TABLE}.expires_at <= %s "
+    f"THEN excluded.expires_at ELSE {_TABLE}.expires_at END "
+    "RETURNING value"
+)
+_SWEEP = f"DELETE FROM {_TABLE} WHERE expires_at <= %s"
+
+
+class _SqlState(StateBackend):
+    @abc.abstractmethod
+    async def _exec(self, sql: str, *params) -> Tuple[list, int]:
+        """Runs ``sql``; returns (fetched rows, affected row count)."""
+
+    async def get(self, key: str) -> Optional[str]:
+        rows, _ = await self._exec(_GET, key, now())
+        return rows[0][0] if rows else None
+
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        await self._exec(_SET, key, value, now() + ttl)
+
+    async def add(self, key: str, value: str, ttl: float) -> bool:
+        t = now()
+        rows, _ = await self._exec(_ADD, key, value, t + ttl, t)
+        return bool(rows)
+
+    async def incr(self, key: str, ttl: float) -> int:
+        t = now()
+        rows, _ = await self._exec(_INCR, key, t + ttl, t, t)
+        return int(rows[0][0])
+
+    async def sweep(self) -> int:
+        _, n = await self._exec(_SWEEP, now())
+        return n
+
+
+class SqliteState(_SqlState):
+    """One file shared by processes on the same host (WAL, busy timeout)."""
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(
+            path, timeout=5, isolation_level=None, check_same_thread=False
+        )
+        self._lock = threading.Lock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_CREATE)
+
+    def _run(self, sql: str, params: tuple) -> Tuple[list, int]:
+        with self._lock:
+            cur = self._conn.execute(sql.replace("%s", "?"), params)
+            return cur.fetchall(), cur.rowcount
+
+    async def _exec(self, sql: str, *params) -> Tuple[list, int]:
+        return await asyncio.to_thread(self._run, sql, params)
+
+    async def close(self) -> None:
+        self._conn.close()
+
+
+class PostgresState(_SqlState):
+    """An UNLOGGED table: state survives bot restarts, not a database crash."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self._conn = None
+        self._lock = asyncio.Lock()
+
+    async def _exec(self, sql: str, *params) -> Tuple[list, int]:
+        import psycopg  # only needed for this backend
+
+        async with self._lock:
+            if self._conn is None or self._conn.closed:
+                self._conn = await psycopg.AsyncConnection.connect(
+                    self.url, autocommit=True
+                )
+                await self._conn.execute(_CREATE.replace("TABLE", "UNLOGGED TABLE", 1))
+            cur = await self._conn.execute(sql, params)
+            rows = await cur.fetchall() if cur.description else []
+            return rows, cur.rowcount
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            await self._conn.close()
+
+
+def build_state(url: str) -> StateBackend:
+    if url.startswith("sqlite:///"):
+        return SqliteState(url[len("sqlite:///") :])
+    if url.startswith(("postgres://", "postgresql://")):
+        return PostgresState(url)
+    return MemoryState(settings.state_max_entries)
+
+
+state = build_state(settings.state_url)
+
+
+async def run_sweeper(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            n = await state.sweep()
+            if n:
+                log.debug("State sweeper dropped %s expired keys", n)
+        except Exception as e:
+            log.warning("State sweep failed: %s", e)
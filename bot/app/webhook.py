@@ -0,0 +1,104 @@
+# bot/app/webhook.py
+"""
+Webhook mode: Telegram POSTs updates to the aiohttp app, which acknowledges
+at once and processes them in the background. At most
+``WEBHOOK_CONCURRENCY`` updates run at a time, and updates of the same user
+run one after another in arrival order.
+"""
+from __future__ import annotations
+
+import asyncio
+import hmac
+import logging
+from collections import defaultdict
+from typing import Dict, Optional, Set
+
+from aiogram import Bot, Dispatcher, types
+from aiohttp import web
+
+from .config import settings
+
+log = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+def _sender_id(update: types.Update) -> Optional[int]:
+    event = update.event
+    user = getattr(event, "from_user", None)
+    if user is not None:
+        return user.id
+    chat = getattr(event, "chat", None)
+    return chat.id if chat is not None else None
+
+
+class UpdatePipeline:
+    def __init__(self, bot: Bot, dp: Dispatcher, concurrency: int, max_pending: int):
+        self.bot = bot
+        self.dp = dp
+        self.max_pending = max_pending
+        self._slots = asyncio.Semaphore(concurrency)
+        self._locks: Dict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self._waiting: Dict[int, int] = defaultdict(int)
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def pending(self) -> int:
+        return len(self._tasks)
+
+    def submit(self, update: types.Update) -> bool:
+        """Schedules ``update``; False when the backlog is full."""
+        if self.pending >= self.max_pending:
+            return False
+        task = asyncio.create_task(self._run(update))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    async def _run(self, update: types.Update) -> None:
+        uid = _sender_id(update)
+        if uid is None:
+            async with self._slots:
+                await self._feed(update)
+            return
+        # the per-user lock is taken before a slot, so a user's updates keep
+        # their order and cannot hold slots while waiting on each other
+        self._waiting[uid] += 1
+        try:
+            async with self._locks[uid]:
+                async with self._slots:
+                    await self._feed(update)
+        finally:
+            self._waiting[uid] -= 1
+            if not self._waiting[uid]:
+                del self._waiting[uid]
+                self._locks.pop(uid, None)
+
+    async def _feed(self, update: types.Update) -> None:
+        try:
+            await self.dp.feed_update(self.bot, update)
+        except Exception:
+            log.exception("Update %s failed", update.update_id)
+
+    async def drain(self, timeout: float = 10) -> None:
+        if self._tasks:
+            await asyncio.wait(self._tasks, timeout=timeout)
+
+
+def webhook_handler(pipeline: UpdatePipeline):
+    async def handle(request: web.Request) -> web.Response:
+        given = request.headers.get(SECRET_HEADER, "")
+        if not hmac.compare_digest(given.encode(), settings.webhook_secret.encode()):
+            return web.Response(status=401)
+        try:
+            update = types.Update.model_validate(
+                await request.json(), context={"bot": pipeline.bot}
+            )
+        except ValueError:
+            return web.Response(status=400)
+        if not pipeline.submit(update):
+            # Telegram redelivers on non-2xx, so the update is not lost
+            return web.Response(status=503)
+        return web.Response()
+
+    return handle
@@ -3,6 +3,7 @@ from pathlib import Path
 from datetime import timedelta
 
 import environ
+from django.core.exceptions import ImproperlyConfigured
 
 TELEGRAM_BOT_INGEST_TOKEN = os.getenv("TELEGRAM_BOT_INGEST_TOKEN")
 
@@ -92,6 +93,19 @@ DATABASES = {
     }
 }
 
+# ===================================
+# CACHE
+# ===================================
+# Version tokens (apps.core.cache), OTP status and answer keys are shared
+# between uvicorn workers and the worker/sweeper containers, so anything but
+# local development needs a shared backend: CACHE_URL=redis://redis:6379/1
+CACHES = {"default": env.cache("CACHE_URL", default="locmemcache://")}
+if not DEBUG and CACHES["default"]["BACKEND"].endswith("LocMemCache"):
+    raise ImproperlyConfigured(
+        "CACHE_URL must point to a shared cache (e.g. redis://redis:6379/1) "
+        "when DEBUG is off; a per-process cache serves stale data."
+    )
+
 # ===================================
 # AUTH USER MODEL
 # ===================================
@@ -197,6 +211,7 @@ REST_FRAMEWORK = {
         "otp_ingest": "60/min",
         "otp_verify": "20/min",
         "otp_status": "60/min",
+        "test_detail": "600/min",
     },
     # --- API schema (Swagger/OpenAPI)
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
@@ -263,6 +278,7 @@ CLICK = {
     "BASE_URL": env("CLICK_BASE_URL"),
     "RETURN_URL": env("CLICK_RETURN_URL"),
     "CANCEL_URL": env("CLICK_CANCEL_URL"),
+    "API_URL": env("CLICK_API_URL", default="https://api.click.uz/v2/merchant"),
     "ALLOWED_IPS": [
         "91.204.239.44",
         "91.204.239.45",
@@ -272,12 +288,62 @@ CLICK = {
 PAYMENTS = {
     "MIN_TOPUP": 1000,  # 1 000 UZS
     "MAX_TOPUP": 5_000_000,  # 5 mln UZS
+    # `manage.py reconcile_payments`
+    "RECONCILE_CLIENT": env(
+        "PAYMENTS_RECONCILE_CLIENT",
+        default="apps.payments.reconcile.ClickStatusClient",
+    ),
+    "RECONCILE_AFTER": 15 * 60,  # seconds without a final callback
+    "RECONCILE_BATCH": 100,
+    "EXPIRE_AFTER": 24 * 60 * 60,  # still unresolved after this -> canceled
+    "STATUS_WAIT_SECONDS": 25,  # longest hold of GET status/wait/
 }
 
 
 SPEAKING = {
     "FEE": 50000,
 }
+
+OTP = {
+    "RETENTION_MINUTES": 60,  # expired codes are kept this long, then purged
+    "PURGE_BATCH": 1000,
+    "STATUS_NEGATIVE_TTL": 10,  # seconds a "no active code" answer is cached
+}
+
+IELTS_TESTS = {
+    "PAYLOAD_CACHE_TTL": 60 * 60 * 24,  # invalidated by signals on content change
+    "ANSWER_KEY_CACHE_TTL": 60 * 60 * 24,
+}
+
+STUDENT_DASHBOARD = {
+    "CACHE_TTL": 30,  # seconds; purchases, top-ups and results invalidate
+    "DEFAULT_LIMIT": 50,  # per section when the *_limit param is missing
+    "MAX_LIMIT": 200,
+}
+
+STUDENT_BULK_ACTIONS = {
+    "SYNC_LIMIT": 500,  # larger admin selections run as a background job
+    "CHUNK_SIZE": 500,  # students per statement/transaction in the job
+}
+
+TEACHER_CHECKING = {
+    "MAX_IN_FLIGHT": 5,  # submissions a teacher may hold in_checking at once
+    "MAX_CLAIM_BATCH": 10,
+    "LEASE_SECONDS": 60 * 60,  # claim expires unless extended via heartbeat
+    "SWEEP_BATCH": 500,
+    "COUNTER_SLOTS": 16,  # rows the shared requested-pool counter is spread over
+}
+
+# Background jobs (apps.core.jobs, `manage.py run_workers`)
+JOBS = {
+    "WORKERS": env.int("JOB_WORKERS", default=2),
+    "BATCH_SIZE": 10,
+    "POLL_INTERVAL": 1.0,  # seconds, when the queue is empty
+    "MAX_ATTEMPTS": 5,
+    "BACKOFF_BASE": 5,  # seconds, doubled per attempt (+ jitter)
+    "BACKOFF_MAX": 10 * 60,
+    "LOCK_TIMEOUT": 5 * 60,  # running jobs older than this are reclaimed
+}
 TELEGRAM_BOT_TOKEN = env("TELEGRAM_BOT_TOKEN", default="")
 TELEGRAM_ADMIN_CHAT_ID = env("TELEGRAM_ADMIN_CHAT_ID", default="")
 
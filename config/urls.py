@@ -15,6 +15,7 @@ urlpatterns = [
     path("api/tests/", include("apps.tests.urls")),
     path("api/payments/", include("apps.payments.urls")),
     path("api/speaking/", include("apps.speaking.urls")),
+    path("api/core/", include("apps.core.urls")),
     # API schema & docs
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
     path(
@@ -1,7 +1,7 @@
 'use client';
 
 import { useEffect, useState } from 'react';
-import api from '@/lib/api';
+import api, { listResults } from '@/lib/api';
 import { UserTest } from '@/lib/types';
 import { getMockMyTests } from '@/lib/mockData';
 import { isMockEnabled } from '@/lib/mockMode';
@@ -36,7 +36,7 @@ export default function MyTestsPage() {
     const fetchTests = async () => {
       try {
         const response = await api.get('/user-tests/my-tests/', { signal: controller.signal });
-        setTests(Array.isArray(response.data) ? response.data : []);
+        setTests(listResults(response.data));
       } catch (err: any) {
         if (err.name === 'CanceledError') return;
         setError('Failed to load your tests.');
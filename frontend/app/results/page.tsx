@@ -1,7 +1,7 @@
 'use client';
 
 import { useEffect, useState } from 'react';
-import api from '@/lib/api';
+import api, { listResults } from '@/lib/api';
 import { TestResult } from '@/lib/types';
 import { getMockResults } from '@/lib/mockData';
 import { isMockEnabled } from '@/lib/mockMode';
@@ -44,7 +44,7 @@ export default function ResultsPage() {
     const fetchResults = async () => {
       try {
         const response = await api.get('/user-tests/results/', { signal: controller.signal });
-        setResults(Array.isArray(response.data) ? response.data : []);
+        setResults(listResults(response.data));
       } catch (err: any) {
         if (err.name === 'CanceledError') return;
         setError('Failed to load results.');
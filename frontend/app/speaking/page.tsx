@@ -2,7 +2,7 @@
 
 import { useState, useEffect, useCallback } from 'react';
 import { useAuth } from '@/lib/auth';
-import api from '@/lib/api';
+import api, { listResults } from '@/lib/api';
 import { SpeakingRequest } from '@/lib/types';
 import { getMockSpeakingRequests, getMockStudentDashboard } from '@/lib/mockData';
 import { isMockEnabled } from '@/lib/mockMode';
@@ -57,7 +57,7 @@ export default function SpeakingPage() {
         api.get('/speaking/request/me/', { signal }),
         api.get('/profiles/student/me/', { signal }),
       ]);
-      setRequests(speakingRes.data);
+      setRequests(listResults(speakingRes.data));
       const profile = profileRes.data;
       setProfileName(profile?.user?.fullname || '');
       setFormData(prev => ({ ...prev, phone_number: profile?.user?.phone_number || prev.phone_number }));
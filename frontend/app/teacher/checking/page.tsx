@@ -1,7 +1,7 @@
 'use client';
 
 import { useEffect, useState, useCallback } from 'react';
-import api from '@/lib/api';
+import api, { listResults } from '@/lib/api';
 import { getMockTeacherSubmissions } from '@/lib/mockData';
 import { isMockEnabled } from '@/lib/mockMode';
 import { useAuth } from '@/lib/auth';
@@ -53,6 +53,19 @@ export default function TeacherCheckingPage() {
     }
 
     fetchSubmissions();
+
+    // Live pool updates (SSE) instead of re-fetching on a timer
+    const token = localStorage.getItem('access_token');
+    if (!token || typeof EventSource === 'undefined') return;
+    const baseURL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8700/api';
+    const source = new EventSource(
+      `${baseURL}/teacher-checking/events/?token=${encodeURIComponent(token)}`,
+    );
+    const refresh = () => fetchSubmissions();
+    ['submission.requested', 'submission.claimed', 'submission.graded', 'submission.requeued'].forEach((name) =>
+      source.addEventListener(name, refresh),
+    );
+    return () => source.close();
   }, [authLoading, isAuthenticated, role]);
 
   const fetchSubmissions = async () => {
@@ -63,9 +76,9 @@ export default function TeacherCheckingPage() {
         api.get('/teacher-checking/checked/'),
       ]);
 
-      setAllSubmissions(Array.isArray(allRes.data) ? allRes.data : []);
-      setMyChecking(Array.isArray(checkingRes.data) ? checkingRes.data : []);
-      setMyChecked(Array.isArray(checkedRes.data) ? checkedRes.data : []);
+      setAllSubmissions(listResults(allRes.data));
+      setMyChecking(listResults(checkingRes.data));
+      setMyChecked(listResults(checkedRes.data));
     } catch (err: any) {
       setError('Failed to load submissions.');
     } finally {
@@ -73,6 +86,17 @@ export default function TeacherCheckingPage() {
     }
   };
 
+  // Keep claims alive while the teacher has this page open
+  useEffect(() => {
+    if (isMock || myChecking.length === 0) return;
+    const beat = () =>
+      myChecking.forEach((s) =>
+        api.post('/teacher-checking/heartbeat/', { submission_id: s.id }).catch(() => {}),
+      );
+    const timer = setInterval(beat, 5 * 60 * 1000);
+    return () => clearInterval(timer);
+  }, [isMock, myChecking]);
+
   const handleClaim = useCallback(async (submissionId: string) => {
     if (isMock) {
       const found = allSubmissions.find((s) => s.id === submissionId);
@@ -1,7 +1,7 @@
 'use client';
 
 import { useEffect, useState } from 'react';
-import api from '@/lib/api';
+import api, { listResults } from '@/lib/api';
 import { Test } from '@/lib/types';
 import { getMockTests } from '@/lib/mockData';
 import { isMockEnabled } from '@/lib/mockMode';
@@ -35,7 +35,7 @@ export default function TestsPage() {
     const fetchTests = async () => {
       try {
         const response = await api.get('/user-tests/all-tests/', { signal: controller.signal });
-        setTests(Array.isArray(response.data) ? response.data : []);
+        setTests(listResults(response.data));
       } catch (err: any) {
         if (err.name === 'CanceledError') return;
         setError('Failed to load tests. Please try again.');
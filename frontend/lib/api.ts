@@ -98,4 +98,17 @@ function clearAuth() {
   }
 }
 
+/* ─── Cursor-paginated lists ({ next, previous, results }) ─ */
+export interface Page<T> {
+  next: string | null;
+  previous: string | null;
+  results: T[];
+}
+
+export function listResults<T>(data: unknown): T[] {
+  if (Array.isArray(data)) return data as T[];
+  const results = (data as Page<T> | null)?.results;
+  return Array.isArray(results) ? results : [];
+}
+
 export default api;
@@ -27,5 +27,5 @@ python manage.py migrate --noinput
 echo "📦  Collecting static files …"
 python manage.py collectstatic --noinput
 
-echo "🚦  Starting server …"
-python manage.py runserver 0.0.0.0:8700
\ No newline at end of file
+echo "🚦  Starting server (ASGI) …"
+exec uvicorn config.asgi:application --host 0.0.0.0 --port 8700 --workers "${WEB_WORKERS:-2}"
\ No newline at end of file